@@ -5,141 +5,282 @@ Flask-app för skolworkshop där elever bygger en tidningsframsida.
 # PRD: docs/PRD.md — läs detta dokument först för produktöversikt och teknisk snabbguide
 """
 
+import hashlib
+import hmac
 import json
+import mimetypes
 import os
 import re
+import secrets
+import time
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify
+from concurrent.futures import TimeoutError as FutureTimeout
+from flask import (Flask, Response, abort, g, redirect, render_template, request, jsonify, make_response,
+                   send_file, url_for)
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from limits import parse as parse_limit
+
+from assets import AssetManifest, choose_encoding
+from autosave import DraftConflict, DraftStore
+from catalog import ArticleCatalog
+from events import EventLog, format_sse
+from images import PRESETS as IMAGE_PRESETS, ImageVariants
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS, stage
+from categories import ALLOWED_CATEGORIES
+from bulk_export import ExportProgress, iter_file, iter_zip, merged_pdf, pdf_name, read_progress
+from pdf_export import PdfQueueFull, PdfRenderer, PdfUnavailable, pdf_context, resolve_slots
+import ratelimit_storage  # noqa: F401  registrerar token-bucket och lagringarna memory-buckets:// och sqlite://
+from storage import InvalidCursor, Reused, open_store, summary
+from thumbnails import FrontpageCache, ThumbnailUnavailable, frontpage_key, page_number, page_ref, render_thumbnail
+from warmup import Warmup
+from workshops import WorkshopCatalogs
 
 app = Flask(__name__)
+# Kan stängas av (RATELIMIT_ENABLED=false) t.ex. vid lasttester från en enda adress
+app.config["RATELIMIT_ENABLED"] = os.environ.get("RATELIMIT_ENABLED", "true").lower() != "false"
+
+# Sessionsnycklar för rate limiting: varje webbläsare får en signerad token i en cookie, så att
+# en hel klass bakom samma publika IP-adress (NAT) inte delar på en gemensam kvot
+SESSION_COOKIE = "tidning_sid"
+TEACHER_COOKIE = "tidning_teacher"
+SESSION_MAX_AGE = 12 * 3600
+# Nyckel för signaturerna; slumpas vid start om den inte anges (serve.py delar den mellan processer)
+SESSION_SECRET = (os.environ.get("SESSION_SECRET") or secrets.token_hex(32)).encode("utf-8")
+# Läraren öppnar /?teacher=<TEACHER_TOKEN> en gång och är sedan undantagen från begränsningarna
+TEACHER_TOKEN = os.environ.get("TEACHER_TOKEN", "")
+# Vilken workshop webbläsaren hör till (sätts med /?workshop=<namn>)
+WORKSHOP_COOKIE = "tidning_workshop"
+
+
+def sign(value: str) -> str:
+    return hmac.new(SESSION_SECRET, value.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def same_secret(a: str, b: str) -> bool:
+    return hmac.compare_digest(a.encode("utf-8"), b.encode("utf-8"))
+
+
+def session_token():
+    """The browser's verified session token, or None (cached per request)."""
+    if "session_token" not in g:
+        token, _, signature = request.cookies.get(SESSION_COOKIE, "").partition(".")
+        g.session_token = token if token and same_secret(signature, sign(token)) else None
+    return g.session_token
+
+
+def rate_limit_key():
+    """Rate-limit per browser session, or per IP address until the session cookie is set."""
+    token = session_token()
+    return "session:" + token if token else "ip:" + get_remote_address()
+
+
+def is_teacher_session():
+    token = session_token()
+    return bool(TEACHER_TOKEN and token) and same_secret(
+        request.cookies.get(TEACHER_COOKIE, ""), sign(token + ":teacher"))
+
 
 # Rate limiting - tillåter 100 användare samtidigt
-# 200 requests/minut per IP (räcker för normal användning)
+# 200 requests/minut per webbläsarsession (räcker för normal användning). Gränserna är
+# token buckets: en kort skur är tillåten så länge snittet håller sig under gränsen.
+# Med flera arbetsprocesser (serve.py) delas räknarna via RATELIMIT_STORAGE_URI=sqlite:///...
 limiter = Limiter(
-    key_func=get_remote_address,
+    key_func=rate_limit_key,
     app=app,
     default_limits=["200 per minute", "1000 per hour"],
-    storage_uri="memory://"
+    default_limits_exempt_when=is_teacher_session,
+    strategy="token-bucket",
+    storage_uri=os.environ.get("RATELIMIT_STORAGE_URI", "memory-buckets://")
 )
+# Tak per IP-adress för alla sessioner bakom den tillsammans, så att nya cookies inte kringgår skyddet
+IP_CEILING = parse_limit(os.environ.get("RATELIMIT_IP_CEILING", "3000 per minute"))
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "data")
-SAVED_DIR = os.path.join(BASE_DIR, "saved")
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(BASE_DIR, "data"))
+SAVED_DIR = os.environ.get("SAVED_DIR", os.path.join(BASE_DIR, "saved"))
 os.makedirs(SAVED_DIR, exist_ok=True)
 
+# Lagring av sparade framsidor: "file" (en JSON-fil per sparning) eller "sqlite".
+# SAVE_WRITE_BEHIND=true samlar samtidiga sparningar till en gemensam skrivning.
+SAVE_STORE = open_store(
+    os.environ.get("SAVE_BACKEND", "file"),
+    SAVED_DIR,
+    os.environ.get("SAVE_DB"),
+    fsync=os.environ.get("SAVE_FSYNC", "true").lower() != "false",
+    write_behind=os.environ.get("SAVE_WRITE_BEHIND", "false").lower() == "true",
+)
+# Största tillåtna sidstorlek för /list-saved
+MAX_LIST_LIMIT = 500
+
+# PDF-export: begränsad processpool och diskcache för renderade PDF:er
+PDF_RENDERER = PdfRenderer(
+    cache_dir=os.environ.get("PDF_CACHE_DIR", os.path.join(BASE_DIR, "cache", "pdf")),
+    base_url=BASE_DIR,
+    workers=int(os.environ.get("PDF_WORKERS", 2)),
+    max_pending=int(os.environ.get("PDF_MAX_PENDING", 32)),
+)
+# Hur länge en request väntar på en PDF innan den svarar 202 (försök igen)
+PDF_WAIT_SECONDS = float(os.environ.get("PDF_WAIT_SECONDS", 20))
+
+# Galleriets miniatyrer (PNG) och HTML-fragment, cachade per slotinnehåll och katalogversion
+FRONTPAGES = FrontpageCache(
+    os.environ.get("THUMBNAIL_CACHE_DIR", os.path.join(BASE_DIR, "cache", "thumbnails")),
+    max_files=int(os.environ.get("THUMBNAIL_CACHE_MAX", 2000)),
+)
+
+# Förloppsfiler för klassexporter (läsbara från alla arbetsprocesser)
+EXPORT_PROGRESS_DIR = os.environ.get("EXPORT_PROGRESS_DIR", os.path.join(BASE_DIR, "cache", "export"))
+
+# Händelselogg för live-galleriet, delad mellan arbetsprocesser via SQLite
+EVENT_LOG = EventLog(os.environ.get("EVENTS_DB", os.path.join(BASE_DIR, "cache", "events.sqlite3")))
+# Hur länge en SSE-anslutning hålls öppen innan klienten får återansluta
+SSE_MAX_SECONDS = float(os.environ.get("SSE_MAX_SECONDS", 300))
+# Intervall för keepalive-kommentarer på SSE-anslutningar
+SSE_KEEPALIVE_SECONDS = 15.0
+
 # Tillåtna slot-nycklar (för input-validering)
 ALLOWED_SLOTS = {"puff1", "puff2", "puff3", "texttopp", "huvudnyhet", "mellan1", "citat", "liten1", "liten2"}
 
-# Allowed article categories (only these will be used/displayed)
-ALLOWED_CATEGORIES = {
-    "NÖJE",
-    "ÅSIKT",
-    "KARLSHAMN",
-    "RONNEBY",
-    "SÖLVESBORG",
-    "KARLSKRONA",
-    "OLOFSTRÖM",
-    "REGION",
-    "NÄRINGSLIV",
-    "SPORT",
-}
+# Fingeravtryckta statiska filer (byggs med tools/build_assets.py); ASSETS_DIR pekar ut en annan
+# byggkatalog än static/dist/
+ASSETS = AssetManifest(os.path.join(BASE_DIR, "static"), os.environ.get("ASSETS_DIR"))
 
+# Bildvarianter (miniatyr, framsida, tryck) cachade på disk per källhash
+IMAGES = ImageVariants(
+    os.path.join(BASE_DIR, "static"),
+    os.environ.get("IMAGE_CACHE_DIR", os.path.join(BASE_DIR, "cache", "images")),
+)
 
-def load_articles():
-    """Load articles and packages from JSON file."""
-    path = os.path.join(DATA_DIR, "articles.json")
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    # Handle both old format (list) and new format (dict with articles and packages)
-    if isinstance(data, list):
-        articles = data
-        packages = []
-    else:
-        articles = data.get("articles", [])
-        packages = data.get("packages", [])
-    
-    def infer_category(article: dict) -> str:
-        """Infer a category from headline/subheadline/body using simple heuristics.
-
-        Returns one of ALLOWED_CATEGORIES, defaulting to 'REGION'.
-        """
-        text_parts = [
-            (article.get("headline") or ""),
-            (article.get("subheadline") or ""),
-            (article.get("body") or ""),
-        ]
-        text = "\n".join(text_parts).lower()
-
-        # Town-specific matches (prefer exact town mentions)
-        town_map = {
-            "karlshamn": "KARLSHAMN",
-            "karlskrona": "KARLSKRONA",
-            "ronneby": "RONNEBY",
-            "sölvesborg": "SÖLVESBORG",
-            "solvesborg": "SÖLVESBORG",
-            "olofström": "OLOFSTRÖM",
-            "olofstrom": "OLOFSTRÖM",
-        }
-        for k, v in town_map.items():
-            if k in text:
-                return v
-
-        # Business / economy
-        business_kw = ["företag", "näringsliv", "ekonomi", "investering", "arbets", "priser", "omsättning"]
-        if any(w in text for w in business_kw):
-            return "NÄRINGSLIV"
-
-        # Opinion
-        opinion_kw = ["åsikt", "debatt", "insändare", "tycker", "menar", "ledare", "åsikter"]
-        if any(w in text for w in opinion_kw):
-            return "ÅSIKT"
-
-        # Entertainment / culture
-        entertainment_kw = ["konsert", "teater", "kultur", "festival", "nöje", "premiär", "recension"]
-        if any(w in text for w in entertainment_kw):
-            return "NÖJE"
-
-        # Sports often mention HK, IF, match, mål — try to map to town if possible
-        sports_kw = ["match", "mål", "cupen", "serie", "hanlde", "hockey", "fotboll", "hk "]
-        if any(w in text for w in sports_kw):
-            # attempt to find a town in the text (e.g., team name includes town)
-            for k, v in town_map.items():
-                if k in text:
-                    return v
-            return "REGION"
-
-        # If original category already matches an allowed one, keep it
-        orig = (article.get("category") or "").strip().upper()
-        if orig in ALLOWED_CATEGORIES:
-            return orig
-
-        # Fallback
-        return "REGION"
-
-    # Apply inference to each article and set normalized category
-    for a in articles:
-        a["category"] = infer_category(a)
-    
-    # Also apply inference to package articles
-    for pkg in packages:
-        for a in pkg.get("articles", []):
-            a["category"] = infer_category(a)
+# Citattecknet i citatplatsen (en bild, visas i ca 24-48 px)
+QUOTE_GLYPH = "images/citattecken.1.jpeg"
+
+# Artikelkatalogen laddas en gång per process och läses om när filen ändras.
+# En katalog kompilerad med tools/compile_catalog.py används så länge den är
+# nyare än articles.json (avgörs vid varje kontroll); CATALOG_FILE pekar ut en
+# fast fil i stället.
+if os.environ.get("CATALOG_FILE"):
+    CATALOG = ArticleCatalog(os.environ["CATALOG_FILE"])
+else:
+    CATALOG = ArticleCatalog(data_dir=DATA_DIR)
 
-    return articles, packages
+# Workshoppar med egna kataloger under data/workshops/<namn>/; högst WORKSHOP_CACHE_SIZE hålls inlästa
+WORKSHOPS = WorkshopCatalogs(
+    CATALOG,
+    os.environ.get("WORKSHOPS_DIR", os.path.join(DATA_DIR, "workshops")),
+    max_loaded=int(os.environ.get("WORKSHOP_CACHE_SIZE", 8)),
+)
+
+# Mätvärden för Prometheus på /metrics (METRICS_ENABLED=false stänger av både mätning och endpoint)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() != "false"
+METRICS.enabled = METRICS_ENABLED
+REQUEST_SECONDS = METRICS.histogram(
+    "tidning_request_duration_seconds", "Time to produce a response, per route.", ["route", "method"])
+REQUESTS_TOTAL = METRICS.counter(
+    "tidning_requests_total", "Responses per route and status code.", ["route", "method", "status"])
+RATE_LIMITED_TOTAL = METRICS.counter(
+    "tidning_rate_limited_total", "Requests rejected by the rate limiter (429), per route.", ["route"])
+SAVES_TOTAL = METRICS.counter("tidning_saves_total", "Frontpages saved.")
+METRICS.gauge("tidning_saved_frontpages", "Saved frontpages in the save store.",
+              lambda: SAVE_STORE.stats()["saves"])
+METRICS.gauge("tidning_saved_bytes", "Size of the save store on disk in bytes.",
+              lambda: SAVE_STORE.stats()["bytes"])
+METRICS.gauge("tidning_pdf_renders_inflight", "PDF renders queued or running.", lambda: PDF_RENDERER.inflight)
+METRICS.gauge("tidning_workshop_catalogs_loaded", "Workshop catalogs held in the LRU.",
+              lambda: len(WORKSHOPS.loaded()), per_process=True)
+# Med flera arbetsprocesser (serve.py) summeras mätvärdena via filer i METRICS_DIR
+if METRICS_ENABLED and os.environ.get("METRICS_DIR"):
+    METRICS.share(os.environ["METRICS_DIR"])
+
+# Stickprovsprofilering: PROFILE_EVERY=N profilerar var N:e request till PROFILE_ROUTES (0 = av)
+PROFILE_EVERY = int(os.environ.get("PROFILE_EVERY", 0))
+# Hemlighet för X-Profile-huvudet (profilera just den här requesten) och /debug/profiles
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILER = None
+if PROFILE_EVERY > 0 or PROFILE_TOKEN:
+    # cProfile och pstats importeras bara när profilering är påslagen
+    from profiling import SamplingProfiler, summarize as summarize_profiles
+
+    PROFILER = SamplingProfiler(
+        os.environ.get("PROFILE_DIR", os.path.join(BASE_DIR, "cache", "profiles")),
+        every=PROFILE_EVERY,
+        routes=[r.strip() for r in os.environ.get("PROFILE_ROUTES", "/,/save,/list-saved").split(",") if r.strip()],
+        max_files=int(os.environ.get("PROFILE_MAX_FILES", 200)),
+    )
+
+# Uppvärmning vid start (katalog, sökindex, mallar, startsida): "background" gör den i en bakgrundstråd
+# medan /readyz svarar 503, "sync" innan importen av appen är klar och "off" inte alls.
+# serve.py sätter "manual" och värmer upp själv, före eller efter fork.
+STARTUP_WARMUP = os.environ.get("STARTUP_WARMUP", "background").lower()
+WARMUP = Warmup()
+
+
+def current_workshop():
+    """The workshop this browser has joined, or None (cached per request)."""
+    if "workshop" not in g:
+        name, _, signature = request.cookies.get(WORKSHOP_COOKIE, "").partition(".")
+        valid = name and same_secret(signature, sign("workshop:" + name)) and WORKSHOPS.exists(name)
+        g.workshop = name if valid else None
+    return g.workshop
+
+
+def current_catalog() -> ArticleCatalog:
+    """The article catalog of the current workshop (the default catalog outside workshops)."""
+    try:
+        return WORKSHOPS.get(current_workshop())
+    except KeyError:
+        # Workshoppens katalogfil försvann efter att requesten validerade den
+        return WORKSHOPS.default
+
+
+def in_current_workshop(data: dict) -> bool:
+    """True if a saved frontpage is visible here: inside a workshop only its own saves are."""
+    workshop = current_workshop()
+    return workshop is None or data.get("session") == workshop
+
+
+def join_workshop(name):
+    """Put this browser in workshop `name` (or leave workshops for an empty name), then redirect to /."""
+    response = redirect(url_for("index"))
+    if not name:
+        response.delete_cookie(WORKSHOP_COOKIE)
+        return response
+    if not WORKSHOPS.exists(name):
+        return jsonify({"error": "Unknown workshop"}), 404
+    response.set_cookie(WORKSHOP_COOKIE, f"{name}.{sign('workshop:' + name)}", max_age=SESSION_MAX_AGE,
+                        httponly=True, samesite="Lax")
+    return response
+
+
+def load_articles():
+    """Return (articles, packages) from the cached article catalog."""
+    snapshot = current_catalog().snapshot()
+    return snapshot.articles, snapshot.packages
 
 
 # Date/week meta removed — no server-side date text is generated for the header
 
+# Hur ofta (sekunder) statiska filer stat:as för att upptäcka ändringar
+STATIC_CHECK_INTERVAL = 2.0
+_static_state = {"checked_at": 0.0, "value": None}
+
+# Renderad startsida per (workshop, katalogversion, static_v, header_image, assets, bilder) -> (etag, html)
+_page_cache = {}
+_PAGE_CACHE_MAX = 2 * (WORKSHOPS.max_loaded + 1)
+
+
+def compute_static_version():
+    """Return (static_v, header_image) for the editor page.
+
+    static_v is the newest mtime of style.css/script.js so browsers refetch
+    when either file changes. The result is cached for STATIC_CHECK_INTERVAL
+    seconds so the files are not stat:ed on every request.
+    """
+    now = time.monotonic()
+    if _static_state["value"] is not None and now - _static_state["checked_at"] < STATIC_CHECK_INTERVAL:
+        return _static_state["value"]
 
-@app.route("/")
-def index():
-    """Main page with sidebar and frontpage builder."""
-    articles, packages = load_articles()
-    # No header meta (date/week) is generated — removed per user request
     # Compute a static file version key based on CSS mtime so browsers refetch when files change
     static_v = None
     try:
@@ -160,13 +301,371 @@ def index():
     else:
         header_image = "images/blt_background.jpg"
 
-    return render_template(
-        "index.html",
-        articles=articles,
-        packages=packages,
-        static_v=static_v,
-        header_image=header_image,
-    )
+    _static_state["value"] = (static_v, header_image)
+    _static_state["checked_at"] = now
+    return static_v, header_image
+
+
+def render_index_page():
+    """Return (etag, html) for the current workshop's editor page, rendering only when an input has changed."""
+    workshop = current_workshop()
+    snapshot = current_catalog().snapshot()
+    static_v, header_image = compute_static_version()
+    key = (workshop, snapshot.version, static_v, header_image, ASSETS.version, IMAGES.version)
+
+    cached = _page_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # No header meta (date/week) is generated — removed per user request
+    # Varianter för artikelbilderna, som JS-koden väljer mellan
+    summaries = snapshot.summaries + [a for pkg in snapshot.package_summaries for a in pkg["articles"]]
+    image_sources = [a["image"] for a in summaries if a.get("image")] + [QUOTE_GLYPH]
+    image_variants = {
+        src: {preset: IMAGES.url(src, preset) for preset in ("thumb", "slot")} for src in image_sources
+    }
+    with stage("render_index"):
+        html = render_template(
+            "index.html",
+            articles=snapshot.summaries,
+            packages=snapshot.package_summaries,
+            categories=sorted(ALLOWED_CATEGORIES),
+            workshop=workshop,
+            catalog_version=snapshot.version,
+            image_variants=image_variants,
+            static_v=static_v,
+            header_image=header_image,
+        )
+    etag = hashlib.sha1(html.encode("utf-8")).hexdigest()
+    if len(_page_cache) >= _PAGE_CACHE_MAX:
+        _page_cache.clear()
+    _page_cache[key] = (etag, html)
+    return etag, html
+
+
+@app.before_request
+def limit_per_ip():
+    """Apply IP_CEILING to everything from one address, whatever session cookies it sends."""
+    if not app.config["RATELIMIT_ENABLED"] or request.endpoint in ("metrics", "debug_profiles", "healthz", "readyz"):
+        return None
+    if is_teacher_session() or limiter.limiter.hit(IP_CEILING, "ip-ceiling", get_remote_address()):
+        return None
+    return jsonify({"error": "Too many requests from this network"}), 429, {"Retry-After": "5"}
+
+
+@app.after_request
+def issue_session_cookie(response):
+    """Give a browser without a valid session cookie its own rate-limit session."""
+    if session_token() is None:
+        token = g.get("new_session_token") or secrets.token_urlsafe(16)
+        response.set_cookie(SESSION_COOKIE, f"{token}.{sign(token)}", max_age=SESSION_MAX_AGE,
+                            httponly=True, samesite="Lax")
+    return response
+
+
+def claim_teacher_session(claim):
+    """Mark this browser session as a teacher's if `claim` is TEACHER_TOKEN, then redirect to /."""
+    if not TEACHER_TOKEN or not same_secret(claim, TEACHER_TOKEN):
+        return jsonify({"error": "Invalid teacher token"}), 403
+    token = session_token()
+    if token is None:
+        token = g.new_session_token = secrets.token_urlsafe(16)
+    # Omdirigera så att lärartoken inte blir kvar i adressfältet och historiken
+    response = redirect(url_for("index"))
+    response.set_cookie(TEACHER_COOKIE, sign(token + ":teacher"), max_age=SESSION_MAX_AGE,
+                        httponly=True, samesite="Lax")
+    return response
+
+
+@app.before_request
+def start_timer():
+    request.environ["tidning.start"] = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    """Record latency and status per route (the URL rule, so ids do not create new series)."""
+    if not METRICS_ENABLED:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+    REQUESTS_TOTAL.inc(route, request.method, str(response.status_code))
+    if response.status_code == 429:
+        RATE_LIMITED_TOTAL.inc(route)
+    # Begränsarens kontroll körs före start_timer, så avvisade requests saknar starttid
+    start = request.environ.get("tidning.start")
+    if start is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, route, request.method)
+    return response
+
+
+def has_profile_token(value):
+    return bool(PROFILE_TOKEN) and hmac.compare_digest((value or "").encode("utf-8"), PROFILE_TOKEN.encode("utf-8"))
+
+
+def start_profile():
+    """Profile this request if it is sampled or carries a valid X-Profile header."""
+    if request.url_rule is None or request.endpoint == "debug_profiles":
+        return
+    rule = request.url_rule.rule
+    if PROFILER.sampled(rule) or has_profile_token(request.headers.get("X-Profile")):
+        handle = PROFILER.start()
+        if handle is not None:
+            g.profile = (handle, rule)
+
+
+def stop_profile(exc):
+    entry = g.pop("profile", None)
+    if entry is not None:
+        try:
+            PROFILER.stop(*entry)
+        except OSError as e:
+            app.logger.warning("Could not write profile: %s", e)
+
+
+# Utan profilering registreras inga hooks, så den kostar ingenting när den är avstängd
+if PROFILER is not None:
+    app.before_request(start_profile)
+    app.teardown_request(stop_profile)
+
+
+@app.route("/debug/profiles")
+@limiter.exempt
+def debug_profiles():
+    """Top functions per route, merged over the stored profiles (requires PROFILE_TOKEN).
+
+    The token is given as the X-Profile header or `?token=`; optional
+    `route`, `top` and `sort` (cumulative or tottime).
+    """
+    if PROFILER is None or not has_profile_token(request.headers.get("X-Profile") or request.args.get("token")):
+        abort(404)
+    try:
+        top = int(request.args.get("top", 20))
+    except ValueError:
+        return jsonify({"error": "Invalid top"}), 400
+    sort = request.args.get("sort", "cumulative")
+    if sort not in ("cumulative", "tottime"):
+        return jsonify({"error": "Invalid sort"}), 400
+    return jsonify(summarize_profiles(PROFILER.profile_dir, route=request.args.get("route"), top=top, sort=sort))
+
+
+@app.route("/metrics")
+@limiter.exempt
+def metrics():
+    """Prometheus metrics for this process."""
+    if not METRICS_ENABLED:
+        abort(404)
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE, headers={"Cache-Control": "no-store"})
+
+
+@WARMUP.step("catalog")
+def warm_catalog():
+    """Load and classify the default catalog and build its search index."""
+    CATALOG.snapshot()
+
+
+@WARMUP.step("templates")
+def warm_templates():
+    """Compile the templates so that the first render of each does not pay for it."""
+    for name in ("index.html", "pdf.html", "frontpage.html"):
+        app.jinja_env.get_template(name)
+
+
+@WARMUP.step("index_page")
+def warm_index_page():
+    """Render and cache the editor page outside workshops."""
+    with app.test_request_context("/"):
+        render_index_page()
+
+
+@app.route("/healthz")
+@limiter.exempt
+def healthz():
+    """Liveness: the process is up and answering requests."""
+    return jsonify({"status": "ok"}), 200, {"Cache-Control": "no-store"}
+
+
+@app.route("/readyz")
+@limiter.exempt
+def readyz():
+    """Readiness: 200 once the startup warm-up has finished, 503 with the state of each step until then."""
+    status = WARMUP.status()
+    return jsonify(status), 200 if status["ready"] else 503, {"Cache-Control": "no-store"}
+
+
+@app.template_global()
+def asset_url(filename):
+    """URL for a static file: fingerprinted if built, otherwise /static/ with a version query."""
+    return ASSETS.url(filename) or url_for("static", filename=filename, v=compute_static_version()[0])
+
+
+@app.route("/assets/<path:filename>")
+def fingerprinted_asset(filename):
+    """Serve a fingerprinted file, precompressed if the client accepts it.
+
+    The name changes with the content, so the response may be cached
+    forever. Only files listed in the manifest are served.
+    """
+    found = ASSETS.lookup(filename)
+    if found is None:
+        abort(404)
+    path, encodings = found
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"), encodings)
+    suffix = {"br": ".br", "gzip": ".gz"}.get(encoding, "")
+
+    response = send_file(path + suffix, mimetype=mimetypes.guess_type(filename)[0], conditional=True,
+                         etag=True, max_age=31536000)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
+
+@app.template_global()
+def image_url(src, preset="slot"):
+    """URL of a sized variant of a static image (unchanged for unknown sources)."""
+    return IMAGES.url(src, preset)
+
+
+@app.template_global()
+def print_image(src):
+    """file:// URI of the print-resolution variant, for templates rendered by WeasyPrint."""
+    return IMAGES.print_uri(src)
+
+
+@app.route("/img/<preset>/<path:source>")
+def image_variant(preset, source):
+    """A sized variant of an image in static/ (WebP when the browser accepts it).
+
+    With the current source hash as `v` the response may be cached forever.
+    """
+    rel = IMAGES.relpath(source)
+    if rel is None or preset not in IMAGE_PRESETS:
+        abort(404)
+    found = IMAGES.derivative(rel, preset, webp="image/webp" in request.headers.get("Accept", ""))
+    if found is None:
+        abort(404)
+    path, mimetype = found
+
+    encoding = None
+    if mimetype == "image/svg+xml" and os.path.exists(path + ".gz"):
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"), {"gzip"})
+    response = send_file(path + (".gz" if encoding else ""), mimetype=mimetype, conditional=True, etag=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.update(("Accept", "Accept-Encoding"))
+    if request.args.get("v") == IMAGES.source_hash(rel):
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/")
+def index():
+    """Main page with sidebar and frontpage builder.
+
+    The rendered page is cached and served with a strong ETag, so a reload
+    with an unchanged catalog and unchanged static files gets a 304.
+    `?teacher=<TEACHER_TOKEN>` exempts this browser from rate limits, and
+    `?workshop=<name>` joins a workshop (an empty name leaves it).
+    """
+    claim = request.args.get("teacher")
+    if claim is not None:
+        return claim_teacher_session(claim)
+    workshop = request.args.get("workshop")
+    if workshop is not None:
+        return join_workshop(workshop)
+    etag, html = render_index_page()
+    response = make_response(html)
+    response.set_etag(etag)
+    response.vary.add("Cookie")
+    # Låt webbläsaren spara sidan men alltid fråga om den ändrats
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+# Största antal artiklar per /api/articles-anrop
+MAX_ARTICLE_BATCH = 200
+
+
+def article_response(payload, snapshot):
+    """JSON response for catalog data, cached according to the requested `v`.
+
+    A request carrying the current catalog version as `v` may be cached
+    forever (the URL changes with the catalog); anything else is
+    revalidated against an ETag derived from the version.
+    """
+    response = jsonify(payload)
+    if request.args.get("v") == snapshot.version:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    response.set_etag(hashlib.sha1((snapshot.version + request.full_path).encode("utf-8")).hexdigest())
+    return response.make_conditional(request)
+
+
+@app.route("/api/articles")
+def api_articles():
+    """Full article details for `?ids=1,2,3` (at most MAX_ARTICLE_BATCH ids).
+
+    Unknown ids are left out of the result. The editor page only embeds
+    article summaries and fetches body, byline and quote from here.
+    """
+    snapshot = current_catalog().snapshot()
+    raw_ids = list(dict.fromkeys(part.strip() for part in request.args.get("ids", "").split(",") if part.strip()))
+    if not raw_ids or len(raw_ids) > MAX_ARTICLE_BATCH:
+        return jsonify({"error": "Invalid ids"}), 400
+    articles = [a for a in (snapshot.get(i) for i in raw_ids) if a is not None]
+    return article_response({"version": snapshot.version, "articles": articles}, snapshot)
+
+
+@app.route("/api/articles/<int:article_id>")
+def api_article(article_id):
+    """Full details of a single article."""
+    snapshot = current_catalog().snapshot()
+    article = snapshot.get(article_id)
+    if article is None:
+        return jsonify({"error": "Article not found"}), 404
+    return article_response(article, snapshot)
+
+
+# Största antal träffar per /api/search-sida
+MAX_SEARCH_LIMIT = 100
+
+
+@app.route("/api/search")
+def api_search():
+    """Full-text search over the catalog for the sidebar.
+
+    Query parameters: `q` (words matched as prefixes, case and å/ä/ö
+    insensitive; empty lists everything), `category` (one of
+    ALLOWED_CATEGORIES), `limit` (1-MAX_SEARCH_LIMIT, default 20) and
+    `offset`. The response has the matching article summaries, the total
+    number of matches and per-category counts (`facets`) for the query.
+    """
+    category = request.args.get("category") or None
+    if category is not None and category not in ALLOWED_CATEGORIES:
+        return jsonify({"error": "Invalid category"}), 400
+    try:
+        limit = int(request.args.get("limit", 20))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "Invalid limit or offset"}), 400
+    if not 1 <= limit <= MAX_SEARCH_LIMIT or offset < 0:
+        return jsonify({"error": "Invalid limit or offset"}), 400
+
+    catalog = current_catalog()
+    snapshot = catalog.snapshot()
+    with stage("search"):
+        result = catalog.search.search(request.args.get("q", ""), category=category, offset=offset, limit=limit)
+    next_offset = offset + limit
+    return article_response({
+        "version": snapshot.version,
+        **result,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < result["total"] else None,
+    }, snapshot)
 
 
 def sanitize_filename(name: str) -> str:
@@ -176,10 +675,36 @@ def sanitize_filename(name: str) -> str:
     return sanitized[:50] if sanitized else "unknown"  # Limit length
 
 
+def save_session(data: dict):
+    """The session a save belongs to: the current workshop, otherwise the optional `session` field."""
+    if current_workshop() is not None:
+        return current_workshop()
+    return sanitize_filename(str(data["session"])) if data.get("session") is not None else None
+
+
+def store_frontpage(data: dict) -> str:
+    """Save a frontpage document, announce it to the live gallery and return its filename.
+
+    An unchanged layout returns the existing save's name without an event.
+    """
+    group_name = sanitize_filename(data.get("groupName", "unknown"))
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Får ett löpnummer om gruppen redan sparat samma sekund
+    with stage("save_write"):
+        json_filename = SAVE_STORE.save(f"{group_name}_{timestamp}.json", data)
+    if isinstance(json_filename, Reused):
+        # Samma layout som gruppens senaste sparning: inget nytt att visa eller räkna
+        return json_filename
+    with stage("event_publish"):
+        EVENT_LOG.publish(summary(json_filename, data, time.time()))
+    SAVES_TOTAL.inc()
+    return json_filename
+
+
 @app.route("/save", methods=["POST"])
-@limiter.limit("30 per minute")  # Begränsa sparande per IP
+@limiter.limit("30 per minute", exempt_when=is_teacher_session)  # Begränsa sparande per session
 def save_frontpage():
-    """Save the frontpage configuration to a JSON file."""
+    """Save the frontpage configuration in the configured save store."""
     data = request.json
     
     # Validera slots-data
@@ -188,61 +713,435 @@ def save_frontpage():
         return jsonify({"error": "Invalid slots format"}), 400
     if not all(k in ALLOWED_SLOTS for k in slots.keys()):
         return jsonify({"error": "Invalid slot key"}), 400
+    # Valfri workshop-session, används för filtrering i /list-saved. I en workshop
+    # hamnar sparningen alltid i workshoppens namnrymd.
+    session = save_session(data)
+    if session is not None:
+        data["session"] = session
     
-    group_name = sanitize_filename(data.get("groupName", "unknown"))
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    json_filename = f"{group_name}_{timestamp}.json"
-    json_filepath = os.path.join(SAVED_DIR, json_filename)
-    
-    # Save JSON data
-    with open(json_filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    json_filename = store_frontpage(data)
     
     return jsonify({"success": True, "filename": json_filename})
 
 
+# Autospara: utkast per flik i en SQLite-databas som alla arbetsprocesser delar. Ett utkast sparas i
+# lagringen när det varit oförändrat i AUTOSAVE_DEBOUNCE_SECONDS, dock senast AUTOSAVE_MAX_DELAY
+# sekunder efter den första osparade ändringen, och direkt när fliken stängs.
+AUTOSAVE = DraftStore(
+    os.environ.get("AUTOSAVE_DB", os.path.join(BASE_DIR, "cache", "drafts.sqlite3")),
+    store_frontpage,
+    debounce=float(os.environ.get("AUTOSAVE_DEBOUNCE_SECONDS", 10)),
+    max_delay=float(os.environ.get("AUTOSAVE_MAX_DELAY", 60)),
+    max_age=SESSION_MAX_AGE,
+)
+AUTOSAVE_DIFFS_TOTAL = METRICS.counter("tidning_autosave_diffs_total", "Slot diffs received by /autosave.")
+METRICS.gauge("tidning_autosave_pending_drafts", "Autosave drafts with changes not yet saved.",
+              AUTOSAVE.pending)
+# Utkast-id:t slumpas av varje flik
+DRAFT_ID = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+MAX_GROUP_NAME = 100
+
+
+def is_revision(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def is_article_ref(value) -> bool:
+    return value is None or (isinstance(value, (str, int)) and not isinstance(value, bool) and len(str(value)) <= 32)
+
+
+@app.route("/autosave", methods=["POST"])
+@limiter.limit("120 per minute", exempt_when=is_teacher_session)
+def autosave():
+    """Apply slot-level changes to this tab's draft, which is saved once it has been quiet a while.
+
+    Body: `draft` (the tab's id), `base` (the revision the changes build
+    on), `rev` (the new revision), `changes` ({slot: article id or null}),
+    and optionally `groupName`, `full` (`changes` is the whole layout) and
+    `flush` (save now; sent when the tab is closed or hidden). Changes
+    based on another revision than the draft's get 409 with the draft's
+    current state, from which the client recomputes its diff.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid JSON"}), 400
+    draft, base, rev = data.get("draft"), data.get("base", 0), data.get("rev")
+    changes = data.get("changes", {})
+    group_name = data.get("groupName")
+    if not isinstance(draft, str) or not DRAFT_ID.match(draft):
+        return jsonify({"error": "Invalid draft"}), 400
+    if not is_revision(base) or not is_revision(rev):
+        return jsonify({"error": "Invalid revision"}), 400
+    if not isinstance(changes, dict) or not all(k in ALLOWED_SLOTS for k in changes):
+        return jsonify({"error": "Invalid slot key"}), 400
+    if not all(is_article_ref(v) for v in changes.values()):
+        return jsonify({"error": "Invalid article id"}), 400
+    if group_name is not None and not isinstance(group_name, str):
+        return jsonify({"error": "Invalid groupName"}), 400
+
+    # Utkastet hör till webbläsarsessionen, så en annan webbläsare kan inte skriva över det
+    key = f"{session_token() or 'ip:' + get_remote_address()}:{draft}"
+    AUTOSAVE_DIFFS_TOTAL.inc()
+    try:
+        with stage("autosave_apply"):
+            state = AUTOSAVE.apply(key, base, rev, changes,
+                                   group_name=group_name.strip()[:MAX_GROUP_NAME] if group_name is not None else None,
+                                   session=save_session(data), full=bool(data.get("full")))
+    except DraftConflict as e:
+        return jsonify({"error": "Revision conflict", **e.state}), 409
+    filename = AUTOSAVE.flush(key, force=True) if data.get("flush") else None
+    return jsonify({"rev": state["rev"], "pending": state["pending"] and filename is None,
+                    "filename": filename or state["filename"]})
+
+
+def saved_page(decorate=None, latest=False):
+    """JSON page of saved-frontpage records for /list-saved and /gallery.
+
+    Handles `limit`, `cursor`, `group` and `session` (forced to the current
+    workshop inside one); `latest` keeps only each group's newest save and
+    `decorate(record)` may replace each record.
+    """
+    limit = request.args.get("limit")
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+        if not 1 <= limit <= MAX_LIST_LIMIT:
+            return jsonify({"error": "Invalid limit"}), 400
+
+    try:
+        with stage("list_saved"):
+            files, next_cursor = SAVE_STORE.list(
+                limit=limit,
+                cursor=request.args.get("cursor") or None,
+                group=request.args.get("group"),
+                session=current_workshop() or request.args.get("session"),
+                latest=latest,
+            )
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    if decorate is not None:
+        files = [decorate(record) for record in files]
+    response = jsonify(files)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    # Startpunkt för /events/saved så att inget missas mellan listning och anslutning
+    response.headers["X-Last-Event-Id"] = str(EVENT_LOG.latest_id(max_age=0))
+    return response
+
+
 @app.route("/list-saved")
 def list_saved():
-    """List all saved frontpages with slot data for rendering, sorted by date (newest first)."""
-    files = []
-    for f in os.listdir(SAVED_DIR):
-        if f.endswith(".json"):
-            filepath = os.path.join(SAVED_DIR, f)
-            try:
-                mtime = os.path.getmtime(filepath)
-                with open(filepath, 'r', encoding='utf-8') as fp:
-                    data = json.load(fp)
-                    group_name = data.get("groupName", "Okänd")
-                    slots = data.get("slots", {})
-                files.append({
-                    "filename": f,
-                    "groupName": group_name,
-                    "mtime": mtime,
-                    "slots": slots
-                })
-            except (json.JSONDecodeError, IOError):
-                files.append({"filename": f, "groupName": "Okänd", "mtime": 0, "slots": {}})
-    # Sort by modification time, newest first
-    files.sort(key=lambda x: x["mtime"], reverse=True)
-    return jsonify(files)
+    """List saved frontpages with slot data for rendering, sorted by date (newest first).
+
+    Optional query parameters: `limit` and `cursor` for pagination (the next
+    cursor is returned in the X-Next-Cursor header), `group` and `session`
+    for filtering. Without `limit` every matching save is returned. Inside a
+    workshop only that workshop's saves are listed.
+    """
+    return saved_page()
+
+
+def frontpage_render_key(record: dict, snapshot) -> str:
+    """Cache key of a save's thumbnail and fragment (a /list-saved record)."""
+    slots = record["slots"] if isinstance(record["slots"], dict) else {}
+    return frontpage_key(slots, snapshot.version, record["groupName"], compute_static_version()[1], IMAGES.version)
+
+
+@app.route("/gallery")
+def gallery():
+    """Like /list-saved, with `thumbnail` and `fragment` URLs for every save.
+
+    Only each group's latest save is listed unless `all=1`. The URLs carry
+    the render key, so the images and fragments they point to may be
+    cached forever; a changed catalog gives new URLs.
+    """
+    snapshot = current_catalog().snapshot()
+
+    def with_urls(record):
+        key = frontpage_render_key(record, snapshot)
+        return {
+            **record,
+            "thumbnail": url_for("saved_thumbnail", filename=record["filename"], v=key),
+            "fragment": url_for("saved_fragment", filename=record["filename"], v=key),
+        }
+
+    return saved_page(with_urls, latest=request.args.get("all") != "1")
+
+
+def raster_path(src):
+    """Small raster variant of a static image on disk for the thumbnails (None if unknown)."""
+    rel = IMAGES.relpath(src)
+    found = IMAGES.derivative(rel, "thumb") if rel else None
+    return found[0] if found else None
+
+
+def send_frontpage(filename, ext):
+    """Send the cached thumbnail ("png") or HTML fragment ("html") of a save, rendering it if needed."""
+    safe_filename = sanitize_filename(filename.replace(".json", "")) + ".json"
+    try:
+        data = SAVE_STORE.get(safe_filename)
+    except (json.JSONDecodeError, IOError) as e:
+        return jsonify({"error": str(e)}), 500
+    if data is None or not in_current_workshop(data):
+        return jsonify({"error": "File not found"}), 404
+
+    snapshot = current_catalog().snapshot()
+    record = summary(safe_filename, data, 0)
+    key = frontpage_render_key(record, snapshot)
+    slots = resolve_slots(record["slots"] if isinstance(record["slots"], dict) else {}, snapshot)
+    header_image = compute_static_version()[1]
+
+    def produce():
+        if ext == "png":
+            return render_thumbnail(slots, record["groupName"], header_path=raster_path(header_image),
+                                    image_path=lambda article: raster_path(article.get("image")))
+        return render_template("frontpage.html", slots=slots, group_name=record["groupName"],
+                               header_image=header_image, quote_glyph=QUOTE_GLYPH,
+                               page_ref=page_ref, page_number=page_number).encode("utf-8")
+
+    try:
+        with stage("render_frontpage_" + ext):
+            path = FRONTPAGES.get(key, ext, produce)
+    except ThumbnailUnavailable as e:
+        return jsonify({"error": f"Thumbnails unavailable: {e}"}), 503
+
+    response = send_file(path, mimetype="image/png" if ext == "png" else "text/html", conditional=True, etag=True)
+    if request.args.get("v") == key:
+        response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/saved/<filename>/thumbnail.png")
+def saved_thumbnail(filename):
+    """Small PNG picture of a saved frontpage, for the gallery grid."""
+    return send_frontpage(filename, "png")
+
+
+@app.route("/saved/<filename>/fragment")
+def saved_fragment(filename):
+    """A saved frontpage as an HTML fragment with its articles filled in (templates/frontpage.html)."""
+    return send_frontpage(filename, "html")
+
+
+@app.route("/events/saved")
+def saved_events():
+    """Server-Sent Events stream of newly saved frontpages.
+
+    Each event carries the same record as /list-saved. Clients resume with
+    the Last-Event-ID header (or `?lastEventId=`); without either the stream
+    starts at the newest event. If the requested id is older than the
+    retained log, a `reset` event tells the client to reload the list.
+    The connection is closed after SSE_MAX_SECONDS and the browser
+    reconnects from where it left off. Inside a workshop only that
+    workshop's saves are sent.
+    """
+    raw_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    try:
+        last_id = int(raw_id) if raw_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    # Generatorn körs utanför request-kontexten
+    workshop = current_workshop()
+
+    def stream(last_id):
+        yield "retry: 3000\n\n"
+        latest = EVENT_LOG.latest_id(max_age=0)
+        if last_id is None or last_id > latest:
+            last_id = latest
+        elif last_id < EVENT_LOG.oldest_id() - 1:
+            yield format_sse(latest, "reset", {})
+            last_id = latest
+
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        while time.monotonic() < deadline:
+            events = EVENT_LOG.wait(last_id, timeout=min(SSE_KEEPALIVE_SECONDS, deadline - time.monotonic()))
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event_id, data in events:
+                if workshop is None or data.get("session") == workshop:
+                    yield format_sse(event_id, "saved", data)
+                last_id = event_id
+
+    return Response(stream(last_id), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
 
 
 @app.route("/get-saved/<filename>")
 def get_saved(filename):
-    """Get a specific saved frontpage."""
+    """Get a specific saved frontpage (inside a workshop, only one of its own)."""
     # Sanitize filename to prevent directory traversal
     safe_filename = sanitize_filename(filename.replace(".json", "")) + ".json"
-    filepath = os.path.join(SAVED_DIR, safe_filename)
     
-    if not os.path.exists(filepath):
+    try:
+        data = SAVE_STORE.get(safe_filename)
+    except (json.JSONDecodeError, IOError) as e:
+        return jsonify({"error": str(e)}), 500
+    if data is None or not in_current_workshop(data):
         return jsonify({"error": "File not found"}), 404
-    
+    return jsonify(data)
+
+
+@app.route("/pdf/<filename>")
+@limiter.limit("20 per minute", exempt_when=is_teacher_session)
+def saved_pdf(filename):
+    """Render a saved frontpage as PDF via templates/pdf.html.
+
+    Renders run in a bounded process pool and are cached on disk by content,
+    so identical frontpages are only rendered once. If the render is not done
+    within PDF_WAIT_SECONDS the client gets 202 and should retry.
+    """
+    safe_filename = sanitize_filename(filename.replace(".json", "").replace(".pdf", "")) + ".json"
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return jsonify(data)
+        data = SAVE_STORE.get(safe_filename)
     except (json.JSONDecodeError, IOError) as e:
         return jsonify({"error": str(e)}), 500
+    if data is None or not in_current_workshop(data):
+        return jsonify({"error": "File not found"}), 404
+
+    with stage("render_pdf_html"):
+        html = render_template("pdf.html", **pdf_context(data, current_catalog().snapshot()))
+    try:
+        with stage("pdf_render"):
+            path = PDF_RENDERER.submit(html).result(timeout=PDF_WAIT_SECONDS)
+    except PdfQueueFull:
+        return jsonify({"error": "PDF queue is full"}), 503, {"Retry-After": "5"}
+    except FutureTimeout:
+        return jsonify({"status": "pending"}), 202, {"Retry-After": "2"}
+    except PdfUnavailable as e:
+        return jsonify({"error": f"PDF export unavailable: {e}"}), 503
+
+    download_name = safe_filename.replace(".json", ".pdf")
+    return send_file(path, mimetype="application/pdf", download_name=download_name, max_age=3600)
+
+
+def parse_time_arg(value):
+    """Parse an ISO datetime or epoch seconds query argument; None if empty."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def build_export_jobs(session=None, since=None, until=None, latest_only=True):
+    """Return [(pdf_name, html)] for the saved frontpages in a session/time window.
+
+    By default only each group's latest save is included; jobs are sorted by
+    group name.
+    """
+    records, _ = SAVE_STORE.list(session=session, since=since, until=until, latest=latest_only)
+    records.sort(key=lambda r: ((r.get("groupName") or "").lower(), r["mtime"]))
+
+    snapshot = current_catalog().snapshot()
+    used, jobs = set(), []
+    for record in records:
+        data = SAVE_STORE.get(record["filename"])
+        if data is None:
+            continue
+        html = render_template("pdf.html", **pdf_context(data, snapshot))
+        jobs.append((pdf_name(record, used), html))
+    return jobs
+
+
+def export_merged_pdf(jobs, export_id=None):
+    """Respond with the merged PDF of `jobs`, or 202 while it is still being rendered.
+
+    Each frontpage is rendered separately in the pool and the progress
+    steps as each one is done. Without an `export_id` it is derived from
+    the content, so a retry of the same export reports on the running one.
+    """
+    htmls = [html for _, html in jobs]
+    export_id = sanitize_filename(export_id or PDF_RENDERER.merged_key(htmls)[:16])
+    headers = {"X-Export-Id": export_id}
+    future = PDF_RENDERER.existing_merged(htmls)
+    if future is None:
+        progress = ExportProgress(EXPORT_PROGRESS_DIR, export_id, total=len(jobs), fmt="pdf")
+        future = merged_pdf(PDF_RENDERER, jobs, progress)
+    try:
+        with stage("pdf_render"):
+            path = future.result(timeout=PDF_WAIT_SECONDS)
+    except FutureTimeout:
+        return jsonify({"status": "pending", "export_id": export_id}), 202, {**headers, "Retry-After": "2"}
+    except PdfUnavailable as e:
+        return jsonify({"error": f"PDF export unavailable: {e}"}), 503, headers
+    return Response(iter_file(path), mimetype="application/pdf", headers={
+        **headers, "Content-Disposition": "attachment; filename=framsidor.pdf"})
+
+
+@app.route("/export")
+# 202 (sammanslagen PDF inte klar än) räknas inte, så att klienten kan fråga igen
+@limiter.limit("5 per minute", exempt_when=is_teacher_session, deduct_when=lambda response: response.status_code != 202)
+def export_class():
+    """Export a whole class's frontpages as one ZIP (default) or merged PDF.
+
+    Query parameters: `format` (zip|pdf), `session`, `since`/`until` (ISO
+    datetime or epoch seconds), `all=1` to include every save instead of the
+    latest per group, and an optional `export_id` whose progress can be
+    polled at /export/progress/<export_id>. Inside a workshop the export
+    covers that workshop's saves. A merged PDF that is not done within
+    PDF_WAIT_SECONDS gives 202; the same request later returns it.
+    """
+    fmt = request.args.get("format", "zip")
+    if fmt not in ("zip", "pdf"):
+        return jsonify({"error": "Invalid format"}), 400
+    try:
+        since = parse_time_arg(request.args.get("since"))
+        until = parse_time_arg(request.args.get("until"))
+    except ValueError:
+        return jsonify({"error": "Invalid time"}), 400
+
+    jobs = build_export_jobs(
+        session=current_workshop() or request.args.get("session"),
+        since=since,
+        until=until,
+        latest_only=request.args.get("all") != "1",
+    )
+    if not jobs:
+        return jsonify({"error": "No saved frontpages"}), 404
+
+    if fmt == "pdf":
+        return export_merged_pdf(jobs, request.args.get("export_id"))
+
+    export_id = sanitize_filename(request.args.get("export_id") or os.urandom(8).hex())
+    progress = ExportProgress(EXPORT_PROGRESS_DIR, export_id, total=len(jobs), fmt=fmt)
+    headers = {"X-Export-Id": export_id}
+    try:
+        chunks = iter_zip(PDF_RENDERER, jobs, progress)
+        # Vänta in första PDF:en så att fel kan rapporteras med rätt statuskod
+        first = next(chunks, b"")
+    except PdfUnavailable as e:
+        progress.fail(str(e))
+        return jsonify({"error": f"PDF export unavailable: {e}"}), 503
+
+    def stream():
+        yield first
+        yield from chunks
+
+    return Response(stream(), mimetype="application/zip", headers={
+        **headers, "Content-Disposition": "attachment; filename=framsidor.zip"})
+
+
+@app.route("/export/progress/<export_id>")
+def export_progress(export_id):
+    """Progress of a running or finished class export."""
+    state = read_progress(EXPORT_PROGRESS_DIR, sanitize_filename(export_id))
+    if state is None:
+        return jsonify({"error": "Unknown export"}), 404
+    return jsonify(state)
+
+
+# Sist, när alla routes och uppvärmningssteg är registrerade
+WARMUP.begin(STARTUP_WARMUP)
 
 
 if __name__ == "__main__":
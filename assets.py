@@ -0,0 +1,203 @@
+"""
+Fingeravtryckta statiska filer.
+
+`build()` kopierar filerna i static/ till static/dist/ med en innehållshash
+i filnamnet (style.3f2a1b9c0d.css), skriver gzip- och (om paketet `brotli`
+finns) brotli-komprimerade varianter av textfiler och en manifest.json som
+mappar originalnamn till hashat namn. Referenser till /static/... i CSS och
+JS skrivs om till de hashade adresserna.
+
+Appen läser manifestet via AssetManifest och serverar filerna under
+/assets/ med `Cache-Control: immutable`; filnamnet ändras när innehållet
+ändras. Saknas manifestet, eller har en källfil ändrats sedan bygget,
+används den vanliga /static/-adressen i stället.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # valfritt beroende
+    brotli = None
+
+MANIFEST_NAME = "manifest.json"
+URL_PREFIX = "/assets/"
+# Filtyper som komprimeras (bilder och typsnitt är redan komprimerade)
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map"}
+# Filtyper vars /static/-referenser skrivs om till hashade adresser
+REWRITABLE = {".css", ".js"}
+# Mindre filer än så här tjänar inget på komprimering
+MIN_COMPRESS_SIZE = 1024
+
+_STATIC_REF = re.compile(r"/static/([\w\-./]+)")
+
+
+def _sources(static_dir, dist_dir):
+    """Relative paths of every file under static_dir, skipping dist_dir and dotfiles."""
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs
+                         if not d.startswith(".") and os.path.join(root, d) != dist_dir)
+        for name in sorted(files):
+            if not name.startswith("."):
+                yield os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, "/")
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _hashed_name(rel, content):
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    base, ext = os.path.splitext(rel)
+    return f"{base}.{digest}{ext}"
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def build(static_dir: str, dist_dir: str = None, prune: bool = True) -> dict:
+    """Build fingerprinted (and precompressed) copies of static_dir; returns the manifest."""
+    dist_dir = dist_dir or os.path.join(static_dir, "dist")
+    sources = list(_sources(static_dir, dist_dir))
+    # Filer som andra filer kan referera till hashas först, CSS/JS sist
+    sources.sort(key=lambda rel: os.path.splitext(rel)[1] in REWRITABLE)
+
+    files = {}
+    for rel in sources:
+        src = os.path.join(static_dir, rel)
+        with open(src, "rb") as f:
+            content = f.read()
+        ext = os.path.splitext(rel)[1].lower()
+        if ext in REWRITABLE:
+            text = content.decode("utf-8")
+            text = _STATIC_REF.sub(
+                lambda m: URL_PREFIX + files[m.group(1)]["path"] if m.group(1) in files else m.group(0), text)
+            content = text.encode("utf-8")
+
+        hashed = _hashed_name(rel, content)
+        _write(os.path.join(dist_dir, hashed), content)
+        entry = {"path": hashed, "size": len(content), "source": _stat_key(src), "encodings": {}}
+
+        if ext in COMPRESSIBLE and len(content) >= MIN_COMPRESS_SIZE:
+            variants = {"gzip": (".gz", gzip.compress(content, compresslevel=9, mtime=0))}
+            if brotli is not None:
+                variants["br"] = (".br", brotli.compress(content, quality=11))
+            for encoding, (suffix, packed) in variants.items():
+                if len(packed) < len(content):
+                    _write(os.path.join(dist_dir, hashed + suffix), packed)
+                    entry["encodings"][encoding] = len(packed)
+        files[rel] = entry
+
+    manifest = {"built": time.time(), "files": files}
+    _write(os.path.join(dist_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    if prune:
+        keep = {MANIFEST_NAME}
+        for entry in files.values():
+            keep.add(entry["path"])
+            keep.update(entry["path"] + {"gzip": ".gz", "br": ".br"}[e] for e in entry["encodings"])
+        for rel in list(_sources(dist_dir, None)):
+            if rel not in keep:
+                os.unlink(os.path.join(dist_dir, rel))
+    return manifest
+
+
+def clean(dist_dir: str):
+    """Remove all built assets."""
+    shutil.rmtree(dist_dir, ignore_errors=True)
+
+
+class AssetManifest:
+    """The built manifest, re-read when it changes.
+
+    Entries whose source file has changed since the build are ignored, so
+    editing static/ during development never serves an outdated copy.
+    Sources and the manifest are stat:ed at most once per `check_interval`.
+    """
+
+    def __init__(self, static_dir: str, dist_dir: str = None, check_interval: float = 2.0):
+        self.static_dir = static_dir
+        self.dist_dir = dist_dir or os.path.join(static_dir, "dist")
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._state = ({}, {}, "")  # (original -> entry, hashed path -> entry, version)
+        self._manifest_key = None
+        self._checked_at = None
+
+    def _current(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return self._state
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return self._state
+            self._state = self._load()
+            self._checked_at = now
+            return self._state
+
+    def _load(self):
+        path = os.path.join(self.dist_dir, MANIFEST_NAME)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return {}, {}, ""
+        files = json.loads(raw).get("files", {})
+        fresh = {}
+        for rel, entry in files.items():
+            try:
+                if _stat_key(os.path.join(self.static_dir, rel)) == entry["source"]:
+                    fresh[rel] = entry
+            except OSError:
+                pass
+        version = hashlib.sha1(raw + ",".join(sorted(fresh)).encode("utf-8")).hexdigest()[:12]
+        return fresh, {e["path"]: e for e in fresh.values()}, version
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the set of served asset URLs changes ('' without a build)."""
+        return self._current()[2]
+
+    def url(self, filename: str):
+        """The fingerprinted URL for a static file, or None if it is not (freshly) built."""
+        entry = self._current()[0].get(filename)
+        return URL_PREFIX + entry["path"] if entry else None
+
+    def lookup(self, hashed_path: str):
+        """(file path, available encodings) for a fingerprinted path, or None."""
+        entry = self._current()[1].get(hashed_path)
+        if entry is None:
+            return None
+        return os.path.join(self.dist_dir, hashed_path), entry["encodings"]
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Pick 'br' or 'gzip' from the available precompressed variants, or None."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
@@ -0,0 +1,221 @@
+"""
+Autospara: redigerarens små slotändringar samlas till en sparning.
+
+Redigeraren skickar bara de platser som ändrats sedan förra bekräftade
+synkningen till /autosave, märkta med revisionsnummer: `base` är den
+revision klienten utgår från och `rev` den nya. Varje flik har ett eget
+utkast (nyckel: webbläsarsessionen och flikens utkast-id) i en liten
+SQLite-tabell som alla arbetsprocesser delar, så en ändring kostar en
+uppdaterad rad i stället för en ny fil i lagringen.
+
+Snabba ändringar i följd (flera drag-and-drop) slås ihop på servern:
+utkastet sparas i den vanliga lagringen först när det varit oförändrat i
+`debounce` sekunder, eller senast `max_delay` sekunder efter den första
+osparade ändringen. När fliken stängs skickar redigeraren hela layouten
+med `flush`, och då sparas den direkt. Utkast utan gruppnamn sparas inte.
+
+Utgår en ändring från en annan revision än utkastets (t.ex. när ett svar
+gick förlorat) avvisas den med utkastets aktuella innehåll, så att
+klienten kan räkna om skillnaden; ingen ändring tillämpas två gånger.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class DraftConflict(Exception):
+    """A diff was based on another revision than the draft's; carries the draft's current state."""
+
+    def __init__(self, state: dict):
+        super().__init__("draft is at revision %d" % state["rev"])
+        self.state = state
+
+
+class DraftStore:
+    """Per-tab drafts shared by all worker processes, saved to the save store after a quiet period.
+
+    `persist(data)` is called with the frontpage document ({groupName,
+    slots, timestamp, session}) and returns the filename it was saved as.
+    Drafts untouched for `max_age` seconds are deleted once saved.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS drafts (
+            key         TEXT PRIMARY KEY,
+            rev         INTEGER NOT NULL,
+            group_name  TEXT NOT NULL DEFAULT '',
+            session     TEXT,
+            slots       TEXT NOT NULL,
+            changed     REAL NOT NULL,
+            dirty_since REAL,
+            filename    TEXT
+        );
+        CREATE INDEX IF NOT EXISTS drafts_dirty ON drafts (dirty_since);
+    """
+    _SELECT = "SELECT rev, group_name, slots, dirty_since, filename, changed FROM drafts WHERE key = ?"
+
+    def __init__(self, db_path: str, persist, debounce: float = 10.0, max_delay: float = 60.0,
+                 max_age: float = 12 * 3600, interval: float = 1.0):
+        self.db_path = db_path
+        self.persist = persist
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_age = max_age
+        self.interval = interval
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pruned_at = 0.0
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ensure_thread(self):
+        # Startas vid första ändringen i varje process (en tråd överlever inte fork i serve.py)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush_due()
+            except Exception:
+                pass  # tråden får inte dö; utkastet är kvar och sparas nästa varv
+
+    @staticmethod
+    def _state(row) -> dict:
+        rev, group_name, slots, dirty_since, filename = row[:5]
+        return {"rev": rev, "groupName": group_name, "slots": json.loads(slots),
+                "pending": dirty_since is not None, "filename": filename}
+
+    def get(self, key: str):
+        """The draft's state ({rev, groupName, slots, pending, filename}), or None."""
+        row = self._connect().execute(self._SELECT, (key,)).fetchone()
+        return self._state(row) if row else None
+
+    def apply(self, key: str, base: int, rev: int, changes: dict, group_name: str = None, session: str = None,
+              full: bool = False) -> dict:
+        """Apply slot changes made on top of revision `base` as revision `rev`; returns the new state.
+
+        With `full=True`, `changes` is the whole layout and replaces the
+        draft whatever its revision, as long as `rev` is newer. Raises
+        DraftConflict when the draft is not at `base` (or already past `rev`).
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(self._SELECT, (key,)).fetchone()
+            current = self._state(row) if row else {
+                "rev": 0, "groupName": "", "slots": {}, "pending": False, "filename": None}
+            if rev <= current["rev"] or (not full and base != current["rev"]):
+                raise DraftConflict(current)
+            slots = dict(changes) if full else {**current["slots"], **changes}
+            group_name = current["groupName"] if group_name is None else group_name
+            dirty_since, changed = (row[3], row[5]) if row else (None, now)
+            if slots != current["slots"] or group_name != current["groupName"]:
+                # Tiden för den senaste ändringen styr fördröjningen, den första osparade taket
+                changed = now
+                dirty_since = now if dirty_since is None else dirty_since
+            conn.execute(
+                "INSERT OR REPLACE INTO drafts (key, rev, group_name, session, slots, changed, dirty_since, filename)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, rev, group_name, session, json.dumps(slots, ensure_ascii=False, sort_keys=True), changed,
+                 dirty_since, current["filename"]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._ensure_thread()
+        return {"rev": rev, "groupName": group_name, "slots": slots, "pending": dirty_since is not None,
+                "filename": current["filename"]}
+
+    def _claim(self, key: str, force: bool, now: float):
+        """Mark a dirty draft as saved and return (document, dirty_since), or None if nothing is due."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT group_name, session, slots, changed, dirty_since FROM drafts"
+                " WHERE key = ? AND dirty_since IS NOT NULL AND group_name != ''", (key,)).fetchone()
+            due = row is not None and (force or row[3] <= now - self.debounce or row[4] <= now - self.max_delay)
+            if due:
+                conn.execute("UPDATE drafts SET dirty_since = NULL WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if not due:
+            return None
+        group_name, session, slots, _, dirty_since = row
+        data = {"groupName": group_name, "slots": json.loads(slots),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))}
+        if session is not None:
+            data["session"] = session
+        return data, dirty_since
+
+    def flush(self, key: str, force: bool = False):
+        """Save the draft now if it is due (or has unsaved changes, with `force`); returns the filename or None."""
+        now = time.time()
+        claimed = self._claim(key, force, now)
+        if claimed is None:
+            return None
+        data, dirty_since = claimed
+        try:
+            filename = self.persist(data)
+        except Exception:
+            # Markera utkastet som osparat igen, om det inte hunnit ändras under tiden
+            with self._connect() as conn:
+                conn.execute("UPDATE drafts SET dirty_since = ? WHERE key = ? AND dirty_since IS NULL",
+                             (dirty_since, key))
+            raise
+        with self._connect() as conn:
+            conn.execute("UPDATE drafts SET filename = ? WHERE key = ?", (filename, key))
+        return filename
+
+    def flush_due(self, force: bool = False) -> int:
+        """Save every draft whose quiet period (or max delay) has passed; returns the number saved."""
+        now = time.time()
+        conn = self._connect()
+        if force:
+            rows = conn.execute("SELECT key FROM drafts WHERE dirty_since IS NOT NULL AND group_name != ''")
+        else:
+            rows = conn.execute(
+                "SELECT key FROM drafts WHERE dirty_since IS NOT NULL AND group_name != ''"
+                " AND (changed <= ? OR dirty_since <= ?)", (now - self.debounce, now - self.max_delay))
+        saved = 0
+        for (key,) in rows.fetchall():
+            try:
+                saved += self.flush(key, force) is not None
+            except Exception:
+                continue  # utkastet är markerat som osparat igen och försöks nästa varv
+        if now - self._pruned_at > 60:
+            self._pruned_at = now
+            conn.execute("DELETE FROM drafts WHERE changed < ? AND (dirty_since IS NULL OR group_name = '')",
+                         (now - self.max_age,))
+        return saved
+
+    def pending(self) -> int:
+        """Number of drafts with changes not yet saved."""
+        return self._connect().execute("SELECT COUNT(*) FROM drafts WHERE dirty_since IS NOT NULL").fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
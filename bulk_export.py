@@ -0,0 +1,150 @@
+"""
+Klassexport - alla sparade framsidor från en session eller ett tidsfönster.
+
+Framsidorna renderas parallellt via PdfRenderer och levereras antingen som
+en ZIP med en PDF per grupp, som strömmas ut allteftersom PDF:erna blir
+klara, eller som en sammanslagen PDF, som slås ihop av de färdiga PDF:erna.
+Förloppet skrivs till en liten JSON-fil per export så att det kan läsas från
+vilken arbetsprocess som helst.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+
+
+class ExportProgress:
+    """File-backed progress record for one export (readable across processes)."""
+
+    def __init__(self, progress_dir: str, export_id: str, total: int, fmt: str):
+        self.path = progress_path(progress_dir, export_id)
+        self.state = {
+            "id": export_id,
+            "format": fmt,
+            "status": "running",
+            "total": total,
+            "done": 0,
+            "started": time.time(),
+            "finished": None,
+            "error": None,
+        }
+        os.makedirs(progress_dir, exist_ok=True)
+        self._write()
+
+    def _write(self):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def step(self, n: int = 1):
+        self.state["done"] += n
+        self._write()
+
+    def finish(self):
+        self.state.update(status="done", done=self.state["total"], finished=time.time())
+        self._write()
+
+    def fail(self, error: str):
+        self.state.update(status="failed", error=error, finished=time.time())
+        self._write()
+
+
+def progress_path(progress_dir: str, export_id: str) -> str:
+    return os.path.join(progress_dir, export_id + ".json")
+
+
+def read_progress(progress_dir: str, export_id: str):
+    """Return the progress dict for `export_id`, or None if unknown."""
+    try:
+        with open(progress_path(progress_dir, export_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pdf_name(record: dict, used: set) -> str:
+    """A unique, filesystem-safe archive name for one saved frontpage."""
+    base = re.sub(r"[^\w\-]+", "_", record.get("groupName") or "okand").strip("_") or "okand"
+    name = base + ".pdf"
+    n = 2
+    while name in used:
+        name = f"{base}_{n}.pdf"
+        n += 1
+    used.add(name)
+    return name
+
+
+class _ChunkSink:
+    """Minimal write-only, non-seekable file object that collects bytes for streaming."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+def iter_zip(renderer, jobs, progress=None, window: int = None):
+    """Yield a ZIP archive of rendered PDFs chunk by chunk.
+
+    `jobs` is a list of (archive_name, html). At most `window` renders are
+    outstanding at once and each PDF is added as soon as it is done, so
+    memory holds one PDF at a time rather than the whole archive.
+    """
+    sink = _ChunkSink()
+    try:
+        # PDF:er är redan komprimerade - lagra dem okomprimerade i arkivet
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+            for index, path in renderer.render_each([html for _, html in jobs], window):
+                zf.write(path, arcname=jobs[index][0])
+                if progress is not None:
+                    progress.step()
+                yield from sink.drain()
+        yield from sink.drain()
+    except BaseException as e:
+        if progress is not None:
+            progress.fail(str(e) or type(e).__name__)
+        raise
+    if progress is not None:
+        progress.finish()
+
+
+def merged_pdf(renderer, jobs, progress=None):
+    """Start rendering `jobs` into one merged PDF; returns a Future resolving to its path.
+
+    Each frontpage is rendered separately and `progress` steps as each one
+    is done; it is finished (or failed) together with the Future.
+    """
+    future = renderer.submit_merged([html for _, html in jobs],
+                                    on_rendered=progress.step if progress is not None else None)
+    if progress is not None:
+        def done(f):
+            if f.exception() is None:
+                progress.finish()
+            else:
+                progress.fail(str(f.exception()) or type(f.exception()).__name__)
+
+        future.add_done_callback(done)
+    return future
+
+
+def iter_file(path: str, chunk_size: int = 64 * 1024):
+    """Yield a file's content in chunks."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,687 @@
+"""
+Bygge av redigerarens JavaScript från src/js/ till static/script.js.
+
+Modulerna i src/js skrivs med `import`/`export` och paketeras till en enda
+fil med en liten require-funktion. Varje modul delas upp i tokens (så att
+strängar, mallsträngar, reguljära uttryck och kommentarer aldrig tolkas
+som kod), och importer och exporter skrivs om på tokennivå.
+
+- Resultatet för varje modul cachas med en hash av källfilen som nyckel,
+  så en ombyggnad läser och bearbetar bara de filer som ändrats.
+- Exporter som ingen annan modul använder tas bort, liksom funktioner på
+  toppnivå som då inte längre anropas (tree shaking). Moduler som inte nås
+  från startmodulen tas inte med.
+- Kommentarer och indrag tas bort och rader slås ihop där det är säkert
+  (efter `;`, `{`, `,` med flera), men en radbrytning som kan vara ett
+  underförstått semikolon behålls alltid.
+- En källkarta (static/script.js.map) pekar tillbaka på src/js, och
+  tools/build_assets.py ger både paketet och kartan hashade namn.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+
+# Ändras när omskrivningen eller minifieringen ändras, så att gammal cache inte används
+BUNDLER_VERSION = 1
+
+Token = namedtuple("Token", "kind text line col")
+
+_PUNCTUATORS = sorted((
+    ">>>=", "...", "===", "!==", "**=", "<<=", ">>=", ">>>", "&&=", "||=", "??=",
+    "=>", "==", "!=", "<=", ">=", "&&", "||", "??", "?.", "++", "--", "+=", "-=", "*=", "/=", "%=",
+    "&=", "|=", "^=", "**", "<<", ">>",
+), key=len, reverse=True)
+_IDENT = re.compile(r"[A-Za-z0-9_$\u0080-\uffff]+")
+_NUMBER = re.compile(r"0[xXoObB][0-9a-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?")
+_SPACE = " \t\r\f\v\ufeff\u00a0"
+# Efter dessa ord börjar ett uttryck, så ett / där inleder ett reguljärt uttryck
+_KEYWORDS_BEFORE_EXPRESSION = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else",
+    "yield", "await",
+}
+# En radbrytning efter dessa tecken kan aldrig bli ett underförstått semikolon
+_JOIN_AFTER = {";", "{", ",", "(", "[", "=", "=>", ":", "?", "&&", "||", "??"}
+
+
+class BundleError(ValueError):
+    """A module could not be parsed or uses syntax the bundler does not support."""
+
+
+def _scan_string(src, i):
+    quote = src[i]
+    j = i + 1
+    while j < len(src):
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == quote:
+            return j + 1
+        if c == "\n":
+            break
+        j += 1
+    raise BundleError(f"unterminated string on line {src.count(chr(10), 0, i) + 1}")
+
+
+def _scan_template(src, i):
+    j = i + 1
+    while j < len(src):
+        c = src[j]
+        if c == "\\":
+            j += 2
+        elif c == "`":
+            return j + 1
+        elif src.startswith("${", j):
+            j = _scan_substitution(src, j + 2)
+        else:
+            j += 1
+    raise BundleError(f"unterminated template literal on line {src.count(chr(10), 0, i) + 1}")
+
+
+def _scan_substitution(src, j):
+    """Index just after the `}` closing a ${...} that starts at j."""
+    depth = 1
+    while j < len(src):
+        c = src[j]
+        if c in "'\"":
+            j = _scan_string(src, j)
+            continue
+        if c == "`":
+            j = _scan_template(src, j)
+            continue
+        if src.startswith("//", j):
+            j = src.find("\n", j)
+            j = len(src) if j < 0 else j
+            continue
+        if src.startswith("/*", j):
+            end = src.find("*/", j + 2)
+            j = len(src) if end < 0 else end + 2
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    raise BundleError("unterminated ${...} in template literal")
+
+
+def _scan_regex(src, i):
+    j = i + 1
+    in_class = False
+    while j < len(src):
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "\n":
+            break
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            j += 1
+            while j < len(src) and (src[j].isalnum() or src[j] == "_"):
+                j += 1
+            return j
+        j += 1
+    raise BundleError(f"unterminated regular expression on line {src.count(chr(10), 0, i) + 1}")
+
+
+def _regex_allowed(prev):
+    if prev is None:
+        return True
+    if prev.kind == "ident":
+        return prev.text in _KEYWORDS_BEFORE_EXPRESSION
+    if prev.kind == "punct":
+        return prev.text not in (")", "]", "}", "++", "--")
+    return False
+
+
+def tokenize(src: str, line: int = 1) -> list:
+    """Split JavaScript source into Tokens (kinds: nl ws comment string template regex ident num punct)."""
+    tokens = []
+    i, n = 0, len(src)
+    line_start = 0
+    prev = None  # senaste token som inte är blanktecken eller kommentar
+    while i < n:
+        c = src[i]
+        if c == "\n":
+            j, kind = i + 1, "nl"
+        elif c in _SPACE:
+            j = i + 1
+            while j < n and src[j] in _SPACE:
+                j += 1
+            kind = "ws"
+        elif src.startswith("//", i):
+            j = src.find("\n", i)
+            j, kind = (n if j < 0 else j), "comment"
+        elif src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            if end < 0:
+                raise BundleError(f"unterminated comment on line {line}")
+            j, kind = end + 2, "comment"
+        elif c in "'\"":
+            j, kind = _scan_string(src, i), "string"
+        elif c == "`":
+            j, kind = _scan_template(src, i), "template"
+        elif c == "/" and _regex_allowed(prev):
+            j, kind = _scan_regex(src, i), "regex"
+        elif c.isdigit() or (c == "." and i + 1 < n and src[i + 1].isdigit()):
+            j, kind = _NUMBER.match(src, i).end(), "num"
+        elif _IDENT.match(src, i):
+            j, kind = _IDENT.match(src, i).end(), "ident"
+        else:
+            j = i + next((len(p) for p in _PUNCTUATORS if src.startswith(p, i)), 1)
+            kind = "punct"
+        text = src[i:j]
+        token = Token(kind, text, line, i - line_start)
+        tokens.append(token)
+        if kind not in ("nl", "ws", "comment"):
+            prev = token
+        newlines = text.count("\n")
+        if newlines:
+            line += newlines
+            line_start = i + text.rindex("\n") + 1
+        i = j
+    return tokens
+
+
+def _significant(tokens, i):
+    """Index of the first token at or after i that is not whitespace or a comment."""
+    while i < len(tokens) and tokens[i].kind in ("nl", "ws", "comment"):
+        i += 1
+    return i
+
+
+def _expect(tokens, i, kind, text=None, what=""):
+    i = _significant(tokens, i)
+    if i >= len(tokens) or tokens[i].kind != kind or (text is not None and tokens[i].text != text):
+        line = tokens[min(i, len(tokens) - 1)].line if tokens else 1
+        raise BundleError(f"line {line}: expected {what or text or kind}")
+    return i
+
+
+def _name_list(tokens, i):
+    """Parse `{ a, b as c }` starting at the `{`; returns ([(name, alias)], index after `}`)."""
+    names = []
+    i = _expect(tokens, i, "punct", "{") + 1
+    while True:
+        i = _significant(tokens, i)
+        if i < len(tokens) and tokens[i].text == "}":
+            return names, i + 1
+        i = _expect(tokens, i, "ident", what="a name")
+        name = alias = tokens[i].text
+        i = _significant(tokens, i + 1)
+        if i < len(tokens) and tokens[i].text == "as":
+            i = _expect(tokens, i + 1, "ident", what="a name after 'as'")
+            alias = tokens[i].text
+            i = _significant(tokens, i + 1)
+        names.append((name, alias))
+        if i < len(tokens) and tokens[i].text == ",":
+            i += 1
+
+
+def _path_after(tokens, i):
+    i = _expect(tokens, i, "string", what="a module path")
+    j = _significant(tokens, i + 1)
+    end = j + 1 if j < len(tokens) and tokens[j].text == ";" else i + 1
+    return tokens[i].text[1:-1], end
+
+
+def _synthetic(text, at, removed):
+    """Tokens for `text` placed at token `at`, followed by the newlines of the removed span."""
+    out = [t._replace(line=at.line, col=at.col) for t in tokenize(text)]
+    out.extend(Token("nl", "\n", at.line, at.col) for t in removed for _ in range(t.text.count("\n")))
+    return out
+
+
+def transform(src: str) -> dict:
+    """Rewrite a module's imports and exports to require()/exports.
+
+    Returns {"tokens", "exports": [[local, exported]], "imports": {path:
+    [names]}, "requires": [paths]}. Line numbers are preserved so the
+    source map stays exact.
+    """
+    tokens = tokenize(src)
+    out, exports, imports, requires = [], [], {}, []
+    prev = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        at_statement = prev is None or prev.text in (";", "}")
+        if token.kind == "ident" and token.text == "import" and at_statement and \
+                _significant(tokens, i + 1) < len(tokens) and tokens[_significant(tokens, i + 1)].text != "(":
+            j = _significant(tokens, i + 1)
+            if tokens[j].kind == "string":
+                path, end = _path_after(tokens, j)
+                code = f'require("{path}");'
+            elif tokens[j].text == "{":
+                names, j = _name_list(tokens, j)
+                _expect(tokens, j, "ident", "from")
+                path, end = _path_after(tokens, _significant(tokens, j) + 1)
+                imports.setdefault(path, []).extend(name for name, _ in names)
+                code = "const { %s } = require(\"%s\");" % (
+                    ", ".join(name if name == alias else f"{name}: {alias}" for name, alias in names), path)
+            else:
+                if tokens[j].text == "*":
+                    j = _expect(tokens, j + 1, "ident", "as")
+                    j = _significant(tokens, j + 1)
+                    imports.setdefault("*", [])
+                j = _expect(tokens, j, "ident", what="an import name")
+                local = tokens[j].text
+                from_ = _expect(tokens, j + 1, "ident", "from")
+                path, end = _path_after(tokens, from_ + 1)
+                imports.setdefault(path, []).append("*")
+                code = f'const {local} = require("{path}");'
+            if path not in requires:
+                requires.append(path)
+            out.extend(_synthetic(code, token, tokens[i:end]))
+            prev = out[-1] if out else prev
+            i = end
+            continue
+        if token.kind == "ident" and token.text == "export" and at_statement:
+            j = _significant(tokens, i + 1)
+            head = tokens[j].text if j < len(tokens) else ""
+            if head == "default":
+                raise BundleError(f"line {token.line}: 'export default' is not supported, use a named export")
+            if head == "{":
+                names, end = _name_list(tokens, j)
+                exports.extend([name, alias] for name, alias in names)
+                end = end + 1 if end < len(tokens) and tokens[end].text == ";" else end
+                out.extend(_synthetic("", token, tokens[i:end]))
+                i = end
+                continue
+            k = j
+            if head == "async":
+                k = _significant(tokens, j + 1)
+            if tokens[k].text not in ("function", "const", "let", "var", "class"):
+                raise BundleError(f"line {token.line}: unsupported export")
+            name = _expect(tokens, k + 1, "ident", what="an exported name")
+            exports.append([tokens[name].text, tokens[name].text])
+            i = j  # hoppa över `export` och blanktecknen efter
+            continue
+        out.append(token)
+        if token.kind not in ("nl", "ws", "comment"):
+            prev = token
+        i += 1
+    return {"tokens": out, "exports": exports, "imports": imports, "requires": requires}
+
+
+def _top_level_functions(tokens):
+    """[(name, start, end)] for function declarations at the top level of a module (end inclusive)."""
+    found = []
+    depth = 0
+    prev = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == "punct":
+            depth += token.text == "{"
+            depth -= token.text == "}"
+        if depth == 0 and token.kind == "ident" and token.text in ("function", "async") and \
+                (prev is None or prev.text in (";", "}")):
+            start = i
+            j = _significant(tokens, i + 1)
+            if token.text == "async":
+                if j >= len(tokens) or tokens[j].text != "function":
+                    prev = token
+                    i += 1
+                    continue
+                j = _significant(tokens, j + 1)
+            if j < len(tokens) and tokens[j].text == "*":
+                j = _significant(tokens, j + 1)
+            if j < len(tokens) and tokens[j].kind == "ident":
+                name = tokens[j].text
+                end = _matching(tokens, _matching(tokens, _expect(tokens, j + 1, "punct", "(")) + 1, "{")
+                found.append((name, start, end))
+                prev = tokens[end]
+                i = end + 1
+                continue
+        if token.kind not in ("nl", "ws", "comment"):
+            prev = token
+        i += 1
+    return found
+
+
+def _matching(tokens, i, opener=None):
+    """Index of the bracket closing the one at i (the next `opener` at or after i if given)."""
+    if opener is not None:
+        i = _expect(tokens, i, "punct", opener)
+    pairs = {"(": ")", "{": "}", "[": "]"}
+    open_, close = tokens[i].text, pairs[tokens[i].text]
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].kind == "punct":
+            if tokens[j].text == open_:
+                depth += 1
+            elif tokens[j].text == close:
+                depth -= 1
+                if depth == 0:
+                    return j
+    raise BundleError(f"line {tokens[i].line}: unbalanced '{open_}'")
+
+
+def references(tokens) -> dict:
+    """{identifier: number of occurrences} in a token list."""
+    counts = {}
+    for token in tokens:
+        if token.kind == "ident":
+            counts[token.text] = counts.get(token.text, 0) + 1
+    return counts
+
+
+def shake(tokens, exports, keep) -> tuple:
+    """Drop unused exports and the top-level functions nothing else refers to.
+
+    `exports` is [[local, exported]], `keep` the exported names other
+    modules use. Returns (tokens with an exports trailer, removed names).
+    """
+    last = tokens[-1] if tokens else Token("nl", "\n", 1, 0)
+    trailer = []
+    for local, exported in exports:
+        if exported in keep:
+            trailer.extend(_synthetic(f"\nexports.{exported} = {local};", last, ()))
+    tokens = list(tokens) + trailer
+    removed = [exported for _, exported in exports if exported not in keep]
+    while True:
+        counts = references(tokens)
+        dead = None
+        for name, start, end in _top_level_functions(tokens):
+            inside = references(tokens[start:end + 1]).get(name, 0)
+            if counts.get(name, 0) - inside == 0:
+                dead = (name, start, end)
+                break
+        if dead is None:
+            return tokens, removed
+        name, start, end = dead
+        if name not in removed:
+            removed.append(name)
+        tokens = tokens[:start] + tokens[end + 1:]
+
+
+def _needs_space(prev, token):
+    a, b = prev.text[-1], token.text[0]
+    if (a.isalnum() or a in "_$" or ord(a) > 127) and (b.isalnum() or b in "_$" or ord(b) > 127):
+        return True
+    if a in "+-" and b == a:
+        return True
+    if a == "/" and b == "/":
+        return True
+    return prev.kind == "num" and b == "."
+
+
+def minify(tokens) -> list:
+    """[(text, token or None)]: the tokens without comments and needless whitespace."""
+    out = []
+    prev = None
+    newline = space = False
+    for token in tokens:
+        if token.kind == "nl" or (token.kind == "comment" and "\n" in token.text):
+            newline = True
+            continue
+        if token.kind in ("ws", "comment"):
+            space = True
+            continue
+        if prev is not None and (newline or space):
+            if newline and not (prev.kind == "punct" and prev.text in _JOIN_AFTER):
+                out.append(("\n", None))
+            elif _needs_space(prev, token):
+                out.append((" ", None))
+        out.append((token.text, token))
+        prev = token
+        newline = space = False
+    return out
+
+
+def plain(tokens) -> list:
+    """Like minify() but keeping the source as written."""
+    return [(token.text, token if token.kind not in ("nl", "ws", "comment") else None) for token in tokens]
+
+
+_VLQ_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def _vlq(value):
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    out = ""
+    while True:
+        digit, value = value & 31, value >> 5
+        out += _VLQ_CHARS[digit | (32 if value else 0)]
+        if not value:
+            return out
+
+
+class SourceMapBuilder:
+    """Collects output text and position mappings into a version 3 source map."""
+
+    def __init__(self):
+        self.parts = []
+        self.lines = [[]]  # per utdatarad: [(kolumn, källa, rad, kolumn)]
+        self.col = 0
+        self.sources, self.contents = [], []
+
+    def add_source(self, name, content) -> int:
+        self.sources.append(name)
+        self.contents.append(content)
+        return len(self.sources) - 1
+
+    def write(self, text, source=None, token=None):
+        if token is not None and source is not None:
+            last = self.lines[-1][-1] if self.lines[-1] else None
+            # En mappning per utdatarad och källrad räcker för felsökning och håller kartan liten
+            if last is None or last[1] != source or last[2] != token.line - 1:
+                self.lines[-1].append((self.col, source, token.line - 1, token.col))
+        self.parts.append(text)
+        for piece in text.split("\n")[1:]:
+            self.lines.append([])
+            self.col = len(piece)
+        if "\n" not in text:
+            self.col += len(text)
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def mappings(self) -> str:
+        state = [0, 0, 0]  # källa, rad, kolumn (relativt föregående segment)
+        lines = []
+        for segments in self.lines:
+            previous_col = 0
+            encoded = []
+            for col, source, line, source_col in segments:
+                encoded.append(_vlq(col - previous_col) + _vlq(source - state[0])
+                               + _vlq(line - state[1]) + _vlq(source_col - state[2]))
+                previous_col = col
+                state = [source, line, source_col]
+            lines.append(",".join(encoded))
+        return ";".join(lines)
+
+    def source_map(self, filename) -> dict:
+        return {"version": 3, "file": filename, "sources": self.sources, "sourcesContent": self.contents,
+                "names": [], "mappings": self.mappings()}
+
+
+_RUNTIME_HEAD = ("(function(){var __modules={},__cache={};function __require(name){"
+                 "if(__cache[name])return __cache[name].exports;var module={exports:{}};__cache[name]=module;"
+                 "__modules[name](__require,module,module.exports);return module.exports}\n")
+
+
+class Bundler:
+    """Builds src_dir/<entry> and everything it imports into one script, caching per module.
+
+    `cache_path` is a JSON file holding the transformed and the minified
+    form of each module keyed by the hash of its source.
+    """
+
+    def __init__(self, src_dir: str, out_path: str, entry: str = "./main.js", cache_path: str = None,
+                 minify: bool = True, source_root: str = "src/js"):
+        self.src_dir = src_dir
+        self.out_path = out_path
+        self.entry = entry
+        self.cache_path = cache_path
+        self.minify = minify
+        self.source_root = source_root
+        self._cache = None
+
+    def _load_cache(self):
+        if self._cache is not None:
+            return self._cache
+        self._cache = {"version": BUNDLER_VERSION, "modules": {}, "outputs": {}}
+        if self.cache_path:
+            try:
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if cached.get("version") == BUNDLER_VERSION:
+                    self._cache = cached
+            except (OSError, ValueError):
+                pass
+        return self._cache
+
+    def _save_cache(self, used_modules, used_outputs):
+        cache = self._cache
+        cache["modules"] = {k: v for k, v in cache["modules"].items() if k in used_modules}
+        cache["outputs"] = {k: v for k, v in cache["outputs"].items() if k in used_outputs}
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    def sources(self) -> dict:
+        """{'./name.js': path} for every .js file under src_dir."""
+        found = {}
+        for root, dirs, files in os.walk(self.src_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".js"):
+                    path = os.path.join(root, name)
+                    found["./" + os.path.relpath(path, self.src_dir).replace(os.sep, "/")] = path
+        return found
+
+    def build(self, write: bool = True) -> dict:
+        """Bundle, write the script and its source map if they changed, and return a report.
+
+        The report lists per module the source size, the size in the
+        bundle (and gzipped), removed exports and functions, and whether it
+        came from the cache.
+        """
+        cache = self._load_cache()
+        files = self.sources()
+        if self.entry not in files:
+            raise BundleError(f"entry module {self.entry} not found in {self.src_dir}")
+
+        # Läs och skriv om (eller hämta ur cachen) modulerna som nås från startmodulen
+        modules, digests, texts, cached = {}, {}, {}, set()
+        queue = [self.entry]
+        while queue:
+            name = queue.pop(0)
+            if name in modules:
+                continue
+            if name not in files:
+                raise BundleError(f"module {name} not found in {self.src_dir}")
+            with open(files[name], "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            texts[name] = raw.decode("utf-8")
+            entry = cache["modules"].get(digest)
+            if entry is None:
+                try:
+                    result = transform(texts[name])
+                except BundleError as e:
+                    raise BundleError(f"{name}: {e}") from None
+                entry = {**result, "tokens": [list(t) for t in result["tokens"]]}
+                cache["modules"][digest] = entry
+            else:
+                cached.add(name)
+            modules[name] = {**entry, "tokens": [Token(*t) for t in entry["tokens"]]}
+            digests[name] = digest
+            queue.extend(p for p in entry["requires"] if p not in modules)
+
+        # Vilka exporter används? Upprepa tills inget mer kan tas bort
+        keep = {name: {exported for _, exported in m["exports"]} for name, m in modules.items()}
+        while True:
+            shaken = {name: shake(m["tokens"], m["exports"], keep[name]) for name, m in modules.items()}
+            used = {name: set() for name in modules}
+            for name, m in modules.items():
+                counts = references(shaken[name][0])
+                for path, names in m["imports"].items():
+                    if path not in used:
+                        continue
+                    if "*" in names:
+                        used[path].update(exported for _, exported in modules[path]["exports"])
+                    # Ett namn som bara förekommer i själva importen används inte
+                    used[path].update(n for n in names if n != "*" and counts.get(n, 0) > names.count(n))
+            if used == keep:
+                break
+            keep = used
+
+        builder = SourceMapBuilder()
+        builder.write(_RUNTIME_HEAD)
+        report = {"modules": [], "output": self.out_path}
+        used_outputs = set()
+        for name in sorted(modules):
+            key = f"{digests[name]}:{int(self.minify)}:" + ",".join(sorted(keep[name]))
+            used_outputs.add(key)
+            output = cache["outputs"].get(key)
+            if output is None:
+                tokens, removed = shaken[name]
+                pieces = minify(tokens) if self.minify else plain(tokens)
+                output = {"pieces": [[text, [t.line, t.col] if t else None] for text, t in pieces],
+                          "removed": removed}
+                cache["outputs"][key] = output
+                cached.discard(name)
+            source = builder.add_source(self.source_root.rstrip("/") + "/" + name[2:], texts[name])
+            start = len(builder.text())
+            builder.write("__modules['%s']=function(require,module,exports){\n" % name)
+            body = []
+            for text, position in output["pieces"]:
+                body.append(text)
+                builder.write(text, source, Token("", text, position[0], position[1]) if position else None)
+            builder.write("\n};\n")
+            code = "".join(body).encode("utf-8")
+            report["modules"].append({
+                "module": name,
+                "source": len(texts[name].encode("utf-8")),
+                "output": len(builder.text()) - start,
+                "gzip": len(gzip.compress(code, mtime=0)),
+                "removed": output["removed"],
+                "cached": name in cached,
+            })
+        builder.write("__require('%s');})();\n" % self.entry)
+
+        map_name = os.path.basename(self.out_path) + ".map"
+        script = builder.text() + f"//# sourceMappingURL=/static/{map_name}\n"
+        source_map = json.dumps(builder.source_map(os.path.basename(self.out_path)), ensure_ascii=False,
+                                separators=(",", ":"))
+        report["size"] = len(script.encode("utf-8"))
+        report["gzip"] = len(gzip.compress(script.encode("utf-8"), mtime=0))
+        report["changed"] = False
+        if write:
+            report["changed"] = _write_if_changed(self.out_path, script)
+            _write_if_changed(self.out_path + ".map", source_map)
+        self._save_cache(set(digests.values()), used_outputs)
+        return report
+
+
+def _write_if_changed(path, text) -> bool:
+    """Write `text` atomically unless the file already has exactly that content."""
+    content = text.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
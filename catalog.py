@@ -0,0 +1,182 @@
+"""
+Artikelkatalog - laddar data/articles.json en gång och håller den i minnet.
+
+Filen kan också vara en katalog som förkompilerats med
+tools/compile_catalog.py; den är redan kategoriserad och läses som den är.
+
+Katalogen läses om först när filens mtime/storlek ändras, och exponerar en
+versionssträng som resten av appen kan använda i cache-nycklar. Sökindexet
+(search.py) uppdateras i samma veva med de artiklar som ändrats.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from catalog_compiler import COMPILED_FORMAT
+from categories import classify_many
+from metrics import stage
+from search import SearchIndex
+
+# Fält som redaktörssidan behöver för att lista och placera artiklar; resten
+# (brödtext, byline, citat) hämtas vid behov från /api/articles
+SUMMARY_FIELDS = ("id", "category", "headline", "subheadline", "page", "image")
+PACKAGE_FIELDS = ("id", "name", "icon")
+
+# Filnamnet tools/compile_catalog.py skriver till som standard
+COMPILED_FILENAME = "catalog.compiled.json"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """An immutable, fully normalized view of one version of the catalog."""
+
+    articles: list
+    packages: list
+    version: str
+    by_id: dict = field(default_factory=dict)
+    summaries: list = field(default_factory=list)
+    package_summaries: list = field(default_factory=list)
+
+    def get(self, article_id):
+        """Look up an article (main list or package) by id; accepts str or int."""
+        try:
+            return self.by_id.get(int(article_id))
+        except (TypeError, ValueError):
+            return None
+
+
+def parse_catalog(raw: bytes) -> CatalogSnapshot:
+    """Parse and normalize the raw bytes of an articles.json or compiled catalog file."""
+    data = json.loads(raw)
+
+    # Handle both old format (list) and new format (dict with articles and packages)
+    if isinstance(data, list):
+        articles = data
+        packages = []
+    else:
+        articles = data.get("articles", [])
+        packages = data.get("packages", [])
+
+    # Classify main and package articles in one bulk call
+    everything = list(articles)
+    for pkg in packages:
+        everything.extend(pkg.get("articles", []))
+
+    if isinstance(data, dict) and data.get("format") == COMPILED_FORMAT:
+        # Kategorierna bestämdes när katalogen kompilerades
+        categories = [a.get("category") for a in everything]
+    else:
+        with stage("classify"):
+            categories = classify_many(everything)
+    by_id = {}
+    for a, category in zip(everything, categories):
+        a["category"] = category
+        by_id.setdefault(a.get("id"), a)
+
+    package_summaries = [
+        {**{k: pkg[k] for k in PACKAGE_FIELDS if k in pkg},
+         "articles": [summarize(a) for a in pkg.get("articles", [])]}
+        for pkg in packages
+    ]
+
+    version = hashlib.sha1(raw).hexdigest()[:12]
+    return CatalogSnapshot(
+        articles=articles,
+        packages=packages,
+        version=version,
+        by_id=by_id,
+        summaries=[summarize(a) for a in articles],
+        package_summaries=package_summaries,
+    )
+
+
+def summarize(article: dict) -> dict:
+    """The compact form of an article embedded in the editor page."""
+    return {k: article[k] for k in SUMMARY_FIELDS if k in article}
+
+
+def preferred_catalog_file(data_dir: str) -> str:
+    """The compiled catalog in `data_dir` if it is at least as new as articles.json, else articles.json."""
+    source = os.path.join(data_dir, "articles.json")
+    compiled = os.path.join(data_dir, COMPILED_FILENAME)
+    try:
+        compiled_mtime = os.stat(compiled).st_mtime_ns
+    except OSError:
+        return source
+    try:
+        if os.stat(source).st_mtime_ns > compiled_mtime:
+            return source  # articles.json har ändrats efter senaste kompileringen
+    except OSError:
+        pass
+    return compiled
+
+
+class ArticleCatalog:
+    """In-process cache of an articles.json file.
+
+    `snapshot()` returns the current CatalogSnapshot and re-reads the file
+    only when its mtime or size has changed. The file is stat:ed at most once
+    per `check_interval` seconds so the hot path is a dict lookup. `search`
+    is a SearchIndex kept in step with the snapshot.
+
+    With `data_dir` instead of a fixed path the file is picked with
+    preferred_catalog_file() at every check, so editing articles.json after
+    compiling the catalog switches back to the source, and recompiling
+    switches to the compiled file again.
+    """
+
+    def __init__(self, path: str = None, check_interval: float = 1.0, data_dir: str = None):
+        if (path is None) == (data_dir is None):
+            raise TypeError("ArticleCatalog needs exactly one of path and data_dir")
+        self.data_dir = data_dir
+        self.path = path if path is not None else preferred_catalog_file(data_dir)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stat_key = None
+        self._checked_at = 0.0
+        self.search = SearchIndex()
+
+    def _stat(self):
+        if self.data_dir is not None:
+            self.path = preferred_catalog_file(self.data_dir)
+        st = os.stat(self.path)
+        return (self.path, st.st_mtime_ns, st.st_size)
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, reloading if the file has changed."""
+        now = time.monotonic()
+        snap = self._snapshot
+        if snap is not None and now - self._checked_at < self.check_interval:
+            return snap
+
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < self.check_interval:
+                return self._snapshot
+            stat_key = self._stat()
+            if self._snapshot is None or stat_key != self._stat_key:
+                with stage("catalog_load"):
+                    with open(self.path, "rb") as f:
+                        raw = f.read()
+                    snapshot = parse_catalog(raw)
+                # Indexet uppdateras innan den nya versionen syns för andra trådar
+                with stage("search_index"):
+                    self.search.update(snapshot)
+                self._snapshot = snapshot
+                self._stat_key = stat_key
+            self._checked_at = now
+            return self._snapshot
+
+    @property
+    def version(self) -> str:
+        """Version string of the current catalog (changes when the content changes)."""
+        return self.snapshot().version
+
+    def invalidate(self):
+        """Force the next `snapshot()` call to stat the file again."""
+        with self._lock:
+            self._checked_at = 0.0
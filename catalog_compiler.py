@@ -0,0 +1,264 @@
+"""
+Kompilering av artikelflöden till en färdig katalog.
+
+Ett flöde (articles.json i något av formaten `[...]` eller
+`{"articles": [...], "packages": [...]}`, eller JSON Lines med en artikel
+eller ett temapaket per rad) valideras, rubriker och ingresser anpassas
+till teckengränserna (textfit.py) och kategorierna bestäms
+(categories.py). Arbetet görs i omgångar om några hundra artiklar i en
+processpool, och JSON Lines läses rad för rad, så även ett flöde med
+hundratusentals artiklar ryms i minnet.
+
+Resultatet skrivs som en kompakt katalogfil med `"format":
+"tidning-catalog"` som catalog.py läser direkt, utan att kategorisera om.
+Källfilen lämnas orörd. Varje körning ger också en rapport över vad som
+ändrats jämfört med den förra katalogfilen.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from collections import deque
+
+from categories import classify_many
+from textfit import HEADLINE_MAX, SUBHEADLINE_MAX, fit_headline, fit_subheadline
+
+COMPILED_FORMAT = "tidning-catalog"
+COMPILED_FORMAT_VERSION = 1
+
+# Fält som måste vara text om de finns
+TEXT_FIELDS = ("headline", "subheadline", "body", "quote", "quoteSender", "image", "category", "byline")
+
+_COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+class FeedError(ValueError):
+    """The input feed could not be parsed."""
+
+
+class Feed:
+    """An input feed file; iterating yields ("article", dict) and ("package", dict) in order.
+
+    JSON Lines files (.jsonl, .ndjson) are read one line at a time; a line
+    with an "articles" list is a theme package. Plain JSON files are parsed
+    whole. `sha1` is the digest of the file once it has been read through.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sha1 = None
+
+    def __iter__(self):
+        digest = hashlib.sha1()
+        if os.path.splitext(self.path)[1].lower() in (".jsonl", ".ndjson"):
+            with open(self.path, "rb") as f:
+                for number, line in enumerate(f, 1):
+                    digest.update(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError as e:
+                        raise FeedError(f"{self.path}:{number}: {e}") from None
+                    if isinstance(entry, dict) and isinstance(entry.get("articles"), list):
+                        yield "package", entry
+                    else:
+                        yield "article", entry
+        else:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            digest.update(raw)
+            try:
+                data = json.loads(raw)
+            except ValueError as e:
+                raise FeedError(f"{self.path}: {e}") from None
+            if isinstance(data, dict):
+                articles, packages = data.get("articles", []), data.get("packages", [])
+            else:
+                articles, packages = data, []
+            for article in articles:
+                yield "article", article
+            for package in packages:
+                yield "package", package
+        self.sha1 = digest.hexdigest()
+
+
+def validate(article) -> str:
+    """Why `article` cannot be used, or None if it can."""
+    if not isinstance(article, dict):
+        return "inte ett objekt"
+    article_id = article.get("id")
+    if isinstance(article_id, bool) or not isinstance(article_id, int):
+        return f"ogiltigt id {article_id!r}"
+    for name in TEXT_FIELDS:
+        if article.get(name) is not None and not isinstance(article[name], str):
+            return f"{name} är inte text"
+    if not (article.get("headline") or "").strip():
+        return "rubrik saknas"
+    page = article.get("page")
+    if page is not None and (isinstance(page, bool) or not isinstance(page, int)):
+        return f"ogiltigt sidnummer {page!r}"
+    return None
+
+
+def compile_batch(articles: list) -> list:
+    """Validate, fit and classify a batch of articles.
+
+    Returns one (id, article, fitted, error) per input: `article` is the
+    compiled article or None if it was rejected with `error`, and `fitted`
+    lists (field, before, after) for every shortened field. Runs in the
+    worker processes.
+    """
+    results = []
+    valid = []
+    for article in articles:
+        error = validate(article)
+        article_id = article.get("id") if isinstance(article, dict) else None
+        if error is not None:
+            results.append((article_id, None, [], error))
+            continue
+        article = dict(article)
+        fitted = []
+        for name, fit, limit in (("headline", fit_headline, HEADLINE_MAX),
+                                 ("subheadline", fit_subheadline, SUBHEADLINE_MAX)):
+            before = article.get(name)
+            if before:
+                after = fit(before, limit)
+                if after != before:
+                    article[name] = after
+                    # Bara blanktecken runt texten räknas inte som en anpassning
+                    if after != before.strip():
+                        fitted.append((name, before, after))
+        results.append((article_id, article, fitted, None))
+        valid.append(article)
+    for article, category in zip(valid, classify_many(valid)):
+        article["category"] = category
+    return results
+
+
+def _batches(entries, size: int, packages: list):
+    """Group feed entries into (package index or None, [articles]) batches of at most `size`.
+
+    Package metadata (without its articles) is appended to `packages` as
+    the packages are reached.
+    """
+    def articles_of():
+        for kind, entry in entries:
+            if kind == "package":
+                packages.append({k: v for k, v in entry.items() if k != "articles"})
+                for article in entry["articles"]:
+                    yield len(packages) - 1, article
+            else:
+                yield None, entry
+
+    for key, group in itertools.groupby(articles_of(), key=lambda item: item[0]):
+        while True:
+            chunk = [article for _, article in itertools.islice(group, size)]
+            if not chunk:
+                break
+            yield key, chunk
+
+
+def _bounded_map(fn, items, jobs: int):
+    """Like map(fn, items), in order, across `jobs` processes with a bounded number of batches in flight."""
+    items = iter(items)
+    head = list(itertools.islice(items, 2))
+    if jobs <= 1 or len(head) < 2:
+        # En enda omgång är inte värd att starta en processpool för
+        for item in itertools.chain(head, items):
+            yield item, fn(item[1])
+        return
+    # Importeras här så att appen (som bara läser katalogen) slipper multiprocessing vid start
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for item in itertools.chain(head, items):
+            pending.append((item, pool.submit(fn, item[1])))
+            if len(pending) >= jobs * 2:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+
+def _fingerprint(article: dict) -> str:
+    return hashlib.sha1(json.dumps(article, sort_keys=True, **_COMPACT).encode("utf-8")).hexdigest()
+
+
+def _previous_fingerprints(path: str) -> dict:
+    """{article id: fingerprint} of a previously compiled catalog, empty if there is none."""
+    try:
+        with open(path, "rb") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != COMPILED_FORMAT:
+        return {}
+    articles = list(data.get("articles", []))
+    for pkg in data.get("packages", []):
+        articles.extend(pkg.get("articles", []))
+    return {a.get("id"): _fingerprint(a) for a in articles}
+
+
+def compile_catalog(source: str, output: str, jobs: int = 1, batch_size: int = 500, write: bool = True) -> dict:
+    """Compile `source` into the catalog file `output` and return a report.
+
+    The report has counts plus lists of added, removed and changed article
+    ids (relative to the previous `output`), fitted fields and rejected
+    articles. With write=False nothing is written.
+    """
+    previous = _previous_fingerprints(output)
+    seen = set()
+    report = {"source": source, "output": output, "articles": 0, "packages": 0,
+              "added": [], "changed": [], "removed": [], "fitted": [], "rejected": []}
+    package_articles = {}
+
+    tmp = output + ".tmp"
+    out = open(tmp, "w", encoding="utf-8") if write else None
+    try:
+        if out:
+            out.write('{"format":"%s","format_version":%d,"articles":[' % (COMPILED_FORMAT, COMPILED_FORMAT_VERSION))
+        first = True
+        feed = Feed(source)
+        packages = []
+        for (package, _), results in _bounded_map(compile_batch, _batches(feed, batch_size, packages), jobs):
+            for article_id, article, fitted, error in results:
+                if error is not None:
+                    report["rejected"].append({"id": article_id, "package": package, "error": error})
+                    continue
+                if article_id in seen:
+                    report["rejected"].append({"id": article_id, "package": package, "error": "id används redan"})
+                    continue
+                seen.add(article_id)
+                for name, before, after in fitted:
+                    report["fitted"].append({"id": article_id, "field": name, "before": before, "after": after})
+                fingerprint = _fingerprint(article)
+                if article_id not in previous:
+                    report["added"].append(article_id)
+                elif previous[article_id] != fingerprint:
+                    report["changed"].append(article_id)
+                report["articles"] += 1
+                if package is not None:
+                    package_articles.setdefault(package, []).append(article)
+                elif out:
+                    out.write(("" if first else ",") + json.dumps(article, **_COMPACT))
+                    first = False
+
+        report["packages"] = len(packages)
+        if out:
+            out.write('],"packages":[')
+            out.write(",".join(json.dumps({**pkg, "articles": package_articles.get(i, [])}, **_COMPACT)
+                               for i, pkg in enumerate(packages)))
+            out.write('],"source_sha1":"%s"}\n' % feed.sha1)
+            out.close()
+            os.replace(tmp, output)
+    except BaseException:
+        if out:
+            out.close()
+            os.unlink(tmp)
+        raise
+    report["removed"] = sorted((i for i in previous if i not in seen), key=str)
+    return report
@@ -0,0 +1,200 @@
+"""
+Kategori-inferens för artiklar.
+
+Ort- och nyckelordsreglerna kompileras en gång till en tabell i
+prioritetsordning, så att en artikel klassificeras med en gemenisering och
+en serie substrängssökningar som avbryts vid första träff. Termer som inte
+kan avgöra något (de innehåller en term som redan står före dem) tas bort,
+och sportorden, som bara leder till REGION, söks bara när artikelns egen
+kategori skulle ge något annat. Resultatet memoreras per artikeltext, så en
+omladdad katalog bara klassificerar de artiklar som faktiskt ändrats.
+
+Prioritetsordningen är densamma som i den ursprungliga heuristiken: ortnamn
+(i tabellordning) före näringsliv, åsikt, nöje och sport, därefter
+artikelns egen kategori. tools/bench_categories.py kontrollerar det och
+jämför hastigheten, även mot en kombinerad regex i ett enda svep.
+"""
+
+from collections import OrderedDict
+import threading
+
+# Allowed article categories (only these will be used/displayed)
+ALLOWED_CATEGORIES = {
+    "NÖJE",
+    "ÅSIKT",
+    "KARLSHAMN",
+    "RONNEBY",
+    "SÖLVESBORG",
+    "KARLSKRONA",
+    "OLOFSTRÖM",
+    "REGION",
+    "NÄRINGSLIV",
+    "SPORT",
+}
+
+# Town-specific matches (prefer exact town mentions). Order matters: the first
+# town in this list that occurs anywhere in the text wins.
+TOWN_TERMS = (
+    ("karlshamn", "KARLSHAMN"),
+    ("karlskrona", "KARLSKRONA"),
+    ("ronneby", "RONNEBY"),
+    ("sölvesborg", "SÖLVESBORG"),
+    ("solvesborg", "SÖLVESBORG"),
+    ("olofström", "OLOFSTRÖM"),
+    ("olofstrom", "OLOFSTRÖM"),
+)
+
+# Keyword groups in precedence order. Sports maps to a town if one is
+# mentioned, which the town rules above already cover, otherwise REGION.
+KEYWORD_RULES = (
+    # Business / economy
+    ("NÄRINGSLIV", ("företag", "näringsliv", "ekonomi", "investering", "arbets", "priser", "omsättning")),
+    # Opinion
+    ("ÅSIKT", ("åsikt", "debatt", "insändare", "tycker", "menar", "ledare", "åsikter")),
+    # Entertainment / culture
+    ("NÖJE", ("konsert", "teater", "kultur", "festival", "nöje", "premiär", "recension")),
+    # Sports often mention HK, IF, match, mål
+    ("REGION", ("match", "mål", "cupen", "serie", "hanlde", "hockey", "fotboll", "hk ")),
+)
+
+DEFAULT_CATEGORY = "REGION"
+
+# Lower-casing as a byte table: for text without characters above U+00FF,
+# bytes.translate() gives the same result as str.lower() (every Latin-1
+# capital has its lower-case form in Latin-1) at a fraction of the cost
+_LATIN1_LOWER = bytes(ord(chr(i).lower()) for i in range(256))
+
+
+def _lower(text: str) -> str:
+    try:
+        return text.encode("latin-1").translate(_LATIN1_LOWER).decode("latin-1")
+    except UnicodeEncodeError:
+        return text.lower()
+
+
+class CategoryMatcher:
+    """Precompiled classifier over the town and keyword terms.
+
+    The rules are flattened into one (term, category) table ordered by
+    precedence; classification returns on the first term found, so the
+    best-ranked category wins exactly as in the original if-chain. A term
+    containing a term listed before it is dropped, since the earlier term
+    always matches first. Trailing terms that map to the default category
+    are only scanned when the article's own category would give something
+    else.
+
+    Each scan is a C substring search that skips ahead several characters
+    per step; on CPython that beats a single pass with a combined regex or
+    an Aho-Corasick automaton, both of which visit every character
+    (tools/bench_categories.py times the regex too). Results are memoized in
+    a bounded LRU keyed on the article text, which makes re-classifying an
+    unchanged catalog a dict lookup.
+    """
+
+    def __init__(self, towns=TOWN_TERMS, rules=KEYWORD_RULES, default=DEFAULT_CATEGORY,
+                 allowed=ALLOWED_CATEGORIES, cache_size=65536):
+        self.default = default
+        self.allowed = frozenset(allowed)
+        table = []
+        for term, category in towns:
+            table.append((term, category))
+        for category, terms in rules:
+            table.extend((t, category) for t in terms)
+        kept = []
+        for term, category in table:
+            # Also drops duplicates: a term listed earlier always wins
+            if not any(earlier in term for earlier, _ in kept):
+                kept.append((term, category))
+        self._table = tuple(kept)
+        # Without the trailing default-category terms, for articles whose fallback is the default anyway
+        tail = len(kept)
+        while tail and kept[tail - 1][1] == default:
+            tail -= 1
+        self._head = self._table[:tail]
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def terms(self) -> tuple:
+        """The (term, category) table in precedence order."""
+        return self._table
+
+    def classify_text(self, text: str):
+        """Return the matched category for lower-cased text, or None if no term matches."""
+        for term, category in self._table:
+            if term in text:
+                return category
+        return None
+
+    def _classify_uncached(self, keys) -> list:
+        allowed, default, head, table = self.allowed, self.default, self._head, self._table
+        fallbacks = {}
+        result = []
+        for text, orig in keys:
+            fallback = fallbacks.get(orig)
+            if fallback is None:
+                # If original category already matches an allowed one, keep it when no term matches
+                fallback = orig.strip().upper()
+                fallback = fallbacks[orig] = fallback if fallback in allowed else default
+            text = _lower(text)
+            for term, category in (head if fallback == default else table):
+                if term in text:
+                    result.append(category)
+                    break
+            else:
+                result.append(fallback)
+        return result
+
+    def classify(self, article: dict) -> str:
+        """Infer a category for one article; returns one of the allowed categories."""
+        return self.classify_many((article,))[0]
+
+    def classify_many(self, articles) -> list:
+        """Classify an iterable of articles; returns a list of categories in input order."""
+        # The category depends only on the joined text and the article's own category
+        keys = [
+            ("\n".join((a.get("headline") or "", a.get("subheadline") or "", a.get("body") or "")),
+             a.get("category") or "")
+            for a in articles
+        ]
+        if not self._cache_size:
+            return self._classify_uncached(keys)
+
+        with self._lock:
+            get = self._cache.get
+            result = [get(k) for k in keys]
+        missing = [k for k, c in zip(keys, result) if c is None]
+        computed = dict(zip(missing, self._classify_uncached(missing)))
+        if computed:
+            result = [c if c is not None else computed[k] for k, c in zip(keys, result)]
+        with self._lock:
+            cache = self._cache
+            for k in keys:
+                if k in cache:
+                    cache.move_to_end(k)
+            cache.update(computed)
+            while len(cache) > self._cache_size:
+                cache.popitem(last=False)
+        return result
+
+    def clear_cache(self):
+        """Drop all memoized results."""
+        with self._lock:
+            self._cache.clear()
+
+
+MATCHER = CategoryMatcher()
+
+
+def infer_category(article: dict) -> str:
+    """Infer a category from headline/subheadline/body.
+
+    Returns one of ALLOWED_CATEGORIES, defaulting to 'REGION'.
+    """
+    return MATCHER.classify(article)
+
+
+def classify_many(articles) -> list:
+    """Bulk variant of infer_category()."""
+    return MATCHER.classify_many(articles)
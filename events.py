@@ -0,0 +1,117 @@
+"""
+Händelselogg för live-galleriet (/events/saved).
+
+Varje ny sparning skrivs som en rad i en liten SQLite-databas (WAL-läge)
+med ett löpande id. Id:t används som SSE-händelse-id, så en klient som
+tappar anslutningen kan återuppta med Last-Event-ID och bara få det den
+missat. Eftersom loggen ligger på disk fungerar det även när flera
+arbetsprocesser delar samma fil: processen som tar emot sparningen väcker
+sina egna väntande klienter direkt, övriga processer märker den nya raden
+vid nästa kontroll (högst en fråga per `poll_interval` och process,
+oavsett antal anslutna klienter).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class EventLog:
+    """Append-only, id-ordered event log shared by all worker processes.
+
+    Only the newest `keep` events are retained; a client resuming from an
+    older id is told to reload instead (see `oldest_id()`).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            created REAL NOT NULL,
+            data    TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str, poll_interval: float = 1.0, keep: int = 1000):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.keep = keep
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._latest = None
+        self._checked_at = 0.0
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def publish(self, data: dict) -> int:
+        """Append an event, wake local waiters and return its id."""
+        with self._connect() as conn:
+            event_id = conn.execute(
+                "INSERT INTO events (created, data) VALUES (?, ?)",
+                (time.time(), json.dumps(data, ensure_ascii=False)),
+            ).lastrowid
+            conn.execute("DELETE FROM events WHERE id <= ?", (event_id - self.keep,))
+        with self._cond:
+            self._latest = max(self._latest or 0, event_id)
+            self._checked_at = time.monotonic()
+            self._cond.notify_all()
+        return event_id
+
+    def latest_id(self, max_age: float = None) -> int:
+        """Id of the newest event (0 if none), re-read from disk at most every `max_age` seconds."""
+        max_age = self.poll_interval if max_age is None else max_age
+        with self._cond:
+            if self._latest is not None and time.monotonic() - self._checked_at < max_age:
+                return self._latest
+        row = self._connect().execute("SELECT MAX(id) FROM events").fetchone()
+        with self._cond:
+            self._latest = max(self._latest or 0, row[0] or 0)
+            self._checked_at = time.monotonic()
+            return self._latest
+
+    def oldest_id(self) -> int:
+        """Id of the oldest retained event (0 if the log is empty)."""
+        row = self._connect().execute("SELECT MIN(id) FROM events").fetchone()
+        return row[0] or 0
+
+    def since(self, last_id: int, limit: int = 100) -> list:
+        """Events after `last_id` as (id, data) tuples, oldest first."""
+        rows = self._connect().execute(
+            "SELECT id, data FROM events WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)
+        ).fetchall()
+        return [(event_id, json.loads(data)) for event_id, data in rows]
+
+    def wait(self, last_id: int, timeout: float) -> list:
+        """Block until there are events after `last_id` or `timeout` passes; returns since(last_id)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.latest_id() > last_id:
+                return self.since(last_id)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            with self._cond:
+                self._cond.wait(min(remaining, self.poll_interval))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def format_sse(event_id: int, event: str, data: dict) -> str:
+    """One Server-Sent Events message."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,201 @@
+"""
+Bildvarianter för artikel- och huvudbilder.
+
+Varje källbild i static/ kan hämtas i en storlek per användning:
+
+- thumb: miniatyrer (lärarvyns galleri, citattecknet)
+- slot:  bilder på framsidan (huvudnyhetens bild, tidningshuvudet, förhandsvisning)
+- print: PDF-export (A4-bredd i 300 dpi)
+
+Rasterbilder skalas ner med Pillow och sparas som WebP (för webbläsare som
+accepterar det) eller JPEG/PNG. SVG-bilder skalas inte utan minifieras.
+Varianterna cachas på disk med en hash av källfilen i namnet, så en ändrad
+källbild ger nya varianter och gamla filer kan aldrig serveras av misstag.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PRESETS = {
+    "thumb": 400,
+    "slot": 1600,
+    "print": 2480,
+}
+RASTER_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+SOURCE_EXTENSIONS = RASTER_EXTENSIONS | {".svg"}
+_MIMETYPES = {
+    "webp": "image/webp",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+}
+
+
+def minify_svg(text: str) -> str:
+    """Strip comments, XML prolog/doctype and insignificant whitespace from an SVG."""
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
+    text = re.sub(r"<\?xml.*?\?>|<!DOCTYPE[^>]*>", "", text, flags=re.S)
+    text = re.sub(r">\s+<", "><", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    return text.strip()
+
+
+def _write_atomic(path, content: bytes):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _render_raster(src_path, width, fmt):
+    """Scale a raster image down to `width` (never up) and encode it; returns bytes."""
+    from io import BytesIO
+
+    from PIL import Image
+
+    with Image.open(src_path) as im:
+        im.load()
+        if im.width > width:
+            im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+        out = BytesIO()
+        if fmt == "webp":
+            im.save(out, "WEBP", quality=82, method=6)
+        elif fmt == "png":
+            im.save(out, "PNG", optimize=True)
+        else:
+            im.convert("RGB").save(out, "JPEG", quality=85, optimize=True, progressive=True)
+        return out.getvalue()
+
+
+class ImageVariants:
+    """Generates and caches sized variants of images under `static_dir`.
+
+    Source hashes are cached per file and the file is stat:ed at most once
+    per `check_interval`, so building URLs on the hot path is cheap.
+    """
+
+    def __init__(self, static_dir: str, cache_dir: str, check_interval: float = 2.0):
+        self.static_dir = os.path.abspath(static_dir)
+        self.cache_dir = cache_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._hashes = {}  # rel -> (checked_at, stat key, hash)
+        self._dir_state = (None, "")  # (checked_at, version)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def relpath(self, src: str):
+        """Path relative to static/ for '/static/images/x.svg' or 'images/x.svg'; None if invalid."""
+        if not src:
+            return None
+        rel = src[len("/static/"):] if src.startswith("/static/") else src.lstrip("/")
+        path = os.path.abspath(os.path.join(self.static_dir, rel))
+        if not path.startswith(self.static_dir + os.sep):
+            return None
+        if os.path.splitext(rel)[1].lower() not in SOURCE_EXTENSIONS:
+            return None
+        return rel.replace(os.sep, "/")
+
+    def source_hash(self, rel: str):
+        """Short content hash of a source image, or None if it does not exist."""
+        now = time.monotonic()
+        cached = self._hashes.get(rel)
+        if cached is not None and now - cached[0] < self.check_interval:
+            return cached[2]
+        path = os.path.join(self.static_dir, rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._hashes.pop(rel, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        if cached is not None and cached[1] == key:
+            digest = cached[2]
+        else:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        self._hashes[rel] = (now, key, digest)
+        return digest
+
+    @property
+    def version(self) -> str:
+        """Changes when any file in static/images changes (for page cache keys)."""
+        now = time.monotonic()
+        checked_at, version = self._dir_state
+        if checked_at is not None and now - checked_at < self.check_interval:
+            return version
+        parts = []
+        try:
+            with os.scandir(os.path.join(self.static_dir, "images")) as it:
+                for entry in it:
+                    st = entry.stat()
+                    parts.append(f"{entry.name}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            pass
+        version = hashlib.sha1("|".join(sorted(parts)).encode("utf-8")).hexdigest()[:12]
+        self._dir_state = (now, version)
+        return version
+
+    def url(self, src: str, preset: str) -> str:
+        """Versioned URL of a variant, or `src` unchanged if it is not a known image."""
+        rel = self.relpath(src)
+        digest = self.source_hash(rel) if rel and preset in PRESETS else None
+        if digest is None:
+            return src
+        return f"/img/{preset}/{rel}?v={digest}"
+
+    def derivative(self, rel: str, preset: str, webp: bool = False):
+        """(path, mimetype) of the variant, generating it on first use; None if no source."""
+        digest = self.source_hash(rel)
+        if digest is None or preset not in PRESETS:
+            return None
+        src_path = os.path.join(self.static_dir, rel)
+        ext = os.path.splitext(rel)[1].lower()
+        stem = os.path.splitext(os.path.basename(rel))[0]
+
+        if ext == ".svg":
+            # Vektorbilder skalar själva - samma minifierade fil för alla användningar
+            path = os.path.join(self.cache_dir, f"{stem}.{digest}.min.svg")
+            if not os.path.exists(path):
+                with open(src_path, "r", encoding="utf-8") as f:
+                    content = minify_svg(f.read()).encode("utf-8")
+                _write_atomic(path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+                _write_atomic(path, content)
+            return path, "image/svg+xml"
+
+        fmt = "webp" if webp and preset != "print" else self._fallback_format(src_path)
+        path = os.path.join(self.cache_dir, f"{stem}.{digest}.{preset}.{fmt}")
+        if not os.path.exists(path):
+            try:
+                content = _render_raster(src_path, PRESETS[preset], fmt)
+            except (ImportError, OSError):
+                # Pillow saknas eller filen går inte att tolka som bild: servera originalet
+                return src_path, _MIMETYPES.get(ext[1:], "application/octet-stream")
+            with self._lock:
+                if not os.path.exists(path):
+                    _write_atomic(path, content)
+        return path, _MIMETYPES[fmt]
+
+    @staticmethod
+    def _fallback_format(src_path):
+        ext = os.path.splitext(src_path)[1].lower()
+        return "png" if ext in (".png", ".gif", ".webp") else "jpeg"
+
+    def print_uri(self, src: str) -> str:
+        """file:// URI of the print variant, for WeasyPrint; `src` unchanged if unknown."""
+        rel = self.relpath(src)
+        found = self.derivative(rel, "print") if rel else None
+        if found is None:
+            return src
+        return Path(found[0]).resolve().as_uri()
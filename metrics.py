@@ -0,0 +1,411 @@
+"""
+Mätvärden i Prometheus textformat (/metrics).
+
+Svarstider per route och per internt steg (katalogladdning,
+kategorisering, rendering av startsidan, listning och sparning) samlas i
+histogram med fasta hinkar. Att registrera ett värde är en uppslagning i
+ett dict och några heltalsökningar under ett lås, så mätningen kan vara
+påslagen under skarpa workshoppar. Värden som kostar något att ta fram
+(sparkatalogens storlek, minnesanvändning) räknas ut först när /metrics
+hämtas.
+
+Varje process har sina egna värden. Med flera arbetsprocesser (serve.py)
+anropas `REGISTRY.share(katalog)`: varje process skriver då regelbundet
+sina räknare och histogram till en fil i katalogen, och /metrics summerar
+alla processers filer, oavsett vilken process som svarar. En process tar
+bort sin fil när den avslutas. Processmått (minne, CPU) redovisas per
+process med etiketten `pid`.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Hinkar (sekunder) för svarstider, från en cacheträff till en PDF-rendering
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_START_TIME = time.time()
+
+
+def _reset_start_time():
+    global _START_TIME
+    _START_TIME = time.time()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_start_time)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def dump(self):
+        """JSON-serializable state for sharing with other processes."""
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def _copy(self, value):
+        return value
+
+    def _add(self, a, b):
+        return a + b
+
+    def _merged(self, others):
+        """Own values plus the dumps of other processes, summed per label combination."""
+        with self._lock:
+            values = {k: self._copy(v) for k, v in self._values.items()}
+        for dumped in others:
+            for label_values, value in dumped:
+                key = tuple(label_values)
+                values[key] = self._add(values[key], value) if key in values else self._copy(value)
+        return sorted(values.items())
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def collect(self, others=()):
+        lines = self._header()
+        for label_values, value in self._merged(others):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Observations sorted into cumulative buckets, per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label values -> [counts per bucket..., +Inf count, sum]
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def count(self, *label_values):
+        state = self._values.get(label_values)
+        return sum(state[:-1]) if state else 0
+
+    def dump(self):
+        with self._lock:
+            return [[list(k), list(v)] for k, v in self._values.items()]
+
+    def _copy(self, value):
+        return list(value)
+
+    def _add(self, a, b):
+        if len(a) != len(b):
+            return a  # annan hinkindelning (gammal version av appen) - hoppa över
+        return [x + y for x, y in zip(a, b)]
+
+    def collect(self, others=()):
+        lines = self._header()
+        for label_values, state in self._merged(others):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += n
+                le = 'le="%s"' % _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, [le])} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value computed by `func` when the metrics are scraped.
+
+    `func` returns a number, or a dict of label-value tuples to numbers
+    for a labelled gauge.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, func, labels=(), per_process=False):
+        super().__init__(name, help_text, labels)
+        self.func = func
+        # Mått på själva processen, redovisas per pid när flera processer delar register
+        self.per_process = per_process
+
+    def value(self):
+        try:
+            return self.func()
+        except Exception:
+            return None  # ett trasigt mätvärde ska inte fälla hela /metrics
+
+    def dump(self):
+        return self.value() if self.per_process else None
+
+    def reset(self):
+        pass
+
+    def collect(self, others=()):
+        result = self.value()
+        if result is None:
+            return []
+        lines = self._header()
+        items = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+    def collect_per_process(self, others):
+        """One sample per process, labelled with its pid; `others` is [(pid, value), ...]."""
+        samples = [(os.getpid(), self.value())] + list(others)
+        lines = self._header()
+        for pid, value in sorted(samples):
+            if value is not None:
+                lines.append(f'{self.name}{{pid="{pid}"}} {_format_value(value)}')
+        return lines
+
+
+class Registry:
+    """A named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        # Avstängt register: stage() mäter ingenting
+        self.enabled = True
+        self.shared_dir = None
+        self.interval = None
+        self._flusher = None
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def gauge(self, name, help_text, func, labels=(), per_process=False) -> Gauge:
+        return self._add(Gauge(name, help_text, func, labels, per_process))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (summed over processes if shared)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        if self.shared_dir is None:
+            lines = []
+            for metric in metrics:
+                lines.extend(metric.collect())
+            return "\n".join(lines) + "\n"
+
+        self.flush()
+        others = self._read_others()
+        lines = []
+        for metric in metrics:
+            dumps = [(pid, data[metric.name]) for pid, (alive, data) in others.items() if metric.name in data]
+            if isinstance(metric, Gauge) and metric.per_process:
+                lines.extend(metric.collect_per_process(
+                    [(pid, value) for pid, value in dumps if others[pid][0]]))
+            else:
+                lines.extend(metric.collect([value for _, value in dumps if value is not None]))
+        return "\n".join(lines) + "\n"
+
+    # --- delning mellan processer ---
+
+    def share(self, directory: str, interval: float = 5.0):
+        """Aggregate counters and histograms with other processes through `directory`.
+
+        Each process writes its values to <pid>.json every `interval` seconds
+        and when rendering. Values a process collected before forking stay
+        with the parent; children start from zero. The file is removed when
+        the process exits normally.
+        """
+        first = self.shared_dir is None and self.interval is None
+        self.shared_dir = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+        if first:
+            # Ärvs vid fork, så varje process tar bort sin egen fil
+            atexit.register(self.unshare)
+            if hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=self._after_fork)
+        self._start_flusher()
+
+    def unshare(self):
+        """Stop sharing and remove this process's file from the shared directory."""
+        directory, self.shared_dir = self.shared_dir, None
+        if directory is None:
+            return
+        try:
+            os.remove(os.path.join(directory, f"{os.getpid()}.json"))
+        except OSError:
+            pass
+
+    def _start_flusher(self):
+        self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while self.shared_dir is not None:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def _after_fork(self):
+        # Trådar överlever inte fork och lås kan ha ärvts låsta
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric.reset()
+        self._start_flusher()
+
+    def flush(self):
+        """Write this process's values to the shared directory."""
+        directory = self.shared_dir
+        if directory is None:
+            return
+        with self._lock:
+            metrics = list(self._metrics.values())
+        data = {m.name: m.dump() for m in metrics}
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _read_others(self) -> dict:
+        """{pid: (alive, data)} for every other process that has written its values."""
+        others = {}
+        own = os.getpid()
+        for name in os.listdir(self.shared_dir):
+            stem, ext = os.path.splitext(name)
+            if ext != ".json" or not stem.isdigit() or int(stem) == own:
+                continue
+            try:
+                with open(os.path.join(self.shared_dir, name), "r", encoding="utf-8") as f:
+                    others[int(stem)] = (_alive(int(stem)), json.load(f))
+            except (OSError, ValueError):
+                continue
+        return others
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _resident_memory_bytes():
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        if resource is None:
+            return None
+        # Inte Linux: närmaste vi har är toppvärdet (byte på macOS, annars kB)
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+
+
+def _cpu_seconds():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+# Processgemensamt register, så att även moduler utan tillgång till appen kan mäta steg
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "tidning_stage_duration_seconds", "Time spent in internal stages of request handling.", ["stage"])
+
+REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size in bytes.", _resident_memory_bytes,
+               per_process=True)
+REGISTRY.gauge("process_cpu_seconds_total", "Total user and system CPU time in seconds.", _cpu_seconds,
+               per_process=True)
+REGISTRY.gauge("process_start_time_seconds", "Start time of the process since the epoch in seconds.",
+               lambda: _START_TIME, per_process=True)
+
+
+def stage(name: str):
+    """Context manager timing one internal stage into tidning_stage_duration_seconds."""
+    if not REGISTRY.enabled:
+        return nullcontext()
+    return STAGE_SECONDS.time(name)
@@ -0,0 +1,310 @@
+"""
+PDF-export av sparade framsidor.
+
+HTML renderas från templates/pdf.html i Flask-processen och skickas till en
+begränsad processpool där WeasyPrint gör layouten. Resultatet cachas på disk
+med en hash av den renderade HTML:en som nyckel, så identiska framsidor bara
+renderas en gång. WeasyPrint importeras först i arbetsprocesserna.
+
+En sammanslagen PDF med flera framsidor renderas som en PDF per framsida,
+parallellt i poolen, som sedan slås ihop med pypdf.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime
+
+
+class PdfQueueFull(RuntimeError):
+    """Raised when too many PDF renders are already queued."""
+
+
+class PdfUnavailable(RuntimeError):
+    """Raised when WeasyPrint (or its system libraries) cannot be loaded."""
+
+
+def resolve_slots(slots: dict, snapshot) -> dict:
+    """Map slot -> article dict (or None) using the catalog's id index."""
+    return {slot: snapshot.get(article_id) if article_id else None for slot, article_id in slots.items()}
+
+
+def save_date(data: dict, fallback: datetime = None) -> datetime:
+    """Best-effort timestamp of a saved frontpage (its ISO `timestamp` field)."""
+    ts = data.get("timestamp")
+    if isinstance(ts, str):
+        try:
+            return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return fallback or datetime.now()
+
+
+def pdf_context(data: dict, snapshot) -> dict:
+    """Template context for templates/pdf.html."""
+    when = save_date(data)
+    return {
+        "slots": resolve_slots(data.get("slots") or {}, snapshot),
+        "group_name": data.get("groupName", ""),
+        "date_str": when.strftime("%Y-%m-%d"),
+        "week_num": when.isocalendar()[1],
+    }
+
+
+def content_key(html: str) -> str:
+    """Cache key for a rendered frontpage."""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _weasyprint_html():
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as e:
+        raise PdfUnavailable(str(e)) from e
+    return HTML
+
+
+def _write_atomic(out_path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(out_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return out_path
+
+
+def _render_to_file(html: str, base_url: str, out_path: str) -> str:
+    """Worker: lay out `html` with WeasyPrint and atomically write the PDF to out_path."""
+    HTML = _weasyprint_html()
+    return _write_atomic(out_path, lambda f: HTML(string=html, base_url=base_url).write_pdf(f))
+
+
+def _merge_files(paths: list, base_url: str, out_path: str) -> str:
+    """Worker: merge already rendered PDFs, in order, into one PDF at out_path."""
+    try:
+        from pypdf import PdfWriter
+    except ImportError as e:
+        raise PdfUnavailable(str(e)) from e
+
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    try:
+        return _write_atomic(out_path, writer.write)
+    finally:
+        writer.close()
+
+
+class PdfRenderer:
+    """Bounded process pool plus on-disk cache for rendered PDFs.
+
+    At most `workers` renders run at once and at most `max_pending` may be
+    queued or running; further requests get PdfQueueFull. Concurrent
+    requests for the same content share one render.
+    """
+
+    def __init__(self, cache_dir: str, base_url: str, workers: int = 2, max_pending: int = 32,
+                 max_cached: int = 500, max_tasks_per_child: int = 50):
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.workers = workers
+        self.max_cached = max_cached
+        self.max_tasks_per_child = max_tasks_per_child
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._pool = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _executor(self):
+        # Skapas vid första användning så att processer inte startas (eller ens importeras) vid import
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+            return self._pool
+
+    @property
+    def inflight(self) -> int:
+        """Number of renders queued or running."""
+        return len(self._inflight)
+
+    def cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pdf")
+
+    def cached(self, key: str):
+        """Return the cached PDF path for `key`, or None."""
+        path = self.cache_path(key)
+        return path if os.path.exists(path) else None
+
+    def submit(self, html: str, key: str = None, block: bool = False):
+        """Return a Future resolving to the PDF path for `html` (already done if cached).
+
+        With `block=True` the call waits for a free queue slot instead of
+        raising PdfQueueFull.
+        """
+        key = key or content_key(html)
+        return self._submit(key, _render_to_file, html, block=block)
+
+    def render_each(self, htmls: list, window: int = None):
+        """Render every html (at most `window` queued at once); yield (index, path) as each PDF is done.
+
+        Identical frontpages share one render. Waits for free queue slots
+        instead of raising PdfQueueFull.
+        """
+        window = window or max(1, self.workers * 2)
+        pending = {}
+        queue = iter(enumerate(htmls))
+        while True:
+            while len(pending) < window:
+                job = next(queue, None)
+                if job is None:
+                    break
+                index, html = job
+                pending.setdefault(self.submit(html, block=True), []).append(index)
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = future.result()
+                for index in pending.pop(future):
+                    yield index, path
+
+    @staticmethod
+    def merged_key(htmls: list) -> str:
+        """Cache key for the merged PDF of several frontpages."""
+        return content_key("\0".join(content_key(h) for h in htmls))
+
+    def existing_merged(self, htmls: list):
+        """The Future of a merged PDF for `htmls` that is cached or being rendered, or None."""
+        key = self.merged_key(htmls)
+        with self._lock:
+            return self._existing(key, self.cache_path(key))
+
+    def submit_merged(self, htmls: list, on_rendered=None):
+        """Return a Future resolving to one PDF with all frontpages in order (already done if cached).
+
+        Each frontpage is rendered on its own via render_each(), in
+        parallel and cached like any other render, and `on_rendered()` is
+        called as each one is done; the PDFs are then merged in the pool.
+        The work runs in a background thread, so it carries on if the
+        caller stops waiting, and a second call for the same frontpages
+        gets the same Future.
+        """
+        key = self.merged_key(htmls)
+        with self._lock:
+            existing = self._existing(key, self.cache_path(key))
+            if existing is not None:
+                return existing
+            future = Future()
+            self._inflight[key] = future
+        threading.Thread(target=self._render_merged, args=(key, htmls, on_rendered, future),
+                         name="pdf-merge", daemon=True).start()
+        return future
+
+    def _render_merged(self, key, htmls, on_rendered, future):
+        merging = False
+        try:
+            paths = [None] * len(htmls)
+            for index, path in self.render_each(htmls):
+                paths[index] = path
+                if on_rendered is not None:
+                    on_rendered()
+            self._slots.acquire()
+            merging = True
+            merged = self._executor().submit(_merge_files, paths, self.base_url, self.cache_path(key))
+            future.set_result(merged.result())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            if merging:
+                self._finished(key, future)
+            else:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def _submit(self, key, fn, payload, block=False):
+        path = self.cache_path(key)
+        with self._lock:
+            existing = self._existing(key, path)
+            if existing is not None:
+                return existing
+
+        if not self._slots.acquire(blocking=block):
+            raise PdfQueueFull("Too many PDF renders in progress")
+        with self._lock:
+            # Någon annan kan ha hunnit starta samma rendering medan vi väntade
+            existing = self._existing(key, path)
+            if existing is not None:
+                self._slots.release()
+                return existing
+            try:
+                future = self._executor().submit(fn, payload, self.base_url, path)
+            except BaseException:
+                self._slots.release()
+                raise
+            self._inflight[key] = future
+        future.add_done_callback(lambda f, key=key: self._finished(key, f))
+        return future
+
+    def _existing(self, key, path):
+        """In-flight future or an already-done future for a cached file (caller holds the lock)."""
+        future = self._inflight.get(key)
+        if future is not None:
+            return future
+        if os.path.exists(path):
+            try:
+                os.utime(path)  # håll ofta använda PDF:er kvar vid rensning
+            except OSError:
+                pass
+            done = Future()
+            done.set_result(path)
+            return done
+        return None
+
+    def _finished(self, key, future):
+        from concurrent.futures.process import BrokenProcessPool
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if isinstance(future.exception(), BrokenProcessPool):
+                # En arbetsprocess dog (t.ex. slut på minne) - starta en ny pool nästa gång
+                self._pool = None
+        self._slots.release()
+        self._prune()
+
+    def _prune(self):
+        """Keep at most max_cached PDFs, dropping the least recently written."""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".pdf")]
+        except OSError:
+            return
+        if len(entries) <= self.max_cached:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_cached]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def render(self, html: str, timeout: float = None) -> str:
+        """Render (or fetch from cache) and return the PDF path; blocks up to `timeout`."""
+        return self.submit(html).result(timeout=timeout)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,144 @@
+"""
+Stickprovsprofilering av requests i drift.
+
+Av påslaget (PROFILE_EVERY=N) profileras var N:e request per utvald route
+med cProfile och profilen sparas som en .prof-fil i en katalog som hålls
+under ett maxantal filer (äldst tas bort först). En request kan också
+profileras på begäran med huvudet `X-Profile: <PROFILE_TOKEN>`.
+
+Högst en request per process profileras åt gången; övriga körs som vanligt.
+Är profileringen avstängd registreras inga hooks alls, så den kostar
+ingenting.
+
+`summarize()` (via /debug/profiles eller tools/profiles.py) slår ihop
+profilerna per route och listar funktionerna med högst kumulativ tid.
+"""
+
+import cProfile
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+
+PROFILE_SUFFIX = ".prof"
+
+_NAME = re.compile(r"^(\d+)-([\w\-]+)-(\d+(?:\.\d+)?)ms\.prof$")
+
+
+def route_slug(rule: str) -> str:
+    """Filesystem-safe name for a URL rule: '/' -> 'index', '/list-saved' -> 'list-saved'."""
+    return re.sub(r"[^\w\-]+", "_", rule.strip("/")).strip("_") or "index"
+
+
+class SamplingProfiler:
+    """Profiles one in `every` requests per route into a bounded directory."""
+
+    def __init__(self, profile_dir: str, every: int = 0, routes=("/", "/save", "/list-saved"),
+                 max_files: int = 200):
+        self.profile_dir = profile_dir
+        self.every = every
+        self.routes = set(routes)
+        self.max_files = max_files
+        self._counters = {rule: itertools.count(1) for rule in self.routes}
+        self._busy = threading.Lock()
+        os.makedirs(profile_dir, exist_ok=True)
+
+    def sampled(self, rule: str) -> bool:
+        """True if this request to `rule` is the N:th one and should be profiled."""
+        counter = self._counters.get(rule)
+        return counter is not None and self.every > 0 and next(counter) % self.every == 0
+
+    def start(self):
+        """Start profiling the current thread; None if another profile is already running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except BaseException:
+            self._busy.release()
+            raise
+        return (profile, time.perf_counter())
+
+    def stop(self, handle, rule: str) -> str:
+        """Stop a profile from start(), write it and return its path."""
+        profile, started = handle
+        try:
+            profile.disable()
+        finally:
+            self._busy.release()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        path = os.path.join(self.profile_dir, f"{time.time_ns()}-{route_slug(rule)}-{elapsed_ms}ms{PROFILE_SUFFIX}")
+        tmp = path + ".tmp"
+        profile.dump_stats(tmp)
+        os.replace(tmp, path)
+        self._rotate()
+        return path
+
+    def _rotate(self):
+        names = sorted(n for n in os.listdir(self.profile_dir) if n.endswith(PROFILE_SUFFIX))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            try:
+                os.unlink(os.path.join(self.profile_dir, name))
+            except OSError:
+                pass  # en annan process hann före
+
+
+def profile_files(profile_dir: str):
+    """{route slug: [(path, elapsed ms), ...]} for every profile in the directory, oldest first."""
+    by_route = {}
+    try:
+        names = sorted(os.listdir(profile_dir))
+    except OSError:
+        return by_route
+    for name in names:
+        m = _NAME.match(name)
+        if m:
+            by_route.setdefault(m.group(2), []).append((os.path.join(profile_dir, name), float(m.group(3))))
+    return by_route
+
+
+def _function_label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name  # inbyggd funktion, t.ex. <built-in method posix.stat>
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def summarize(profile_dir: str, route: str = None, top: int = 20, sort: str = "cumulative") -> dict:
+    """Merge the profiles per route and list the top functions.
+
+    Returns {route slug: {"profiles", "mean_ms", "max_ms", "functions"}} where
+    functions are dicts with calls, tottime and cumtime (seconds, summed over
+    all profiles of the route), sorted by `sort` ('cumulative' or 'tottime').
+    """
+    key = 3 if sort == "cumulative" else 2
+    result = {}
+    for slug, files in profile_files(profile_dir).items():
+        if route is not None and slug != route_slug(route):
+            continue
+        stats = None
+        for path, _ in files:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(path)
+                else:
+                    stats.add(path)
+            except (OSError, EOFError, ValueError, TypeError):
+                continue  # halvskriven eller trasig fil
+        if stats is None:
+            continue
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][key], reverse=True)[:top]
+        elapsed = [ms for _, ms in files]
+        result[slug] = {
+            "profiles": len(files),
+            "mean_ms": round(sum(elapsed) / len(elapsed), 1),
+            "max_ms": max(elapsed),
+            "functions": [
+                {"function": _function_label(func), "calls": nc, "tottime": round(tt, 6), "cumtime": round(ct, 6)}
+                for func, (cc, nc, tt, ct, callers) in rows
+            ],
+        }
+    return result
@@ -0,0 +1,295 @@
+"""
+Token buckets och delad lagring för rate limiting utan extern server.
+
+Strategin `token-bucket` (registreras hos `limits`) tolkar en gräns som
+"200 per minute" som en hink med plats för 200 polletter som fylls på med
+200 per minut. En elev kan alltså göra en kort skur av requests utan att
+straffas, så länge snittet håller sig under gränsen. En hink som hunnit
+fyllas helt är likvärdig med en som inte finns och tas bort, så minnet
+växer bara med antalet nyligen aktiva nycklar.
+
+Två lagringar stödjer strategin:
+
+- `memory-buckets://`: i processens minne, högst MAX_KEYS hinkar
+  (minst nyligen använda tas bort först)
+- `sqlite:///abs/sökväg/ratelimit.sqlite3`: en SQLite-databas i WAL-läge
+  som delas av alla arbetsprocesser (serve.py). Räknarna behöver inte
+  överleva ett strömavbrott, så databasen synkas aldrig till disk.
+
+Båda stödjer även flask-limiters standardstrategi fixed-window.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from limits.storage import Storage
+from limits.strategies import STRATEGIES, RateLimiter
+from limits.util import WindowStats
+
+
+def refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    """Tokens in a bucket last left with `tokens` at `updated`, refilled at `rate` per second."""
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """Token-bucket strategy: capacity is the limit's amount, refilled over its window."""
+
+    def __init__(self, storage):
+        if not hasattr(storage, "acquire_tokens"):
+            raise ValueError(
+                f"{type(storage).__name__} does not support token buckets; "
+                "use memory-buckets:// or sqlite:/// as RATELIMIT_STORAGE_URI")
+        super().__init__(storage)
+
+    @staticmethod
+    def _shape(item):
+        return item.amount, item.amount / item.get_expiry()
+
+    def hit(self, item, *identifiers, cost: int = 1) -> bool:
+        capacity, rate = self._shape(item)
+        return self.storage.acquire_tokens(item.key_for(*identifiers), capacity, rate, cost)
+
+    def test(self, item, *identifiers, cost: int = 1) -> bool:
+        capacity, rate = self._shape(item)
+        tokens, _ = self.storage.peek_tokens(item.key_for(*identifiers), capacity, rate)
+        return tokens >= cost
+
+    def get_window_stats(self, item, *identifiers) -> WindowStats:
+        capacity, rate = self._shape(item)
+        tokens, full_at = self.storage.peek_tokens(item.key_for(*identifiers), capacity, rate)
+        return WindowStats(full_at, int(tokens))
+
+
+STRATEGIES["token-bucket"] = TokenBucketRateLimiter
+
+
+class MemoryBucketStorage(Storage):
+    """In-process token buckets (and fixed-window counters), bounded to MAX_KEYS keys."""
+
+    STORAGE_SCHEME = ["memory-buckets"]
+
+    MAX_KEYS = 100_000
+    # Fulla hinkar och utgångna fönster städas bort högst så här ofta (sekunder)
+    PURGE_INTERVAL = 10.0
+
+    def __init__(self, uri: str = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> [tokens, updated, full_at]
+        self._windows = OrderedDict()  # key -> [value, expiry]
+        self._purged_at = 0.0
+
+    @property
+    def base_exceptions(self):
+        return ValueError
+
+    def _maintain(self, now):
+        # Anropas med låset taget
+        if now - self._purged_at > self.PURGE_INTERVAL:
+            self._purged_at = now
+            for key in [k for k, b in self._buckets.items() if b[2] <= now]:
+                del self._buckets[key]
+            for key in [k for k, w in self._windows.items() if w[1] <= now]:
+                del self._windows[key]
+        for table in (self._buckets, self._windows):
+            while len(table) > self.MAX_KEYS:
+                table.popitem(last=False)
+
+    def acquire_tokens(self, key: str, capacity: float, rate: float, cost: int = 1) -> bool:
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = capacity if bucket is None else refill(bucket[0], bucket[1], now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = [tokens, now, now + (capacity - tokens) / rate]
+            self._buckets.move_to_end(key)
+            self._maintain(now)
+            return allowed
+
+    def peek_tokens(self, key: str, capacity: float, rate: float):
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+        if bucket is None:
+            return capacity, now
+        tokens = refill(bucket[0], bucket[1], now, capacity, rate)
+        return tokens, now + (capacity - tokens) / rate
+
+    def incr(self, key: str, expiry: float, elastic_expiry: bool = False, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or window[1] <= now:
+                window = self._windows[key] = [0, now + expiry]
+            window[0] += amount
+            if elastic_expiry:
+                window[1] = now + expiry
+            self._windows.move_to_end(key)
+            self._maintain(now)
+            return window[0]
+
+    def get(self, key: str) -> int:
+        window = self._windows.get(key)
+        return window[0] if window and window[1] > time.time() else 0
+
+    def get_expiry(self, key: str) -> float:
+        window = self._windows.get(key)
+        return window[1] if window and window[1] > time.time() else time.time()
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self):
+        with self._lock:
+            count = len(self._buckets) + len(self._windows)
+            self._buckets.clear()
+            self._windows.clear()
+            return count
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+            self._windows.pop(key, None)
+
+
+class SQLiteStorage(Storage):
+    """Token buckets and fixed-window counters in a SQLite file shared by worker processes."""
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS counters (
+            key    TEXT PRIMARY KEY,
+            value  INTEGER NOT NULL,
+            expiry REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS counters_by_expiry ON counters (expiry);
+        CREATE TABLE IF NOT EXISTS buckets (
+            key     TEXT PRIMARY KEY,
+            tokens  REAL NOT NULL,
+            updated REAL NOT NULL,
+            full_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS buckets_by_full_at ON buckets (full_at);
+    """
+
+    # Utgångna räknare städas bort högst så här ofta (sekunder) per process
+    PURGE_INTERVAL = 60.0
+
+    def __init__(self, uri: str = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.db_path = urlparse(uri or "").path
+        if not self.db_path:
+            raise ValueError("sqlite:// storage needs a path, e.g. sqlite:///tmp/ratelimit.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._purged_at = 0.0
+        self._connect().executescript(self.SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        # En anslutning per tråd och process; en ärvd anslutning efter fork används aldrig
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def incr(self, key: str, expiry: float, elastic_expiry: bool = False, amount: int = 1) -> int:
+        """Increment the counter for `key`, starting a new window if it has expired."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM counters WHERE key = ? AND expiry <= ?", (key, now))
+            conn.execute(
+                "INSERT INTO counters (key, value, expiry) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value"
+                + (", expiry = excluded.expiry" if elastic_expiry else ""),
+                (key, amount, now + expiry),
+            )
+            value = conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._purge(conn, now)
+        return value
+
+    def _purge(self, conn, now):
+        if now - self._purged_at > self.PURGE_INTERVAL:
+            self._purged_at = now
+            conn.execute("DELETE FROM counters WHERE expiry <= ?", (now,))
+            conn.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+
+    def acquire_tokens(self, key: str, capacity: float, rate: float, cost: int = 1) -> bool:
+        """Take `cost` tokens from the bucket for `key` if it has them; a missing bucket is full."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else refill(row[0], row[1], now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (capacity - tokens) / rate),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._purge(conn, now)
+        return allowed
+
+    def peek_tokens(self, key: str, capacity: float, rate: float):
+        """(tokens available now, time the bucket is full again) without taking any."""
+        now = time.time()
+        row = self._connect().execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return capacity, now
+        tokens = refill(row[0], row[1], now, capacity, rate)
+        return tokens, now + (capacity - tokens) / rate
+
+    def get(self, key: str) -> int:
+        row = self._connect().execute(
+            "SELECT value FROM counters WHERE key = ? AND expiry > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self._connect().execute(
+            "SELECT expiry FROM counters WHERE key = ? AND expiry > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._connect().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        conn = self._connect()
+        return conn.execute("DELETE FROM counters").rowcount + conn.execute("DELETE FROM buckets").rowcount
+
+    def clear(self, key: str) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+        conn.execute("DELETE FROM buckets WHERE key = ?", (key,))
@@ -0,0 +1,140 @@
+"""
+Retention för sparade framsidor: gamla sparningar flyttas till arkiv.
+
+Sparningar som inte längre behövs i den levande lagringen skrivs till ett
+gzippat JSON Lines-arkiv (en sparning per rad: filnamn, tidpunkt och hela
+dokumentet med slots) och tas sedan bort, så att listningar, galleriet och
+exporten bara hanterar aktuella sparningar. Arkiveras gör:
+
+- sessioner vars senaste sparning är äldre än gränsen, hela sessionen på
+  en gång så att en pågående workshop aldrig delas (sparningar utan
+  session räknas var för sig)
+- grupper vars namn matchar ett mönster, t.ex. LoadTest* och Test*,
+  oavsett ålder
+- upprepade sparningar av samma layout i följd inom en grupp (från före
+  avdubbleringen); den senaste av dem behålls
+
+Arkivet skrivs färdigt innan något tas bort, och layouter som ingen
+kvarvarande sparning använder rensas bort. Sparningar som inte går att läsa
+(t.ex. en avbruten fil) arkiveras inte och tas inte bort, utan redovisas i
+rapporten.
+"""
+
+import fnmatch
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from storage import FILE_MODE, unique_names
+
+REASON_OLD = "old_session"
+REASON_PATTERN = "group_pattern"
+REASON_DUPLICATE = "duplicate"
+
+
+def plan(records, older_than=None, group_patterns=()) -> dict:
+    """{filename: reason} for the saves to archive, given /list-saved records newest first.
+
+    `older_than` is an epoch time; None archives no session for age.
+    """
+    newest = {}
+    for record in records:
+        if record.get("session") is not None:
+            newest.setdefault(record["session"], record["mtime"])
+
+    chosen = {}
+    previous_layout = {}  # (grupp, session) -> layout i gruppens närmast nyare sparning
+    for record in records:
+        group = record.get("groupName") or ""
+        key = (group, record.get("session"))
+        age = newest[key[1]] if key[1] is not None else record["mtime"]
+        if older_than is not None and age < older_than:
+            chosen[record["filename"]] = REASON_OLD
+        elif any(fnmatch.fnmatchcase(group, pattern) for pattern in group_patterns):
+            chosen[record["filename"]] = REASON_PATTERN
+        elif record.get("layout") is not None and previous_layout.get(key) == record.get("layout"):
+            # En oläslig sparning saknar layout och räknas aldrig som dubblett
+            chosen[record["filename"]] = REASON_DUPLICATE
+        previous_layout[key] = record.get("layout")
+    return chosen
+
+
+def write_bundle(store, filenames, archive_dir: str):
+    """Write the full documents of `filenames` to a new gzipped JSON Lines file.
+
+    Returns (path, archived, unreadable): the archive's path (None if no
+    save could be read), the filenames written and the filenames skipped
+    because they could not be read.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    archived, unreadable = [], []
+    fd, tmp = tempfile.mkstemp(dir=archive_dir, prefix=".", suffix=".tmp")
+    try:
+        os.chmod(tmp, FILE_MODE)
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9) as out:
+                for filename, mtime in filenames:
+                    try:
+                        data = store.get(filename)
+                    except (OSError, ValueError):
+                        unreadable.append(filename)
+                        continue
+                    if data is None:
+                        continue
+                    line = json.dumps({"filename": filename, "mtime": mtime, "data": data}, ensure_ascii=False)
+                    out.write(line.encode("utf-8") + b"\n")
+                    archived.append(filename)
+            raw.flush()
+            os.fsync(raw.fileno())
+        if not archived:
+            return None, archived, unreadable
+        for name in unique_names(f"saved-{datetime.now():%Y%m%d_%H%M%S}.jsonl.gz"):
+            path = os.path.join(archive_dir, name)
+            try:
+                os.link(tmp, path)
+                return path, archived, unreadable
+            except FileExistsError:
+                continue
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def read_bundle(path: str):
+    """Yield (filename, mtime, data) from an archive written by write_bundle()."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry["filename"], entry["mtime"], entry["data"]
+
+
+def compact(store, archive_dir: str, older_than=None, group_patterns=(), dry_run: bool = False) -> dict:
+    """Archive and remove the saves chosen by plan(); returns a report.
+
+    The report has the number of saves before and after, counts per
+    reason, the archive path (None for a dry run or when nothing was
+    archived) and the saves that were chosen but could not be read; those
+    are left in place.
+    """
+    records, _ = store.list()
+    chosen = plan(records, older_than, group_patterns)
+    reasons = {}
+    for reason in chosen.values():
+        reasons[reason] = reasons.get(reason, 0) + 1
+    report = {"saves": len(records), "archived": len(chosen), "kept": len(records) - len(chosen),
+              "reasons": reasons, "bundle": None, "unreadable": []}
+    if dry_run or not chosen:
+        return report
+
+    report["bundle"], archived, report["unreadable"] = write_bundle(
+        store, [(r["filename"], r["mtime"]) for r in records if r["filename"] in chosen], archive_dir)
+    if report["unreadable"]:
+        report["archived"] -= len(report["unreadable"])
+        report["kept"] += len(report["unreadable"])
+    # Bara det som faktiskt hamnade i arkivet tas bort
+    if archived:
+        store.remove(archived)
+    return report
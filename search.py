@@ -0,0 +1,177 @@
+"""
+Fritextsökning i artikelkatalogen.
+
+Ett inverterat index från ord till artiklar byggs tillsammans med
+katalogen. Text och sökfrågor normaliseras likadant: gemener och
+diakritiska tecken borttagna (å/ä -> a, ö -> o, é -> e), så att
+"solvesborg" hittar "Sölvesborg" på samma sätt som ortaliasen i
+categories.py. Varje sökord matchas som prefix ("karl" hittar både
+Karlshamn och Karlskrona) och alla sökord måste finnas i artikeln. Träffar
+i rubriken väger tyngre än i ingressen, som i sin tur väger tyngre än i
+brödtexten.
+
+När articles.json ändras indexeras bara de artiklar vars text eller
+kategori faktiskt ändrats; borttagna artiklar tas bort ur indexet.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+
+from categories import ALLOWED_CATEGORIES
+
+# Fält som indexeras och hur mycket en träff i fältet väger
+FIELD_WEIGHTS = (("headline", 3.0), ("subheadline", 2.0), ("body", 1.0))
+
+# En sökterm som matchar ett ord exakt väger mer än en som bara är början på ordet
+EXACT_BONUS = 1.5
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Lower-case `text` and strip diacritics: 'Sölvesborg' -> 'solvesborg'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> list:
+    """Folded words of `text`, in order."""
+    return _WORD.findall(fold(text))
+
+
+def _fingerprint(article: dict, summary: dict, package) -> tuple:
+    # Sammanfattningen ingår, så att t.ex. ett nytt sidnummer också syns i träfflistan
+    return tuple(article.get(name) or "" for name, _ in FIELD_WEIGHTS) + (tuple(summary.items()), package)
+
+
+class SearchIndex:
+    """Inverted index over a catalog snapshot, updated article by article.
+
+    `update(snapshot)` re-indexes only the articles whose indexed fields or
+    summary changed since the previous snapshot. `search()` is safe to
+    call from request threads while an update runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}     # term -> {article id: weight}
+        self._docs = {}         # article id -> (fingerprint, terms, summary, category)
+        self._order = {}        # article id -> position in the catalog
+        self._terms = []        # sorted vocabulary for prefix lookups
+        self._terms_dirty = False
+        self.version = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def update(self, snapshot) -> dict:
+        """Bring the index in line with `snapshot`; returns counts of added/changed/removed articles."""
+        current = {}
+        order = {}
+        entries = [(a, s, None) for a, s in zip(snapshot.articles, snapshot.summaries)]
+        for pkg, pkg_summary in zip(snapshot.packages, snapshot.package_summaries):
+            entries.extend((a, s, pkg.get("id")) for a, s in zip(pkg.get("articles", []), pkg_summary["articles"]))
+        for article, summary, package in entries:
+            article_id = article.get("id")
+            if article_id is None or article_id in current:
+                continue
+            current[article_id] = (article, summary, package)
+            order[article_id] = len(order)
+
+        counts = {"added": 0, "changed": 0, "removed": 0}
+        with self._lock:
+            for article_id in [i for i in self._docs if i not in current]:
+                self._remove(article_id)
+                counts["removed"] += 1
+            for article_id, (article, summary, package) in current.items():
+                fingerprint = _fingerprint(article, summary, package)
+                existing = self._docs.get(article_id)
+                if existing is not None and existing[0] == fingerprint:
+                    continue
+                if existing is not None:
+                    self._remove(article_id)
+                    counts["changed"] += 1
+                else:
+                    counts["added"] += 1
+                if package is not None:
+                    summary = {**summary, "package": package}
+                self._add(article_id, article, fingerprint, summary)
+            self._order = order
+            if self._terms_dirty:
+                self._terms = sorted(self._postings)
+                self._terms_dirty = False
+            self.version = snapshot.version
+        return counts
+
+    def _add(self, article_id, article, fingerprint, summary):
+        weights = {}
+        for name, weight in FIELD_WEIGHTS:
+            # Ett ord som upprepas i brödtexten ska inte slå en träff i rubriken
+            for term in set(tokenize(article.get(name) or "")):
+                weights[term] = weights.get(term, 0.0) + weight
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._terms_dirty = True
+            postings[article_id] = weight
+        self._docs[article_id] = (fingerprint, tuple(weights), summary, article.get("category"))
+
+    def _remove(self, article_id):
+        _, terms, _, _ = self._docs.pop(article_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[article_id]
+            if not postings:
+                del self._postings[term]
+                self._terms_dirty = True
+
+    def _expand(self, prefix: str) -> list:
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\U0010ffff", start)
+        return self._terms[start:end]
+
+    def search(self, query: str = "", category: str = None, offset: int = 0, limit: int = 20) -> dict:
+        """Articles matching every word of `query` (as prefixes), best match first.
+
+        Returns {"total", "results", "facets"}: `results` holds up to `limit`
+        article summaries starting at `offset`, `total` counts all matches
+        within `category`, and `facets` counts the matches per category
+        regardless of the category filter. An empty query matches every
+        article in catalog order.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            if words:
+                scores = None
+                for word in words:
+                    word_scores = {}
+                    for term in self._expand(word):
+                        bonus = EXACT_BONUS if term == word else 1.0
+                        for article_id, weight in self._postings[term].items():
+                            score = weight * bonus
+                            if score > word_scores.get(article_id, 0.0):
+                                word_scores[article_id] = score
+                    if scores is None:
+                        scores = word_scores
+                    else:
+                        scores = {i: s + word_scores[i] for i, s in scores.items() if i in word_scores}
+                    if not scores:
+                        break
+                order = self._order
+                ranked = sorted(scores, key=lambda i: (-scores[i], order.get(i, 0)))
+            else:
+                ranked = sorted(self._docs, key=self._order.get)
+
+            docs = self._docs
+            facets = dict.fromkeys(sorted(ALLOWED_CATEGORIES), 0)
+            for article_id in ranked:
+                doc_category = docs[article_id][3]
+                if doc_category in facets:
+                    facets[doc_category] += 1
+            if category:
+                ranked = [i for i in ranked if docs[i][3] == category]
+            results = [dict(docs[i][2]) for i in ranked[offset:offset + limit]]
+        return {"total": len(ranked), "results": results, "facets": facets}
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Produktionsstart med flera arbetsprocesser.
+
+    python serve.py                      # WORKERS processer (standard: antal kärnor, högst 4)
+    python serve.py --workers 8 --port 8080
+    python serve.py --fast-start         # ta emot anslutningar innan uppvärmningen är klar
+
+Huvudprocessen laddar appen, läser in artikelkatalogen och renderar
+startsidan innan den forkar arbetsprocesserna, så att de delar det inlästa
+minnet och kan svara direkt. Med --fast-start (eller
+STARTUP_WARMUP=background) forkas arbetsprocesserna direkt och värmer upp
+var för sig i bakgrunden; /healthz svarar då genast och /readyz först när
+processen är varm. Alla arbetsprocesser tar emot anslutningar på
+samma socket, var och en med en tråd per anslutning (som `python app.py`).
+
+Det som måste vara gemensamt för processerna delas via filer under cache/:
+rate limiting-räknarna i en SQLite-databas (RATELIMIT_STORAGE_URI), så att
+"200 per minute" och /save-gränsen gäller totalt och inte per process, och
+mätvärdena för /metrics (METRICS_DIR).
+
+En arbetsprocess som dör startas om. SIGTERM eller Ctrl+C stänger ner:
+processerna slutar ta emot nya anslutningar, väntar högst
+SHUTDOWN_GRACE_SECONDS på pågående requests och skriver köade sparningar
+och osparade autosparade utkast.
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import socket
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Hur länge pågående requests får avslutas vid nedstängning
+SHUTDOWN_GRACE_SECONDS = float(os.environ.get("SHUTDOWN_GRACE_SECONDS", 10))
+# En arbetsprocess som dör snabbare än så här startas om först efter en paus
+MIN_WORKER_LIFETIME = 1.0
+
+
+def configure_environment():
+    """Shared limiter and metrics storage for all workers, unless configured otherwise."""
+    cache_dir = os.path.join(BASE_DIR, "cache")
+    os.environ.setdefault("RATELIMIT_STORAGE_URI", "sqlite://" + os.path.join(cache_dir, "ratelimit.sqlite3"))
+    metrics_dir = os.environ.setdefault("METRICS_DIR", os.path.join(cache_dir, "metrics"))
+    # Värden från en tidigare körning hör inte hit
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+class InFlight:
+    """WSGI middleware counting requests whose response has not finished yet."""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _done(self):
+        with self._lock:
+            self.count -= 1
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.count += 1
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._done()
+            raise
+        return _ClosingIterator(body, self._done)
+
+    def wait(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while self.count > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+
+class _ClosingIterator:
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, "close"):
+                self.body.close()
+        finally:
+            self.on_close()
+
+
+def warm_up(webapp, mode):
+    """Warm up before forking unless the workers do it ("background"), then release SQLite handles."""
+    if mode == "sync":
+        webapp.WARMUP.run()
+    elif mode == "off":
+        webapp.WARMUP.skip()
+    # SQLite-anslutningar får inte följa med över fork; arbetsprocesserna öppnar egna
+    webapp.EVENT_LOG.close()
+    webapp.AUTOSAVE.close()
+    webapp.SAVE_STORE.close()
+
+
+def watch_parent(parent_pid, stop):
+    """Stop the worker if the supervising process disappears (e.g. after SIGKILL)."""
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    stop()
+
+
+def run_worker(webapp, sock, host, port, parent_pid, mode):
+    """Serve on the inherited socket until SIGTERM/SIGINT; never returns."""
+    from werkzeug.serving import make_server
+
+    status = 0
+    try:
+        if mode == "background":
+            webapp.WARMUP.start()
+        inflight = InFlight(webapp.app)
+        server = make_server(host, port, inflight, threaded=True, fd=sock.fileno())
+
+        def stop(*_):
+            # shutdown() väntar på serve_forever och får inte anropas från samma tråd
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        threading.Thread(target=watch_parent, args=(parent_pid, stop), daemon=True).start()
+        server.serve_forever()
+        server.server_close()
+        inflight.wait(SHUTDOWN_GRACE_SECONDS)
+        # Osparade autosparade utkast sparas direkt i stället för efter fördröjningen
+        webapp.AUTOSAVE.flush_due(force=True)
+        webapp.SAVE_STORE.close()
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        status = 1
+    finally:
+        # os._exit() kör inte atexit, så processens mätvärdesfil tas bort här
+        webapp.METRICS.unshare()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        # Aldrig tillbaka in i huvudprocessens kod
+        os._exit(status)
+
+
+def serve(workers: int, host: str, port: int, fast_start: bool = False):
+    configure_environment()
+    # Uppvärmningen styrs härifrån: före fork (delat minne) eller i varje arbetsprocess
+    mode = "background" if fast_start else os.environ.get("STARTUP_WARMUP", "sync").lower()
+    os.environ["STARTUP_WARMUP"] = "manual"
+    import app as webapp
+
+    warm_up(webapp, mode)
+    sock = socket.create_server((host, port), backlog=256)
+
+    children = {}  # pid -> start time
+    stopping = False
+    parent_pid = os.getpid()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            run_worker(webapp, sock, host, port, parent_pid, mode)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Sista utvägen om någon process inte avslutas i tid
+        signal.alarm(int(SHUTDOWN_GRACE_SECONDS) + 5)
+
+    def kill_all(signum, frame):
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGALRM, kill_all)
+
+    print("=" * 50)
+    print("🗞️  Tidningssimulator - BLT Framsidebyggare")
+    print("=" * 50)
+    print(f"{workers} arbetsprocesser på http://{host}:{port}")
+    print(f"Rate limiting: {os.environ['RATELIMIT_STORAGE_URI']}")
+    print("=" * 50)
+    sys.stdout.flush()
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Arbetsprocess {pid} avslutades oväntat (status {status}), startar en ny", file=sys.stderr)
+        if time.monotonic() - started < MIN_WORKER_LIFETIME:
+            time.sleep(MIN_WORKER_LIFETIME)
+        if not stopping:
+            spawn()
+    sock.close()
+
+
+def main():
+    default_workers = int(os.environ.get("WORKERS", min(4, os.cpu_count() or 1)))
+    parser = argparse.ArgumentParser(description="Kör Tidningssimulatorn med flera arbetsprocesser.")
+    parser.add_argument("--workers", type=int, default=default_workers,
+                        help=f"antal arbetsprocesser (standard: WORKERS eller {default_workers})")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--fast-start", action="store_true",
+                        help="forka direkt och värm upp i varje arbetsprocess (kortare tid till /healthz)")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork"):
+        # Windows: ingen fork, kör som `python app.py`
+        print("Flera arbetsprocesser kräver fork (Linux/macOS), startar en process", file=sys.stderr)
+        import app as webapp
+        webapp.app.run(host=args.host, port=args.port, threaded=True)
+        return
+    serve(max(1, args.workers), args.host, args.port, args.fast_start)
+
+
+if __name__ == "__main__":
+    main()
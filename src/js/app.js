@@ -1,18 +1,35 @@
-
-
+import { initDragDrop, updateSlotPlaceholders } from './dragdrop.js';
+import { initModal, showArticlePreview } from './modal.js';
+import { initUI, adjustTextFit, addFontSizeControls, updatePostits, enableEditMode } from './ui.js';
+import { articles } from './state.js';
+import { initAutosave } from './autosave.js';
 
 function safeClear(element) {
   while (element && element.firstChild) element.firstChild.remove();
 }
 
-  // Classic static initialization (no dynamic JSON layout)
-  // All slot structure is in the HTML template.
-  // No dynamic rendering or editor.
+export function initApp() {
   console.log('[Tidningssimulator] initApp start');
-  // Optionally, initialize any static JS needed for classic mode here.
+  initUI();
+  initModal();
+  initDragDrop();
+  initButtons();
+  initDesignToggle();
+  initFinishButton();
+  initStepProgression();
+  initEditMode();
+  initAutosave(getSlotConfig);
+  updateSlotPlaceholders();
+
+  // Text fit observer
+  adjustTextFit();
+  const textObserver = new MutationObserver(() => adjustTextFit());
+  textObserver.observe(document.body, { childList: true, subtree: true, characterData: true });
+
+  window.adjustTextFit = adjustTextFit;
 }
 
-function showToast(message, type = 'success') {
+export function showToast(message, type = 'success') {
   const toast = document.getElementById('toast');
   if (!toast) return;
   toast.textContent = message;
@@ -20,7 +37,7 @@ function showToast(message, type = 'success') {
   setTimeout(() => { toast.classList.remove('show'); }, 3000);
 }
 
-function getSlotConfig() {
+export function getSlotConfig() {
   const slots = {};
   for (const slot of document.querySelectorAll('.slot')) {
     const slotId = slot.dataset.slot;
@@ -33,18 +50,42 @@ function getSlotConfig() {
 async function saveFrontpage() {
   const groupName = document.getElementById('groupName').value.trim();
   if (!groupName) { showToast('Ange ett gruppnamn först!', 'error'); return; }
-  const data = { groupName, slots: getSlotConfig(), timestamp: new Date().toISOString() };
+  
+  showToast('Sparar framsida...', 'info');
+  
   try {
-    const response = await fetch('/save', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify(data) });
+    const data = { 
+      groupName, 
+      slots: getSlotConfig(), 
+      timestamp: new Date().toISOString()
+    };
+    
+    const response = await fetch('/save', { 
+      method: 'POST', 
+      headers: {'Content-Type':'application/json'}, 
+      body: JSON.stringify(data) 
+    });
     const result = await response.json();
-    if (result.success) { showToast(`Sparat som ${result.filename.replace('.json','')}`, 'success'); }
+    if (result.success) { 
+      showToast(`Sparat som ${result.filename.replace('.json','')}`, 'success'); 
+    }
     else { showToast('Något gick fel vid sparande', 'error'); }
-  } catch (error) { console.error('Save error', error); showToast('Kunde inte spara', 'error'); }
+  } catch (error) { 
+    console.error('Save error', error); 
+    showToast('Kunde inte spara', 'error'); 
+  }
 }
 
 function generatePdf() {
   const groupName = document.getElementById('groupName').value.trim();
   if (!groupName) { showToast('Ange ett gruppnamn först!', 'error'); return; }
+  
+  // Uppdatera grupp-footer med gruppnamnet
+  const groupFooter = document.getElementById('groupFooter');
+  if (groupFooter) {
+    groupFooter.textContent = 'Gjord av ' + groupName;
+  }
+  
   window.print();
   setTimeout(() => {
     if (!document.body.classList.contains('edit-mode')) {
@@ -62,16 +103,31 @@ function initDesignToggle() {
   const select = document.getElementById('designSelect');
   const newspaper = document.querySelector('.newspaper');
   if (!select || !newspaper) return;
-  const saved = localStorage.getItem('blt-design-choice') || 'blt-original';
-  select.value = saved;
-  applyDesign(saved);
-  select.addEventListener('change', () => { const choice = select.value; applyDesign(choice); localStorage.setItem('blt-design-choice', choice); showToast(`${choice} aktiverad`, 'success'); });
+  // Sätt grid-botten som default och göm menyn
+  const defaultDesign = 'sidref-gridbotten';
+  localStorage.setItem('blt-design-choice', defaultDesign);
+  select.value = defaultDesign;
+  applyDesign(defaultDesign);
+  document.querySelector('.design-selector').style.display = 'none';
 }
 
 function applyDesign(design) {
   const newspaper = document.querySelector('.newspaper');
   if (!newspaper) return;
-  // Keep single BLT original design mode only
+  // Ta bort alla sidreferens-varianter
+  newspaper.classList.remove(
+    'sidref-inline',
+    'sidref-absbotten',
+    'sidref-flexbotten',
+    'sidref-gridbotten',
+    'sidref-offset',
+    'sidref-dold'
+  );
+  // Lägg till rätt klass
+  if (design.startsWith('sidref-')) {
+    newspaper.classList.add(design);
+  }
+  // Alltid BLT original för övrig styling
   document.body.classList.remove('blt-original');
   document.body.classList.add('blt-original');
 }
@@ -86,6 +142,16 @@ function setActiveStep(stepNumber) {
   }
 }
 
+function initFinishButton() {
+  const finishButton = document.getElementById('finishBtn');
+  const finishContainer = document.getElementById('finishBtnContainer');
+  const rightPanel = document.getElementById('rightPanel');
+  finishButton?.addEventListener('click', () => {
+    // finishContainer.style.setProperty('display','none','important'); // Ta inte bort knappen längre
+    rightPanel.style.setProperty('display','flex','important');
+    setActiveStep(1);
+  });
+}
 
 function initStepProgression() {
   const groupNameInput = document.getElementById('groupName');
@@ -122,4 +188,4 @@ function showEditModeOffer() {
   return true;
 }
 
-export { showToast, getSlotConfig };
+
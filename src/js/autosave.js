@@ -0,0 +1,126 @@
+// Autosave: sends only the slots that changed since the revision the server last acknowledged.
+// The server coalesces the changes and saves a snapshot once the layout has been quiet for a while.
+
+const SYNC_DELAY = 1000;
+const RETRY_DELAY = 5000;
+
+let getSlots = () => ({});
+let draftId = '';
+let rev = 0;            // last revision the server acknowledged
+let nextRev = 1;        // every request gets a new, higher revision
+let acked = {};         // slots as the server has them at `rev`
+let ackedGroup = '';
+let serverPending = false;
+let timer = null;
+let syncing = false;
+let again = false;
+
+function newDraftId() {
+  const bytes = new Uint8Array(12);
+  crypto.getRandomValues(bytes);
+  return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function currentGroupName() {
+  return document.getElementById('groupName')?.value.trim() || '';
+}
+
+function changedSlots() {
+  const changes = {};
+  for (const [slot, articleId] of Object.entries(getSlots())) {
+    if ((acked[slot] ?? null) !== (articleId ?? null)) changes[slot] = articleId ?? null;
+  }
+  return changes;
+}
+
+function hasArticles(slots) {
+  return Object.values(slots).some(articleId => articleId);
+}
+
+// Nothing to send before there is a group name, or while a fresh page is still empty
+// (so reloading the editor never replaces the group's work with a blank layout)
+function shouldSync(name, changes) {
+  if (!name) return false;
+  if (!hasArticles(acked) && !hasArticles(changes)) return false;
+  return Object.keys(changes).length > 0 || name !== ackedGroup;
+}
+
+function schedule(delay = SYNC_DELAY) {
+  clearTimeout(timer);
+  timer = setTimeout(sync, delay);
+}
+
+async function sync() {
+  timer = null;
+  if (syncing) { again = true; return; }
+  const name = currentGroupName();
+  const changes = changedSlots();
+  if (!shouldSync(name, changes)) return;
+
+  syncing = true;
+  const sent = nextRev++;
+  try {
+    const response = await fetch('/autosave', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ draft: draftId, base: rev, rev: sent, changes, groupName: name })
+    });
+    const result = await response.json();
+    if (response.ok) {
+      rev = result.rev;
+      acked = { ...acked, ...changes };
+      ackedGroup = name;
+      serverPending = result.pending;
+    } else if (response.status === 409) {
+      // The server is at another revision (e.g. a lost response): diff against what it has instead
+      rev = result.rev;
+      nextRev = Math.max(nextRev, rev + 1);
+      acked = result.slots || {};
+      ackedGroup = result.groupName || '';
+      again = true;
+    } else {
+      schedule(RETRY_DELAY);
+    }
+  } catch (error) {
+    console.warn('[Tidningssimulator] autosave failed', error);
+    schedule(RETRY_DELAY);
+  } finally {
+    syncing = false;
+    if (again) { again = false; schedule(0); }
+  }
+}
+
+// When the tab is hidden or closed, send the whole layout and ask the server to save it right away
+function flushNow() {
+  const name = currentGroupName();
+  const slots = getSlots();
+  const changes = changedSlots();
+  if (!navigator.sendBeacon || (!shouldSync(name, changes) && !serverPending)) return;
+  clearTimeout(timer);
+  const sent = nextRev++;
+  const body = JSON.stringify({
+    draft: draftId, base: rev, rev: sent, changes: slots, groupName: name, full: true, flush: true
+  });
+  if (navigator.sendBeacon('/autosave', new Blob([body], { type: 'application/json' }))) {
+    rev = sent;
+    acked = { ...slots };
+    ackedGroup = name;
+    serverPending = false;
+  }
+}
+
+export function initAutosave(slotConfig) {
+  getSlots = slotConfig;
+  draftId = newDraftId();
+
+  const observer = new MutationObserver(() => schedule());
+  for (const slot of document.querySelectorAll('.slot')) {
+    observer.observe(slot, { attributes: true, attributeFilter: ['data-article-id'] });
+  }
+  document.getElementById('groupName')?.addEventListener('input', () => schedule());
+
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushNow();
+  });
+  window.addEventListener('pagehide', flushNow);
+}
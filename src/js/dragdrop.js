@@ -1,4 +1,4 @@
-import { articles, usedArticles, CHAR_LIMITS, truncateText, clearChildren, capitalize } from './state.js';
+import { articles, usedArticles, CHAR_LIMITS, truncateText, clearChildren, capitalize, findArticle, hasArticleDetails, loadArticleDetails, imageUrl } from './state.js';
 import { addFontSizeControls, adjustTextFit, updatePostits, makeSlotEditable } from './ui.js';
 
 export function initDragDrop() {
@@ -13,6 +13,8 @@ export function initDragDrop() {
         card.classList.add('dragging');
         e.dataTransfer.setData('text/plain', card.dataset.id);
         e.dataTransfer.setData('source', 'sidebar');
+        // Start fetching quote/body so they are likely there by the drop
+        loadArticleDetails([card.dataset.id]);
       });
       card.addEventListener('dragend', () => card.classList.remove('dragging'));
     }
@@ -70,7 +72,7 @@ function updateArticleCardState(articleId, isUsed) {
 }
 
 export function setPuffArticle(slot, articleId) {
-  const article = articles.find(a => String(a.id) === String(articleId));
+  const article = findArticle(articleId);
   if (!article) return;
 
   const previousId = slot.dataset.articleId;
@@ -90,7 +92,7 @@ export function setPuffArticle(slot, articleId) {
   // Keep the dot but remove the extra normal space so headline can sit tighter.
   category.textContent = (capitalize(article.category) || '') + '.';
   headline.classList.remove('char-warning');
-  headline.textContent = article.headline || '';
+  headline.textContent = truncateText(article.headline || '', 37);
   page.textContent = 'Sidan ' + (article.page || (Math.floor(Math.random() * 10) + 2));
 
   makeSlotEditable(slot);
@@ -115,7 +117,7 @@ export function clearPuff(slot) {
 }
 
 export function setSlotArticle(slot, articleId) {
-  const article = articles.find(a => String(a.id) === String(articleId));
+  const article = findArticle(articleId);
   if (!article) return;
 
   const previousId = slot.dataset.articleId;
@@ -153,11 +155,21 @@ export function setSlotArticle(slot, articleId) {
     const categoryText = article.category ? capitalize(article.category) : '';
     clearChildren(content);
     const adiv = document.createElement('div'); adiv.className = 'article-display citat-display';
-    const block = document.createElement('blockquote'); block.className = 'citat-text'; block.textContent = `"${quoteText}"`;
-    const quoteChar = document.createElement('img'); quoteChar.className = 'citattecken'; quoteChar.src = '/static/images/citattecken.1.jpeg'; quoteChar.alt = '';
+    const block = document.createElement('blockquote'); block.className = 'citat-text'; block.textContent = quoteText;
+    const quoteChar = document.createElement('img'); quoteChar.className = 'citattecken'; quoteChar.src = imageUrl('images/citattecken.1.jpeg', 'thumb'); quoteChar.alt = '';
     const pSender = document.createElement('p'); pSender.className = 'citat-sender'; pSender.textContent = sender;
     const pPage = document.createElement('p'); pPage.className = 'article-page'; pPage.textContent = categoryText + (categoryText ? ' sidan ' : 'Sidan ') + pageNumber;
     adiv.append(block); adiv.append(quoteChar); adiv.append(pSender); adiv.append(pPage); content.append(adiv);
+    if (!hasArticleDetails(articleId)) {
+      // The quote is not part of the embedded summary - fill it in once loaded
+      loadArticleDetails([articleId]).then(() => {
+        if (slot.dataset.articleId !== String(articleId)) return;
+        const full = findArticle(articleId);
+        block.textContent = full.quote || full.headline;
+        pSender.textContent = full.quoteSender || full.category || '';
+        if (typeof adjustTextFit === 'function') adjustTextFit();
+      });
+    }
   } else if (isHuvudnyhet) {
     const headlineText = truncateText(article.headline || '', CHAR_LIMITS.headline);
     const ingressText = article.subheadline || '';
@@ -165,18 +177,20 @@ export function setSlotArticle(slot, articleId) {
     clearChildren(content);
     const adiv = document.createElement('div'); adiv.className = 'article-display huvudnyhet-display';
     const hero = document.createElement('div'); hero.className = 'hero-image-container';
-    const img = document.createElement('img'); img.className = 'hero-image'; if (article.image) img.src = article.image; img.alt = article.headline || '';
+    const img = document.createElement('img'); img.className = 'hero-image'; if (article.image) img.src = imageUrl(article.image, 'slot'); img.alt = article.headline || '';
     img.addEventListener('error', () => { img.style.display = 'none'; });
     const overlay = document.createElement('div'); overlay.className = 'headline-overlay';
     const h3wrap = document.createElement('h3'); const span = document.createElement('span'); span.textContent = headlineText; h3wrap.append(span);
-    const pageSpan = document.createElement('span'); pageSpan.className = 'huvudnyhet-page'; pageSpan.textContent = `Sidan ${pageNumber}`;
+    const categoryText = article.category ? capitalize(article.category) : '';
+    const pageSpan = document.createElement('span'); pageSpan.className = 'huvudnyhet-page'; pageSpan.textContent = categoryText + (categoryText ? ' sidan ' : 'Sidan ') + pageNumber;
     overlay.append(h3wrap); overlay.append(pageSpan);
     hero.append(img); hero.append(overlay);
     const ingressDiv = document.createElement('div'); ingressDiv.className = 'huvudnyhet-ingress'; const pIngress = document.createElement('p'); pIngress.textContent = ingressText; ingressDiv.append(pIngress);
     adiv.append(hero); adiv.append(ingressDiv); content.append(adiv);
   } else if (isMellan) {
-    const headlineText = article.headline || '';
+    const headlineText = truncateText(article.headline || '', 37);
     const pageNumber = article.page || (Math.floor(Math.random() * 10) + 2);
+    const categoryText = article.category ? capitalize(article.category) : '';
     clearChildren(content);
     const adiv = document.createElement('div'); adiv.className = 'article-display artikel-large-headline';
     const controls = document.createElement('div'); controls.className = 'font-size-controls';
@@ -184,12 +198,13 @@ export function setSlotArticle(slot, articleId) {
     const inc = document.createElement('button'); inc.className = 'font-size-btn increase'; inc.title = 'Öka textstorlek'; inc.textContent = '+';
     controls.append(dec); controls.append(inc);
     const h3 = document.createElement('h3'); h3.textContent = headlineText;
-    const p = document.createElement('p'); p.className = 'article-page'; p.textContent = `Sidan ${pageNumber}`;
+    const p = document.createElement('p'); p.className = 'article-page'; p.textContent = categoryText + (categoryText ? ' sidan ' : 'Sidan ') + pageNumber;
     adiv.append(controls); adiv.append(h3); adiv.append(p); content.append(adiv);
     addFontSizeControls(content);
   } else if (isLiten) {
-    const headlineText = article.headline || '';
+    const headlineText = truncateText(article.headline || '', 37);
     const pageNumber = article.page || (Math.floor(Math.random() * 10) + 2);
+    const categoryText = article.category ? capitalize(article.category) : '';
     clearChildren(content);
     const adiv = document.createElement('div'); adiv.className = 'article-display notis-large-headline';
     const controls = document.createElement('div'); controls.className = 'font-size-controls';
@@ -197,7 +212,7 @@ export function setSlotArticle(slot, articleId) {
     const inc = document.createElement('button'); inc.className = 'font-size-btn increase'; inc.title = 'Öka textstorlek'; inc.textContent = '+';
     controls.append(dec); controls.append(inc);
     const h3 = document.createElement('h3'); h3.textContent = headlineText;
-    const p = document.createElement('p'); p.className = 'article-page'; p.textContent = `Sidan ${pageNumber}`;
+    const p = document.createElement('p'); p.className = 'article-page'; p.textContent = categoryText + (categoryText ? ' sidan ' : 'Sidan ') + pageNumber;
     adiv.append(controls); adiv.append(h3); adiv.append(p); content.append(adiv);
     addFontSizeControls(content);
   }
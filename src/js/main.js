@@ -1,3 +1,4 @@
+import './sidebar.js';
 import { initApp } from './app.js';
 
 if (typeof window !== 'undefined') {
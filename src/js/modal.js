@@ -1,4 +1,4 @@
-import { articles, clearChildren, capitalize } from './state.js';
+import { articles, clearChildren, capitalize, findArticle, hasArticleDetails, loadArticleDetails, imageUrl } from './state.js';
 
 export function initModal() {
   try {
@@ -24,16 +24,28 @@ export function initModal() {
         showArticlePreview(articleId);
       });
     }
+    
+    // Expose showArticlePreview to window for package articles
+    window.showArticlePreview = showArticlePreview;
   } catch {
     // non-fatal
   }
 }
 
 export function showArticlePreview(articleId) {
-  const article = articles.find(a => String(a.id) === String(articleId));
+  const article = findArticle(articleId);
   if (!article) return;
   const modal = document.getElementById('articleModal');
   if (!modal) return;
+  modal.dataset.articleId = String(articleId);
+  if (!hasArticleDetails(articleId)) {
+    // Show the summary right away and re-render when the full article has arrived
+    loadArticleDetails([articleId]).then(() => {
+      if (hasArticleDetails(articleId) && modal.classList.contains('show') && modal.dataset.articleId === String(articleId)) {
+        showArticlePreview(articleId);
+      }
+    });
+  }
 
   modal.querySelector('.modal-category').textContent = capitalize(article.category) || '';
   modal.querySelector('.modal-headline').textContent = article.headline || '';
@@ -43,7 +55,7 @@ export function showArticlePreview(articleId) {
   clearChildren(imageContainer);
   if (article.image) {
     const img = document.createElement('img');
-    img.src = article.image;
+    img.src = imageUrl(article.image, 'slot');
     img.alt = article.headline || '';
     imageContainer.append(img);
   } else {
@@ -52,7 +64,7 @@ export function showArticlePreview(articleId) {
     span.style.alignItems = 'center';
     span.style.justifyContent = 'center';
     span.style.height = '100%';
-    span.style.color = '#3c3c3c'; // BLT sekundärgrå
+    span.style.color = '#999';
     span.textContent = '📷 Ingen bild';
     imageContainer.append(span);
   }
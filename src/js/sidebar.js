@@ -0,0 +1,227 @@
+import { capitalize } from './state.js';
+
+// Artikellistan byggs från catalog-data (samma sammanfattningar som resten av
+// sidan använder) innan initApp kopplar på drag och förhandsvisning
+renderArticleList();
+
+// Gör så att krysset stänger panelen
+document.addEventListener('DOMContentLoaded', function() {
+  const closePanelBtn = document.getElementById('closePanelBtn');
+  const rightPanel = document.getElementById('rightPanel');
+  if (closePanelBtn && rightPanel) {
+    closePanelBtn.addEventListener('click', function() {
+      rightPanel.style.display = 'none';
+    });
+  }
+  
+  // Toggle för hjälp-rutan
+  const descriptionToggle = document.getElementById('descriptionToggle');
+  const descriptionBox = document.getElementById('newspaperDescription');
+  if (descriptionToggle && descriptionBox) {
+    descriptionToggle.addEventListener('click', function() {
+      descriptionBox.classList.toggle('expanded');
+    });
+  }
+  
+  // Highlighta tidningsdelar vid hover på hjälptexterna
+  const descriptionSections = document.querySelectorAll('.description-section[data-section]');
+  descriptionSections.forEach(section => {
+    const sectionName = section.dataset.section;
+    section.addEventListener('mouseenter', function() {
+      // Hitta rätt element att highlighta baserat på section
+      let targetSelector = '';
+      if (sectionName === 'puffar') {
+        targetSelector = '.puffar-section';
+      } else if (sectionName === 'texttopp') {
+        targetSelector = '.texttopp';
+      } else if (sectionName === 'huvudnyhet') {
+        targetSelector = '.huvudnyhet';
+      } else if (sectionName === 'bottom') {
+        targetSelector = '.bottom-section';
+      }
+      if (targetSelector) {
+        const target = document.querySelector(targetSelector);
+        if (target) target.classList.add('help-highlight');
+      }
+    });
+    section.addEventListener('mouseleave', function() {
+      // Ta bort highlight
+      document.querySelectorAll('.help-highlight').forEach(el => el.classList.remove('help-highlight'));
+    });
+  });
+  
+  // Package folder navigation
+  initPackageFolders();
+
+  // Sök bland artiklarna
+  initArticleSearch();
+});
+
+// Package folder initialization
+function initPackageFolders() {
+  const packages = window.PACKAGES_DATA || [];
+  const articleList = document.getElementById('articleList');
+  const packageView = document.getElementById('packageArticlesView');
+  const packageArticlesList = document.getElementById('packageArticlesList');
+  const packageTitle = document.getElementById('packageTitle');
+  const backBtn = document.getElementById('packageBackBtn');
+  
+  if (!packages.length || !articleList || !packageView) return;
+  
+  // Click handlers for package folders
+  document.querySelectorAll('.package-folder').forEach(folder => {
+    folder.addEventListener('click', function() {
+      const packageId = this.dataset.packageId;
+      const pkg = packages.find(p => p.id === packageId);
+      if (!pkg) return;
+      
+      // Show package articles view
+      articleList.style.display = 'none';
+      packageView.style.display = 'block';
+      packageTitle.textContent = pkg.icon + ' ' + pkg.name;
+      
+      // Render package articles
+      packageArticlesList.innerHTML = '';
+      pkg.articles.forEach(article => {
+        packageArticlesList.appendChild(createSidebarCard(article));
+      });
+    });
+  });
+  
+  // Back button handler
+  if (backBtn) {
+    backBtn.addEventListener('click', function() {
+      packageView.style.display = 'none';
+      articleList.style.display = 'block';
+    });
+  }
+}
+
+// Fritextsökning i sidopanelen (/api/search)
+function initArticleSearch() {
+  const input = document.getElementById('articleSearch');
+  const categorySelect = document.getElementById('articleSearchCategory');
+  const articleList = document.getElementById('articleList');
+  const packageView = document.getElementById('packageArticlesView');
+  const resultsView = document.getElementById('searchResults');
+  const resultsList = document.getElementById('searchResultsList');
+  const resultsInfo = document.getElementById('searchResultsInfo');
+  const moreBtn = document.getElementById('searchMoreBtn');
+
+  if (!input || !categorySelect || !articleList || !resultsView) return;
+
+  let timer = null;
+  let latest = 0;
+  let nextOffset = null;
+
+  function showFacets(facets) {
+    for (const option of categorySelect.options) {
+      if (!option.value) continue;
+      option.textContent = facets ? `${option.dataset.label} (${facets[option.value] || 0})` : option.dataset.label;
+    }
+  }
+
+  function search(more) {
+    const query = input.value.trim();
+    const category = categorySelect.value;
+    const id = ++latest;
+    if (!query && !category) {
+      resultsView.style.display = 'none';
+      articleList.style.display = 'block';
+      showFacets(null);
+      return;
+    }
+    const params = new URLSearchParams({ q: query, limit: '50', v: window.CATALOG_VERSION || '' });
+    if (category) params.set('category', category);
+    if (more && nextOffset !== null) params.set('offset', nextOffset);
+    fetch('/api/search?' + params)
+      .then(response => response.ok ? response.json() : Promise.reject(response.status))
+      .then(data => {
+        if (id !== latest) return;  // en nyare sökning hann före
+        if (!more) resultsList.innerHTML = '';
+        data.results.forEach(article => resultsList.appendChild(createSidebarCard(article)));
+        nextOffset = data.next_offset;
+        if (moreBtn) moreBtn.style.display = nextOffset === null ? 'none' : 'block';
+        resultsInfo.textContent = data.total ? `${data.total} träffar` : 'Inga artiklar hittades';
+        showFacets(data.facets);
+        articleList.style.display = 'none';
+        if (packageView) packageView.style.display = 'none';
+        resultsView.style.display = 'block';
+      })
+      .catch(() => {
+        if (id === latest) resultsInfo.textContent = 'Sökningen misslyckades, försök igen';
+      });
+  }
+
+  input.addEventListener('input', function() {
+    clearTimeout(timer);
+    timer = setTimeout(() => search(false), 200);
+  });
+  categorySelect.addEventListener('change', () => search(false));
+  if (moreBtn) moreBtn.addEventListener('click', () => search(true));
+}
+
+// The main article list, inserted above the theme folders
+function renderArticleList() {
+  const articleList = document.getElementById('articleList');
+  if (!articleList) return;
+  const cards = document.createDocumentFragment();
+  (window.ARTICLES_DATA || []).forEach(article => cards.appendChild(sidebarCardElement(article)));
+  articleList.insertBefore(cards, articleList.firstChild);
+}
+
+// Card markup for an article summary; drag and preview handlers are added by the caller
+function sidebarCardElement(article) {
+  const card = document.createElement('div');
+  card.className = 'article-card';
+  card.draggable = true;
+  card.dataset.id = article.id;
+  const category = document.createElement('span');
+  category.className = 'article-category';
+  category.textContent = capitalize(article.category || 'Nyheter');
+  const headline = document.createElement('h3');
+  headline.textContent = article.headline || '';
+  const subheadline = document.createElement('p');
+  subheadline.textContent = article.subheadline || '';
+  card.append(category, headline, subheadline);
+  return card;
+}
+
+// Sidebar card for an article summary (package folders and search results)
+function createSidebarCard(article) {
+  const card = sidebarCardElement(article);
+
+  // Add drag handlers
+  card.addEventListener('dragstart', function(e) {
+    e.dataTransfer.setData('text/plain', article.id);
+    e.dataTransfer.setData('source', 'sidebar');
+    e.dataTransfer.setData('article-data', JSON.stringify(article));
+    if (window.loadArticleDetails) window.loadArticleDetails([article.id]);
+    this.classList.add('dragging');
+  });
+  card.addEventListener('dragend', function() {
+    this.classList.remove('dragging');
+  });
+  
+  // Add click handler for preview
+  card.addEventListener('click', function() {
+    if (this.classList.contains('dragging')) return;
+    if (window.showArticlePreview) {
+      window.showArticlePreview(article.id);
+    }
+  });
+  return card;
+}
+
+// --- TEST: Flytta alltid .article-page till sist i .article-display för mellan1/liten1/liten2 ---
+function ensurePageRefPlacement() {
+  ["mellan1","liten1","liten2"].forEach(slot => {
+    document.querySelectorAll(`.slot[data-slot='${slot}'] .article-display`).forEach(adiv => {
+      const page = adiv.querySelector('.article-page');
+      if (page && page !== adiv.lastElementChild) adiv.appendChild(page);
+    });
+  });
+}
+document.addEventListener('DOMContentLoaded', ensurePageRefPlacement);
+// Kör även efter varje render om du har dynamisk rendering
+// Ingen flytt av .article-page längre – den ska ligga kvar i .article-display för mellan1/liten1/liten2
@@ -1,6 +1,9 @@
 // Shared application state and helpers
 const appDataElement = typeof document === 'undefined' ? null : document.getElementById('app-data');
-export const articles = appDataElement ? JSON.parse(appDataElement.dataset.articles || '[]') : [];
+// Article summaries embedded in the page; full details are loaded on demand
+export const articles = typeof window !== 'undefined' && window.ARTICLES_DATA ? window.ARTICLES_DATA : [];
+export const packages = typeof window !== 'undefined' && window.PACKAGES_DATA ? window.PACKAGES_DATA : [];
+const catalogVersion = typeof window !== 'undefined' ? window.CATALOG_VERSION || '' : '';
 export const CHAR_LIMITS = appDataElement ? JSON.parse(appDataElement.dataset.charLimits || '{}') : {
   puff: 40,
   headline: 70,
@@ -33,3 +36,65 @@ export function capitalize(str) {
   const s = String(str).toLowerCase();
   return s.charAt(0).toUpperCase() + s.slice(1);
 }
+
+// Full article details (body, byline, quote) by id, filled by loadArticleDetails()
+const articleDetails = {};
+const pendingDetails = {};
+
+// Find article in main list or packages (with details merged in once loaded)
+export function findArticle(articleId) {
+  // First check main articles
+  let article = articles.find(a => String(a.id) === String(articleId));
+  
+  // Then check packages
+  for (const pkg of packages) {
+    if (article) break;
+    article = (pkg.articles || []).find(a => String(a.id) === String(articleId));
+  }
+  
+  if (!article) return null;
+  const details = articleDetails[String(articleId)];
+  return details ? Object.assign({}, article, details) : article;
+}
+
+export function hasArticleDetails(articleId) {
+  return String(articleId) in articleDetails;
+}
+
+// Fetch full details for the given ids in one request; resolves when all are cached
+export function loadArticleDetails(ids) {
+  const wanted = [...new Set(ids.filter(Boolean).map(String))];
+  const missing = wanted.filter(id => !(id in articleDetails) && !(id in pendingDetails));
+  // The server accepts at most 200 ids per request
+  for (let i = 0; i < missing.length; i += 100) {
+    const batch = missing.slice(i, i + 100);
+    const request = fetch('/api/articles?ids=' + batch.join(',') + '&v=' + encodeURIComponent(catalogVersion))
+      .then(res => {
+        if (!res.ok) throw new Error('HTTP ' + res.status);
+        return res.json();
+      })
+      .then(data => {
+        for (const a of data.articles || []) articleDetails[String(a.id)] = a;
+        // Unknown ids: remember that there is nothing more to fetch
+        for (const id of batch) if (!(id in articleDetails)) articleDetails[id] = {};
+      })
+      .catch(error => console.error('Article details error', error))
+      .finally(() => { for (const id of batch) delete pendingDetails[id]; });
+    for (const id of batch) pendingDetails[id] = request;
+  }
+  return Promise.all(wanted.map(id => pendingDetails[id])).then(() => undefined);
+}
+
+// URL of a sized variant ('thumb', 'slot') of an image given as '/static/...' or relative to
+// static/; the original if no variant is known
+export function imageUrl(src, preset) {
+  const variants = typeof window !== 'undefined' && window.IMAGE_VARIANTS ? window.IMAGE_VARIANTS[src] : null;
+  if (variants && variants[preset]) return variants[preset];
+  return src && !src.startsWith('/') ? '/static/' + src : src;
+}
+
+if (typeof window !== 'undefined') {
+  window.imageUrl = imageUrl;
+  window.findArticle = findArticle;
+  window.loadArticleDetails = loadArticleDetails;
+}
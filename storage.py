@@ -0,0 +1,816 @@
+"""
+Lagring av sparade framsidor.
+
+Två utbytbara backends bakom samma gränssnitt:
+
+- FileSaveStore: en JSON-fil per sparning i saved/ (enkel drift, som tidigare)
+- SQLiteSaveStore: en SQLite-databas i WAL-läge med index på gruppnamn,
+  session och tidpunkt, så att /list-saved kan paginera utan att läsa alla
+  sparningar
+
+Listningar sorteras nyast först och pagineras med en opak cursor.
+
+Framsidornas layout (slot -> artikel-id) lagras innehållsadresserat: varje
+unik layout sparas en gång under sin hash, och varje sparning är bara en
+lätt post (grupp, session, tidpunkt, layouthash) som pekar på den. Sparar
+en grupp samma layout som i sin senaste sparning skrivs ingenting nytt,
+utan den befintliga sparningen återanvänds. Gamla sparningar flyttas ut
+till komprimerade arkiv med retention.py.
+
+Sparningar skrivs atomärt och skriver aldrig över varandra: finns namnet
+redan får den nya sparningen ett löpnummer (Grupp_20260210_092240_2.json).
+WriteBehindStore kan läggas utanpå valfri backend för att skriva flera
+samtidiga sparningar i en gemensam omgång (group commit).
+"""
+
+import base64
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(mtime: float, filename: str) -> str:
+    raw = json.dumps([mtime, filename], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Return (mtime, filename) for a cursor produced by encode_cursor()."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        mtime, filename = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(mtime), str(filename)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def _umask() -> int:
+    # os.umask() kan bara läsas genom att sättas; läs den en gång vid import
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# mkstemp() skapar filer med läge 0600; publicerade filer ska få samma läge
+# som en vanlig open() hade gett (0644 med standard-umask)
+FILE_MODE = 0o666 & ~_umask()
+
+
+class Reused(str):
+    """The name of an existing save, returned instead of writing an identical one."""
+
+
+def unique_names(filename: str):
+    """Candidate names for a save: the name itself, then name_2.json, name_3.json, ..."""
+    base, ext = os.path.splitext(filename)
+    yield filename
+    n = 2
+    while True:
+        yield f"{base}_{n}{ext}"
+        n += 1
+
+
+def layout_hash(slots) -> str:
+    """Content address of a slot layout (the same layout always gets the same hash)."""
+    raw = json.dumps(slots or {}, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def split_layout(data: dict):
+    """(pointer, slots, hash): the save without its slots but with a `layout` hash."""
+    slots = data.get("slots") or {}
+    digest = layout_hash(slots)
+    pointer = {k: v for k, v in data.items() if k != "slots"}
+    pointer["layout"] = digest
+    return pointer, slots, digest
+
+
+def summary(filename: str, data: dict, mtime: float) -> dict:
+    """The per-save record returned by /list-saved."""
+    return {
+        "filename": filename,
+        "groupName": data.get("groupName", "Okänd"),
+        "mtime": mtime,
+        "session": data.get("session"),
+        "slots": data.get("slots", {}),
+        "layout": data.get("layout") or layout_hash(data.get("slots")),
+    }
+
+
+class SaveStore:
+    """Interface for saved-frontpage storage."""
+
+    def save(self, filename: str, data: dict) -> str:
+        """Persist `data` under `filename` (or a free variant of it) and return the name used.
+
+        If the group's latest save in the same session has the same slot
+        layout, nothing is written and that save's name is returned as a
+        Reused.
+        """
+        return self.save_many([(filename, data)])[0]
+
+    def save_many(self, items) -> list:
+        """Persist several (filename, data) pairs together; returns the names used."""
+        raise NotImplementedError
+
+    def get(self, filename: str):
+        """Return the saved document, or None if it does not exist."""
+        raise NotImplementedError
+
+    def list(self, limit=None, cursor=None, group=None, session=None, since=None, until=None, latest=False):
+        """Return (records, next_cursor), newest first.
+
+        `limit=None` returns everything after `cursor`. `group` filters on the
+        exact groupName, `session` on the optional session field and
+        `since`/`until` (epoch seconds) on the save time, until exclusive.
+        With `latest=True` only the newest matching save per group (and
+        session) is returned.
+        """
+        raise NotImplementedError
+
+    def remove(self, filenames) -> int:
+        """Delete saves (e.g. after archiving) and layouts no save uses any more; returns the count."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """{"saves": number of saves, "bytes": size on disk} for monitoring."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FileSaveStore(SaveStore):
+    """One small JSON file per save in a directory, layouts in layouts/<hash>.json.
+
+    Each save is written to a hidden temp file, fsync:ed (unless
+    `fsync=False`) and then hard-linked to its final name, which fails
+    instead of overwriting if the name is taken - also across processes.
+    A crash mid-write therefore never leaves a truncated save behind. The
+    layout file is written (and synced) before the save that points to it.
+
+    Saves and layouts never change once written, so parsed files are kept
+    in memory and a listing only has to read new files. Saves from before
+    layouts were split out (slots inline) are read as they are.
+
+    The newest save per (group, session) is recorded in a small index file
+    under latest/, so the duplicate check on save reads one file instead of
+    scanning the directory. The index is built from a scan the first time
+    the store is opened, and a group is scanned again only if the save its
+    index points to has been removed.
+
+    Saving and removing hold an exclusive lock on saved/.lock, shared by
+    every process using the directory (the app's workers and
+    tools/compact_saved.py). Two saves of the same group therefore cannot
+    both pass the duplicate check, and remove() never deletes a layout
+    whose save has not been published yet.
+    """
+
+    # Temp-filer äldre än så här är rester från en krasch och tas bort vid start
+    STALE_TEMP_SECONDS = 3600
+    # Markörfil i latest/ när indexet byggts färdigt
+    INDEX_READY = ".ready"
+
+    def __init__(self, saved_dir: str, fsync: bool = True):
+        self.saved_dir = saved_dir
+        self.layouts_dir = os.path.join(saved_dir, "layouts")
+        self.latest_dir = os.path.join(saved_dir, "latest")
+        self.lock_path = os.path.join(saved_dir, ".lock")
+        self.fsync = fsync
+        self._thread_lock = threading.Lock()
+        self._pointers = {}  # filnamn -> (mtime, sparning utan slots eller None om oläslig)
+        self._layouts = {}  # hash -> slots
+        os.makedirs(self.layouts_dir, exist_ok=True)
+        self._remove_stale_temps()
+        if not os.path.exists(os.path.join(self.latest_dir, self.INDEX_READY)):
+            with self._locked():
+                self._build_latest_index()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's lock, across threads and across processes sharing saved_dir."""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            # En egen öppning per anrop: flock-lås på en fil som ärvts vid fork delas med föräldern
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, FILE_MODE)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+
+    def _build_latest_index(self):
+        # Sparningar från före indexet: en genomläsning, sedan räcker indexfilerna
+        seen = set()
+        for mtime, filename in self._entries():
+            data = self._pointer(filename, mtime)
+            if data is None:
+                continue
+            key = (data.get("groupName"), data.get("session"))
+            if key not in seen:
+                seen.add(key)
+                self._set_latest(*key, filename, data.get("layout") or layout_hash(data.get("slots")))
+        os.makedirs(self.latest_dir, exist_ok=True)
+        # Först när markören finns räknas en saknad indexfil som "inga sparningar"
+        os.close(os.open(os.path.join(self.latest_dir, self.INDEX_READY), os.O_CREAT | os.O_WRONLY, FILE_MODE))
+
+    def _remove_stale_temps(self):
+        cutoff = time.time() - self.STALE_TEMP_SECONDS
+        for directory in (self.saved_dir, self.layouts_dir, self.latest_dir):
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.name.startswith(".") and entry.name.endswith(".tmp"):
+                        try:
+                            if entry.stat().st_mtime < cutoff:
+                                os.unlink(entry.path)
+                        except OSError:
+                            pass
+
+    def save_many(self, items):
+        with self._locked():
+            return self._save_many(items)
+
+    def _save_many(self, items):
+        names = [None] * len(items)
+        pending = []  # (index, filename, pointer)
+        layouts = {}
+        latest = {}  # (grupp, session) -> (filnamn eller index i omgången, hash)
+        for i, (filename, data) in enumerate(items):
+            pointer, slots, digest = split_layout(data)
+            key = (data.get("groupName"), data.get("session"))
+            previous = latest[key] if key in latest else self._latest(*key)
+            if previous is not None and previous[1] == digest:
+                names[i] = previous[0]
+                continue
+            latest[key] = (i, digest)
+            layouts[digest] = slots
+            pending.append((i, filename, pointer))
+
+        for digest, slots in layouts.items():
+            self._write_layout(digest, slots)
+        temps = []
+        try:
+            # Skriv alla först och synka sedan alla, så att disken kan slå ihop skrivningarna
+            for _, filename, pointer in pending:
+                fd, tmp = tempfile.mkstemp(dir=self.saved_dir, prefix="." + filename + ".", suffix=".tmp")
+                temps.append(tmp)
+                os.chmod(tmp, FILE_MODE)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(pointer, f, ensure_ascii=False, indent=2)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            for tmp, (i, filename, _) in zip(temps, pending):
+                names[i] = self._publish(tmp, filename)
+        finally:
+            for tmp in temps:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+        if self.fsync and pending:
+            self._fsync_dir(self.saved_dir)
+        for key, (i, digest) in latest.items():
+            if isinstance(i, int):
+                self._set_latest(*key, names[i], digest)
+        # En dubblett av en sparning tidigare i samma omgång får dess namn
+        return [Reused(names[n]) if isinstance(n, int) else n for n in names]
+
+    def _latest_path(self, group, session):
+        key = json.dumps([group, session], ensure_ascii=False)
+        return os.path.join(self.latest_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _latest(self, group, session):
+        """Reused(filename) and layout hash of the group's newest save in `session`, or None."""
+        try:
+            with open(self._latest_path(group, session), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            entry = None
+        if (isinstance(entry, dict) and entry.get("groupName") == group and entry.get("session") == session
+                and os.path.exists(os.path.join(self.saved_dir, entry.get("filename") or ""))):
+            return Reused(entry["filename"]), entry.get("layout")
+        # Sparningen indexet pekar på har tagits bort (t.ex. arkiverats): leta upp den som nu är senast
+        for mtime, filename in self._entries():
+            data = self._pointer(filename, mtime)
+            if data is not None and data.get("groupName") == group and data.get("session") == session:
+                digest = data.get("layout") or layout_hash(data.get("slots"))
+                self._set_latest(group, session, filename, digest)
+                return Reused(filename), digest
+        try:
+            os.unlink(self._latest_path(group, session))
+        except OSError:
+            pass
+        return None
+
+    def _set_latest(self, group, session, filename, digest):
+        os.makedirs(self.latest_dir, exist_ok=True)
+        entry = {"groupName": group, "session": session, "filename": filename, "layout": digest}
+        fd, tmp = tempfile.mkstemp(dir=self.latest_dir, prefix=".", suffix=".tmp")
+        try:
+            os.chmod(tmp, FILE_MODE)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            # Indexet kan alltid byggas om ur sparningarna, så det synkas inte
+            os.replace(tmp, self._latest_path(group, session))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _write_layout(self, digest, slots):
+        path = os.path.join(self.layouts_dir, digest + ".json")
+        if os.path.exists(path):
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.layouts_dir, prefix=".", suffix=".tmp")
+        try:
+            os.chmod(tmp, FILE_MODE)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(slots, f, ensure_ascii=False, separators=(",", ":"))
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            # Samma hash betyder samma innehåll, så en samtidig skrivning får gärna vinna
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if self.fsync:
+            self._fsync_dir(self.layouts_dir)
+
+    def _publish(self, tmp, filename):
+        """Give the finished temp file the first free name derived from `filename`."""
+        for name in unique_names(filename):
+            path = os.path.join(self.saved_dir, name)
+            try:
+                os.link(tmp, path)
+                return name
+            except FileExistsError:
+                continue
+            except OSError:
+                # Filsystem utan hårda länkar: reservera namnet och ersätt det atomärt
+                try:
+                    os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                except FileExistsError:
+                    continue
+                os.replace(tmp, path)
+                return name
+
+    @staticmethod
+    def _fsync_dir(directory):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return  # t.ex. Windows, där kataloger inte kan öppnas
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def get(self, filename):
+        filepath = os.path.join(self.saved_dir, filename)
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, "r", encoding="utf-8") as f:
+            return self._resolve(json.load(f))
+
+    def _resolve(self, data):
+        """The full save: the pointer with its layout's slots filled in."""
+        if "slots" in data or "layout" not in data:
+            return data
+        return {**data, "slots": self._layout(data["layout"])}
+
+    def _layout(self, digest):
+        slots = self._layouts.get(digest)
+        if slots is None:
+            try:
+                with open(os.path.join(self.layouts_dir, digest + ".json"), "r", encoding="utf-8") as f:
+                    slots = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                return {}
+            self._layouts[digest] = slots
+        return slots
+
+    def _entries(self):
+        """(mtime, filename) for every save, newest first; unreadable files get mtime 0."""
+        entries = []
+        with os.scandir(self.saved_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    mtime = 0
+                entries.append((mtime, entry.name))
+        entries.sort(reverse=True)
+        if len(self._pointers) > 2 * len(entries) + 100:
+            # Släpp borttagna filer ur minnet
+            names = {name for _, name in entries}
+            self._pointers = {k: v for k, v in self._pointers.items() if k in names}
+        return entries
+
+    def stats(self):
+        saves = size = 0
+        with os.scandir(self.saved_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    saves += 1
+                    try:
+                        size += entry.stat().st_size
+                    except OSError:
+                        pass
+        with os.scandir(self.layouts_dir) as it:
+            for entry in it:
+                try:
+                    size += entry.stat().st_size
+                except OSError:
+                    pass
+        return {"saves": saves, "bytes": size}
+
+    def _pointer(self, filename, mtime):
+        """The save file as stored (cached while its mtime is unchanged), or None if unreadable."""
+        cached = self._pointers.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(os.path.join(self.saved_dir, filename), "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (json.JSONDecodeError, IOError):
+            data = None
+        self._pointers[filename] = (mtime, data)
+        return data
+
+    def _load(self, filename, mtime):
+        data = self._pointer(filename, mtime)
+        if data is None:
+            return None, {"filename": filename, "groupName": "Okänd", "mtime": 0, "slots": {}}
+        data = self._resolve(data)
+        return data, summary(filename, data, mtime)
+
+    def list(self, limit=None, cursor=None, group=None, session=None, since=None, until=None, latest=False):
+        entries = self._entries()
+        if since is not None or until is not None:
+            entries = [e for e in entries
+                       if (since is None or e[0] >= since) and (until is None or e[0] < until)]
+        after = decode_cursor(cursor) if cursor else None
+
+        records = []
+        seen = set()
+        last = None
+        for entry in entries:
+            # Med latest måste även sparningar före cursorn läsas för att veta vilka grupper som redan visats
+            before_cursor = after is not None and entry >= after
+            if before_cursor and not latest:
+                continue
+            if limit is not None and len(records) >= limit:
+                break
+            mtime, filename = entry
+            data = self._pointer(filename, mtime)
+            if not before_cursor:
+                last = entry
+            if group is not None and (data is None or data.get("groupName") != group):
+                continue
+            if session is not None and (data is None or data.get("session") != session):
+                continue
+            if latest and data is not None:
+                key = (data.get("groupName"), data.get("session"))
+                if key in seen:
+                    continue
+                seen.add(key)
+            if not before_cursor:
+                records.append(self._load(filename, mtime)[1])
+
+        more = limit is not None and len(records) >= limit and last is not None and last != entries[-1]
+        return records, (encode_cursor(*last) if more else None)
+
+    def remove(self, filenames):
+        with self._locked():
+            return self._remove(filenames)
+
+    def _remove(self, filenames):
+        removed = 0
+        for filename in filenames:
+            try:
+                os.unlink(os.path.join(self.saved_dir, filename))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            self._pointers.pop(filename, None)
+        used = set()
+        for mtime, filename in self._entries():
+            data = self._pointer(filename, mtime)
+            if data is not None and data.get("layout"):
+                used.add(data["layout"])
+        with os.scandir(self.layouts_dir) as it:
+            for entry in it:
+                digest = entry.name[:-len(".json")]
+                if entry.name.endswith(".json") and digest not in used:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+                    self._layouts.pop(digest, None)
+        return removed
+
+
+class SQLiteSaveStore(SaveStore):
+    """Saves in a SQLite database (WAL mode), indexed on group, session and time.
+
+    Each thread gets its own connection; WAL lets readers run alongside the
+    single writer, also across worker processes sharing the file. With
+    `fsync=True` every commit is synced to disk (synchronous=FULL). Slot
+    layouts live in their own table keyed by hash; rows written before
+    that keep their slots inline in `data`.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS saves (
+            filename   TEXT PRIMARY KEY,
+            group_name TEXT NOT NULL,
+            session    TEXT,
+            mtime      REAL NOT NULL,
+            data       TEXT NOT NULL,
+            layout     TEXT
+        );
+        CREATE TABLE IF NOT EXISTS layouts (
+            hash  TEXT PRIMARY KEY,
+            slots TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS saves_by_time ON saves (mtime DESC, filename DESC);
+        CREATE INDEX IF NOT EXISTS saves_by_group ON saves (group_name, mtime DESC, filename DESC);
+        CREATE INDEX IF NOT EXISTS saves_by_session ON saves (session, mtime DESC, filename DESC);
+    """
+
+    def __init__(self, db_path: str, fsync: bool = True):
+        self.db_path = db_path
+        self.fsync = fsync
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+            # Databaser från före layouttabellen saknar kolumnen
+            if "layout" not in {row[1] for row in conn.execute("PRAGMA table_info(saves)")}:
+                conn.execute("ALTER TABLE saves ADD COLUMN layout TEXT")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=%s" % ("FULL" if self.fsync else "NORMAL"))
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, conn, filename, data, mtime, replace=False):
+        """Insert one save and its layout; raises IntegrityError if the name is taken (unless `replace`)."""
+        pointer, slots, digest = split_layout(data)
+        conn.execute("INSERT OR IGNORE INTO layouts VALUES (?, ?)",
+                     (digest, json.dumps(slots, ensure_ascii=False, separators=(",", ":"))))
+        conn.execute("INSERT OR REPLACE INTO saves VALUES (?, ?, ?, ?, ?, ?)" if replace
+                     else "INSERT INTO saves VALUES (?, ?, ?, ?, ?, ?)",
+                     (filename, data.get("groupName", "Okänd"), data.get("session"), mtime,
+                      json.dumps(pointer, ensure_ascii=False), digest))
+
+    def _latest(self, conn, group, session):
+        row = conn.execute(
+            "SELECT filename, layout, data FROM saves WHERE group_name = ? AND session IS ? "
+            "ORDER BY mtime DESC, filename DESC LIMIT 1", (group, session)).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1] or layout_hash(json.loads(row[2]).get("slots"))
+
+    def save_many(self, items):
+        now = time.time()
+        names = []
+        # En transaktion (och därmed en synkning av WAL-loggen) för hela omgången. IMMEDIATE tar
+        # skrivlåset direkt, så att två processer inte båda klarar dubblettkontrollen för samma grupp.
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for filename, data in items:
+                previous = self._latest(conn, data.get("groupName", "Okänd"), data.get("session"))
+                if previous is not None and previous[1] == layout_hash(data.get("slots")):
+                    names.append(Reused(previous[0]))
+                    continue
+                for name in unique_names(filename):
+                    try:
+                        self._insert(conn, name, data, now)
+                    except sqlite3.IntegrityError:
+                        continue
+                    names.append(name)
+                    break
+        return names
+
+    @staticmethod
+    def _resolve(data, slots):
+        data = json.loads(data)
+        if slots is not None and "slots" not in data:
+            data["slots"] = json.loads(slots)
+        return data
+
+    def get(self, filename):
+        row = self._connect().execute(
+            "SELECT s.data, l.slots FROM saves s LEFT JOIN layouts l ON l.hash = s.layout WHERE s.filename = ?",
+            (filename,)).fetchone()
+        return self._resolve(*row) if row else None
+
+    def list(self, limit=None, cursor=None, group=None, session=None, since=None, until=None, latest=False):
+        where, params = [], []
+        if group is not None:
+            where.append("group_name = ?")
+            params.append(group)
+        if session is not None:
+            where.append("session = ?")
+            params.append(session)
+        if since is not None:
+            where.append("mtime >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("mtime < ?")
+            params.append(until)
+
+        # Senaste per grupp väljs bland de filtrerade raderna, före cursorn
+        rank = (", ROW_NUMBER() OVER (PARTITION BY group_name, session ORDER BY mtime DESC, filename DESC) AS rn"
+                if latest else "")
+        inner = f"SELECT filename, mtime, data, layout{rank} FROM saves"
+        if where:
+            inner += " WHERE " + " AND ".join(where)
+
+        outer = ["t.rn = 1"] if latest else []
+        if cursor:
+            mtime, filename = decode_cursor(cursor)
+            outer.append("(t.mtime < ? OR (t.mtime = ? AND t.filename < ?))")
+            params.extend([mtime, mtime, filename])
+        sql = f"SELECT t.filename, t.mtime, t.data, l.slots FROM ({inner}) t LEFT JOIN layouts l ON l.hash = t.layout"
+        if outer:
+            sql += " WHERE " + " AND ".join(outer)
+        sql += " ORDER BY t.mtime DESC, t.filename DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        rows = self._connect().execute(sql, params).fetchall()
+        more = limit is not None and len(rows) > limit
+        rows = rows[:limit] if more else rows
+        records = [summary(filename, self._resolve(data, slots), mtime) for filename, mtime, data, slots in rows]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if more else None
+        return records, next_cursor
+
+    def remove(self, filenames):
+        filenames = list(filenames)
+        with self._connect() as conn:
+            removed = conn.executemany("DELETE FROM saves WHERE filename = ?", [(f,) for f in filenames]).rowcount
+            conn.execute("DELETE FROM layouts WHERE hash NOT IN (SELECT layout FROM saves WHERE layout IS NOT NULL)")
+        return removed
+
+    def stats(self):
+        saves = self._connect().execute("SELECT COUNT(*) FROM saves").fetchone()[0]
+        size = 0
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                size += os.path.getsize(self.db_path + suffix)
+            except OSError:
+                pass
+        return {"saves": saves, "bytes": size}
+
+    def import_dir(self, saved_dir: str) -> int:
+        """Import every readable save in a FileSaveStore directory, keeping its mtime. Returns the count."""
+        files = FileSaveStore(saved_dir)
+        count = 0
+        with self._connect() as conn:
+            for mtime, filename in files._entries():
+                data, _ = files._load(filename, mtime)
+                if data is not None:
+                    self._insert(conn, filename, data, mtime, replace=True)
+                    count += 1
+        return count
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class WriteBehindStore(SaveStore):
+    """Batches concurrent saves into one write to the wrapped store (group commit).
+
+    A background thread collects saves arriving within `max_delay` seconds
+    (at most `batch_size`) and writes them with a single `save_many()`
+    call, so a burst of saves shares one round of fsyncs. `save()` still
+    returns only once its batch is durable, so nothing acknowledged can be
+    lost; reads go straight to the wrapped store.
+    """
+
+    def __init__(self, inner: SaveStore, batch_size: int = 64, max_delay: float = 0.01,
+                 timeout: float = 30.0):
+        self.inner = inner
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self._thread.start()
+
+    def save_many(self, items):
+        futures = []
+        for filename, data in items:
+            future = Future()
+            self._queue.put((filename, data, future))
+            futures.append(future)
+        self._ensure_thread()
+        return [f.result(timeout=self.timeout) for f in futures]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stoppa efter den här omgången
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            names = self.inner.save_many([(filename, data) for filename, data, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), name in zip(batch, names):
+            future.set_result(name)
+
+    def get(self, filename):
+        return self.inner.get(filename)
+
+    def list(self, *args, **kwargs):
+        return self.inner.list(*args, **kwargs)
+
+    def remove(self, filenames):
+        return self.inner.remove(filenames)
+
+    def stats(self):
+        return self.inner.stats()
+
+    def close(self):
+        """Flush queued saves, stop the writer thread and close the wrapped store."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout=self.timeout)
+        self.inner.close()
+
+
+def open_store(backend: str, saved_dir: str, db_path: str = None, fsync: bool = True,
+               write_behind: bool = False) -> SaveStore:
+    """Create the configured store: 'file' (default) or 'sqlite', optionally batched."""
+    backend = (backend or "file").lower()
+    if backend == "file":
+        store = FileSaveStore(saved_dir, fsync=fsync)
+    elif backend == "sqlite":
+        store = SQLiteSaveStore(db_path or os.path.join(saved_dir, "saves.sqlite3"), fsync=fsync)
+    else:
+        raise ValueError(f"Unknown SAVE_BACKEND: {backend}")
+    return WriteBehindStore(store) if write_behind else store
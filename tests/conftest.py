@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Modulerna ligger i projektroten, inte i ett installerat paket
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py läser sina kataloger och databaser ur miljön vid import; testerna
+# skriver i en temporär katalog i stället för i saved/ och cache/
+_TMP = tempfile.mkdtemp(prefix="tidning-test-")
+for _var, _name in (("SAVED_DIR", "saved"), ("EVENTS_DB", "events.sqlite3"), ("AUTOSAVE_DB", "drafts.sqlite3"),
+                    ("PDF_CACHE_DIR", "pdf"), ("EXPORT_PROGRESS_DIR", "export"),
+                    ("THUMBNAIL_CACHE_DIR", "thumbnails"), ("IMAGE_CACHE_DIR", "images")):
+    os.environ.setdefault(_var, os.path.join(_TMP, _name))
+os.environ.setdefault("RATELIMIT_ENABLED", "false")
+os.environ.setdefault("STARTUP_WARMUP", "off")
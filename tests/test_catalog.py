@@ -0,0 +1,43 @@
+import json
+import os
+
+from catalog import COMPILED_FILENAME, ArticleCatalog
+from catalog_compiler import compile_catalog
+
+
+def write_articles(path, headline, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"articles": [{"id": 1, "category": "NÖJE", "headline": headline, "body": "Text"}]}, f)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_source_edited_after_compile_is_picked_up(tmp_path):
+    source = tmp_path / "articles.json"
+    compiled = tmp_path / COMPILED_FILENAME
+    write_articles(source, "Före", 1_000_000_000_000)
+    compile_catalog(str(source), str(compiled))
+    os.utime(compiled, ns=(2_000_000_000_000, 2_000_000_000_000))
+
+    catalog = ArticleCatalog(data_dir=str(tmp_path), check_interval=0)
+    assert catalog.path == str(compiled)
+    assert catalog.snapshot().get(1)["headline"] == "Före"
+
+    # articles.json ändras efter kompileringen: källan är nu nyast och ska läsas
+    write_articles(source, "Efter", 3_000_000_000_000)
+    assert catalog.snapshot().get(1)["headline"] == "Efter"
+    assert catalog.path == str(source)
+
+    # En ny kompilering tar över igen
+    compile_catalog(str(source), str(compiled))
+    os.utime(compiled, ns=(4_000_000_000_000, 4_000_000_000_000))
+    assert catalog.snapshot().get(1)["headline"] == "Efter"
+    assert catalog.path == str(compiled)
+
+
+def test_fixed_path_ignores_other_files(tmp_path):
+    source = tmp_path / "articles.json"
+    write_articles(source, "Fast", 1_000_000_000_000)
+    catalog = ArticleCatalog(str(source), check_interval=0)
+    compile_catalog(str(source), str(tmp_path / COMPILED_FILENAME))
+    assert catalog.snapshot().get(1)["headline"] == "Fast"
+    assert catalog.path == str(source)
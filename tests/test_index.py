@@ -0,0 +1,14 @@
+import json
+import re
+
+import app
+
+
+def test_catalog_is_embedded_once():
+    html = app.app.test_client().get("/").get_data(as_text=True)
+    data = json.loads(re.search(r'<script id="catalog-data" type="application/json">(.*?)</script>', html, re.S).group(1))
+    assert data["articles"]
+    # Korten byggs i webbläsaren; sammanfattningarna finns bara i catalog-data
+    assert 'class="article-card"' not in html
+    headline = data["articles"][0]["headline"]
+    assert html.count(json.dumps(headline)[1:-1]) == 1
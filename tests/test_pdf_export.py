@@ -0,0 +1,39 @@
+import pytest
+
+from pdf_export import _merge_files
+
+pypdf = pytest.importorskip("pypdf")
+pydyf = pytest.importorskip("pydyf")
+
+
+def weasyprint_like_pdf(path, label, pages, compress):
+    """A PDF written by pydyf, the writer WeasyPrint uses (compress=True gives object and xref streams)."""
+    pdf = pydyf.PDF()
+    font = pydyf.Dictionary({"Type": "/Font", "Subtype": "/Type1", "BaseFont": "/Helvetica"})
+    pdf.add_object(font)
+    for i in range(pages):
+        stream = pydyf.Stream(compress=compress)
+        stream.begin_text()
+        stream.set_font_size("F1", 24)
+        stream.set_text_matrix(1, 0, 0, 1, 72, 700)
+        stream.show_text(pydyf.String(f"{label} sida {i + 1}"))
+        stream.end_text()
+        pdf.add_object(stream)
+        pdf.add_page(pydyf.Dictionary({
+            "Type": "/Page", "Parent": pdf.pages.reference, "MediaBox": pydyf.Array([0, 0, 595, 842]),
+            "Contents": stream.reference,
+            "Resources": pydyf.Dictionary({"Font": pydyf.Dictionary({"F1": font.reference})}),
+        }))
+    with open(path, "wb") as f:
+        pdf.write(f, compress=compress)
+    return str(path)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_merge_keeps_every_page_in_order(tmp_path, compress):
+    first = weasyprint_like_pdf(tmp_path / "a.pdf", "Alfa", 2, compress)
+    second = weasyprint_like_pdf(tmp_path / "b.pdf", "Beta", 1, compress)
+    out = _merge_files([first, second], None, str(tmp_path / "klass.pdf"))
+    texts = [page.extract_text() for page in pypdf.PdfReader(out).pages]
+    assert texts == ["Alfa sida 1", "Alfa sida 2", "Beta sida 1"]
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
@@ -0,0 +1,41 @@
+import os
+
+from retention import compact, read_bundle
+from storage import FileSaveStore
+
+
+def frontpage(slots, group="Grupp"):
+    return {"groupName": group, "session": None, "slots": slots}
+
+
+def test_corrupt_save_is_kept_and_reported(tmp_path):
+    saved = tmp_path / "saved"
+    store = FileSaveStore(str(saved))
+    store.save("Grupp_1.json", frontpage({"s1": 1}))
+    store.save("Grupp_2.json", frontpage({"s1": 2}))
+    # En avbruten skrivning från före de atomära sparningarna
+    (saved / "Trasig_1.json").write_text('{"groupName": "Tras', encoding="utf-8")
+
+    report = compact(store, str(tmp_path / "archive"))
+    assert report["archived"] == 0 and report["unreadable"] == []
+    assert (saved / "Trasig_1.json").exists()
+
+    # Med en åldersgräns väljs den oläsliga filen (mtime 0), men den arkiveras inte och ligger kvar
+    report = compact(store, str(tmp_path / "archive"), older_than=1)
+    assert report["unreadable"] == ["Trasig_1.json"]
+    assert report["bundle"] is None
+    assert (saved / "Trasig_1.json").exists()
+    assert len(store.list()[0]) == 3
+
+
+def test_corrupt_save_next_to_archived_ones(tmp_path):
+    saved = tmp_path / "saved"
+    store = FileSaveStore(str(saved))
+    store.save("Test_1.json", frontpage({"s1": 1}, group="Test"))
+    (saved / "Test_2.json").write_text("", encoding="utf-8")
+
+    report = compact(store, str(tmp_path / "archive"), older_than=2 ** 40)
+    assert report["unreadable"] == ["Test_2.json"]
+    assert [name for name, _, _ in read_bundle(report["bundle"])] == ["Test_1.json"]
+    assert sorted(os.listdir(saved / "layouts")) == []
+    assert (saved / "Test_2.json").exists() and not (saved / "Test_1.json").exists()
@@ -0,0 +1,92 @@
+import os
+import threading
+
+import pytest
+
+import app
+from storage import FileSaveStore, Reused
+
+
+def frontpage(slots, group="Grupp"):
+    return {"groupName": group, "session": None, "slots": slots}
+
+
+def test_duplicate_check_reads_the_index_not_the_directory(tmp_path, monkeypatch):
+    store = FileSaveStore(str(tmp_path))
+    first = store.save("Grupp_1.json", frontpage({"s1": 1}))
+
+    def no_scan():
+        raise AssertionError("saved/ scanned on save")
+
+    monkeypatch.setattr(store, "_entries", no_scan)
+    again = store.save("Grupp_2.json", frontpage({"s1": 1}))
+    assert again == first and isinstance(again, Reused)
+    assert not isinstance(store.save("Grupp_3.json", frontpage({"s1": 2})), Reused)
+    assert store.save("Annan_1.json", frontpage({"s1": 1}, group="Annan")) == "Annan_1.json"
+
+
+def test_index_follows_removed_saves_and_other_instances(tmp_path):
+    store = FileSaveStore(str(tmp_path))
+    store.save("Grupp_1.json", frontpage({"s1": 1}))
+    store.save("Grupp_2.json", frontpage({"s1": 2}))
+    store.remove(["Grupp_2.json"])
+    # Den senaste sparningen är nu Grupp_1 igen
+    assert store.save("Grupp_3.json", frontpage({"s1": 1})) == "Grupp_1.json"
+
+    # En annan process med samma katalog ser samma index
+    other = FileSaveStore(str(tmp_path))
+    assert other.save("Grupp_4.json", frontpage({"s1": 3})) == "Grupp_4.json"
+    assert store.save("Grupp_5.json", frontpage({"s1": 3})) == "Grupp_4.json"
+
+
+@pytest.fixture
+def save_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "SAVE_STORE", FileSaveStore(str(tmp_path)))
+
+
+def test_reused_save_publishes_no_event(save_store, monkeypatch):
+    published = []
+    monkeypatch.setattr(app.EVENT_LOG, "publish", published.append)
+    before = app.SAVES_TOTAL.value()
+    first = app.store_frontpage(frontpage({"s1": 1}))
+    assert app.store_frontpage(frontpage({"s1": 1})) == first
+    assert [e["filename"] for e in published] == [first]
+    assert app.SAVES_TOTAL.value() == before + 1
+
+
+def test_concurrent_saves_of_one_layout_write_it_once(tmp_path):
+    # Två lagringar i samma katalog, som två arbetsprocesser
+    stores = [FileSaveStore(str(tmp_path)) for _ in range(2)]
+    names = []
+
+    def save(store, n):
+        for i in range(20):
+            names.append(store.save(f"Grupp_{n}_{i}.json", frontpage({"s1": 1})))
+
+    threads = [threading.Thread(target=save, args=(store, n)) for n, store in enumerate(stores)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(names)) == 1
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".json")]) == 1
+
+
+def test_remove_keeps_layouts_of_saves_in_progress(tmp_path, monkeypatch):
+    store = FileSaveStore(str(tmp_path))
+    other = FileSaveStore(str(tmp_path))
+    publish = store._publish
+
+    def remove_while_publishing(tmp, filename):
+        # compact_saved.py startar medan sparningens layout är skriven men pekaren inte publicerad
+        remover = threading.Thread(target=other.remove, args=([],))
+        remover.start()
+        remover.join(0.2)
+        name = publish(tmp, filename)
+        assert remover.is_alive()
+        return name
+
+    monkeypatch.setattr(store, "_publish", remove_while_publishing)
+    name = store.save("Grupp_1.json", frontpage({"s1": 1}))
+    assert store.get(name)["slots"] == {"s1": 1}
+    assert len(os.listdir(tmp_path / "layouts")) == 1
@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def workshops(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.WORKSHOPS, "workshops_dir", str(tmp_path))
+    return tmp_path
+
+
+def make_workshop(root, name, headline):
+    directory = root / name
+    directory.mkdir()
+    with open(directory / "articles.json", "w", encoding="utf-8") as f:
+        json.dump({"articles": [{"id": 1, "category": "NÖJE", "headline": headline, "body": "Text"}]}, f)
+    return directory
+
+
+def test_join_empty_workshop_directory_is_404(workshops):
+    (workshops / "tom").mkdir()
+    client = app.app.test_client()
+    response = client.get("/?workshop=tom")
+    assert response.status_code == 404
+    assert client.get_cookie(app.WORKSHOP_COOKIE) is None
+    assert "tom" not in app.WORKSHOPS.names()
+
+
+def test_workshop_without_catalog_falls_back_to_default(workshops):
+    directory = make_workshop(workshops, "klass9c", "Workshopartikel")
+    client = app.app.test_client()
+    assert client.get("/?workshop=klass9c").status_code == 302
+    assert client.get("/api/articles/1").json["headline"] == "Workshopartikel"
+
+    # Katalogfilen tas bort medan eleverna fortfarande har cookien
+    os.remove(directory / "articles.json")
+    response = client.get("/api/articles/1")
+    assert response.status_code == 200
+    assert response.json["headline"] == app.CATALOG.snapshot().get(1)["headline"]
+    assert client.get("/").status_code == 200
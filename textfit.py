@@ -0,0 +1,85 @@
+"""
+Anpassning av rubriker och ingresser till framsidans teckengränser.
+
+Rubriker får vara högst 37 tecken och ingresser högst 122. En för lång
+rubrik kortas i första hand genom att parenteser, tankstreck och vanliga
+småord tas bort, en för lång ingress till sin första sats eller de
+meningar som får plats. I sista hand tas hela ord från början tills
+gränsen nås. Ett ord delas bara om ett enda ord i sig är för långt.
+"""
+
+import re
+
+HEADLINE_MAX = 37
+SUBHEADLINE_MAX = 122
+
+# Vanliga svenska småord som kan strykas utan att rubriken tappar sitt innehåll
+STOPWORDS = frozenset((
+    "och", "att", "det", "som", "i", "på", "för", "med", "av", "en", "ett", "nu", "har", "till", "om",
+    "de", "den", "man", "är", "var", "blev", "från", "alla", "sina", "sitt", "sig", "fick",
+    "än", "under", "över", "efter", "mot", "redan",
+))
+
+_SPACES = re.compile(r"\s+")
+_PARENTHETICAL = re.compile(r"\s*[(\[][\s\S]*?[)\]]\s*")
+_CLAUSE_BREAK = re.compile(r"\s*(?::|\s[-—–])\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _normalize_spaces(text: str) -> str:
+    return _SPACES.sub(" ", text).strip()
+
+
+def _content_words(words):
+    return [w for w in words if w.lower().strip('.,:;"') not in STOPWORDS]
+
+
+def _word_prefix(words, max_len: int) -> str:
+    """The longest run of leading words that fits in max_len characters."""
+    out = ""
+    for word in words:
+        candidate = f"{out} {word}" if out else word
+        if len(candidate) > max_len:
+            break
+        out = candidate
+    return out
+
+
+def fit_headline(headline: str, max_len: int = HEADLINE_MAX) -> str:
+    """Shorten a headline to at most max_len characters, keeping whole words where possible."""
+    if not headline:
+        return headline
+    original = headline.strip()
+    if len(original) <= max_len:
+        return original
+    text = _PARENTHETICAL.sub(" ", original)
+    text = _normalize_spaces(text.replace(" - ", " ").replace("—", " ").replace("–", " "))
+
+    words = text.split()
+    content = _content_words(words)
+    candidate = " ".join(content)
+    if candidate and len(candidate) <= max_len:
+        return candidate
+    return (_word_prefix(content or words, max_len)
+            or _word_prefix(words, max_len)
+            or original[:max_len])
+
+
+def fit_subheadline(subheadline: str, max_len: int = SUBHEADLINE_MAX) -> str:
+    """Shorten a subheadline to at most max_len characters, preferring whole clauses or sentences."""
+    if not subheadline:
+        return subheadline
+    original = subheadline.strip()
+    if len(original) <= max_len:
+        return original
+    text = _normalize_spaces(_PARENTHETICAL.sub(" ", original))
+    if len(text) <= max_len:
+        return text
+
+    # Första satsen (före kolon eller tankstreck) eller de meningar som får plats,
+    # om det blir tillräckligt mycket kvar för att fungera som ingress
+    for pieces in (_CLAUSE_BREAK.split(text)[:1], _SENTENCE_END.split(text)):
+        fitting = _word_prefix(pieces, max_len)
+        if len(fitting) >= max_len // 3:
+            return fitting
+    return _word_prefix(text.split(), max_len).rstrip(",;:") or original[:max_len]
@@ -0,0 +1,331 @@
+"""
+Miniatyrer och HTML-fragment av sparade framsidor för lärarvyns galleri.
+
+En sparad framsida innehåller bara slot -> artikel-id. Här slås id:na upp
+i katalogen på servern och framsidan blir dels ett färdigt HTML-fragment
+(templates/frontpage.html, för den förstorade vyn), dels en liten PNG-bild
+(för rutnätet), så att galleriet för en hel klass laddar ett trettiotal
+små bilder i stället för att bygga lika många kompletta layouter i DOM:en.
+
+Båda cachas på disk med en nyckel av slotinnehållet och katalogversionen:
+samma framsida renderas bara en gång, och en ändrad katalog ger nya
+nycklar så att gamla filer aldrig visas. Miniatyren ritas med Pillow
+efter framsidans mått (567 x 900 px); artikelbilderna är SVG och ritas
+som bildytor.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from io import BytesIO
+
+# Framsidans mått och höjderna på dess delar i px (samma som i static/style.css)
+PAGE_WIDTH, PAGE_HEIGHT = 567, 900
+MASTHEAD_MAX = 160
+PUFF_HEIGHT = 25
+TEXTTOPP_HEIGHT = 100
+HERO_HEIGHT = 280
+INGRESS_HEIGHT = 65
+BOTTOM_HEIGHT = 146
+GUTTER = 12
+
+# Miniatyrens bredd (halva framsidan, som kortet i galleriet)
+THUMB_WIDTH = 284
+
+_COLORS = {
+    "page": "#ffffff",
+    "frame": "#494238",
+    "puff_bg": "#393128",
+    "puff_yellow": "#fac01c",
+    "puff_text": "#F3EAD0",
+    "blue": "#025ECC",
+    "text": "#020202",
+    "gray": "#666666",
+    "image": "#d8d4c8",
+    "empty": "#f1efe8",
+    "empty_text": "#a9a393",
+}
+
+# Typsnitt att pröva innan Pillows inbyggda
+_FONT_FILES = ("DejaVuSerif-Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSerif-Bold.ttf")
+
+
+class ThumbnailUnavailable(RuntimeError):
+    """Raised when Pillow is not installed, so no thumbnail can be drawn."""
+
+
+def frontpage_key(slots: dict, catalog_version: str, *extra) -> str:
+    """Cache key for a saved frontpage: its slot contents plus the catalog version.
+
+    `extra` adds anything else that changes the output (group name, header image).
+    """
+    payload = json.dumps([slots or {}, catalog_version, *extra], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def page_number(article: dict) -> int:
+    """The article's page, or a fixed 2-11 from its id so a frontpage always looks the same."""
+    page = article.get("page")
+    if page:
+        return page
+    article_id = article.get("id")
+    return article_id % 10 + 2 if isinstance(article_id, int) else 2
+
+
+def page_ref(article: dict) -> str:
+    """Page reference shown under a headline, e.g. 'sport sidan 12'."""
+    page = page_number(article)
+    category = (article.get("category") or "").lower()
+    return f"{category} sidan {page}" if category else f"Sidan {page}"
+
+
+class FrontpageCache:
+    """On-disk cache of rendered fragments and thumbnails, at most `max_files` of each kind."""
+
+    def __init__(self, cache_dir: str, max_files: int = 2000):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    def get(self, key: str, ext: str, produce) -> str:
+        """Path of the cached file for (key, ext), created with produce() -> bytes if missing.
+
+        Concurrent requests for the same key in this process wait for one
+        render; other processes may render the same file, which is harmless
+        since writes are atomic.
+        """
+        path = self.path(key, ext)
+        if os.path.exists(path):
+            return path
+        with self._lock:
+            lock = self._key_locks.setdefault((key, ext), threading.Lock())
+        try:
+            with lock:
+                if not os.path.exists(path):
+                    self._write(path, produce())
+                    self._prune(ext)
+        finally:
+            with self._lock:
+                self._key_locks.pop((key, ext), None)
+        return path
+
+    def _write(self, path, content: bytes):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _prune(self, ext):
+        """Keep at most max_files files with extension `ext`, dropping the oldest."""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith("." + ext)]
+        except OSError:
+            return
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_files]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+def _font(size: int):
+    from PIL import ImageFont
+
+    for name in _FONT_FILES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _wrap(draw, text: str, font, width: int, max_lines: int) -> list:
+    """Greedy word wrap of `text` into at most max_lines lines of `width` px."""
+    lines, line = [], ""
+    for word in (text or "").split():
+        candidate = f"{line} {word}" if line else word
+        if line and draw.textlength(candidate, font=font) > width:
+            lines.append(line)
+            line = word
+            if len(lines) == max_lines:
+                break
+        else:
+            line = candidate
+    else:
+        if line:
+            lines.append(line)
+        return lines
+    # Texten fick inte plats: avsluta sista raden med en ellips
+    last = lines[-1]
+    while last and draw.textlength(last + "…", font=font) > width:
+        last = last[:-1]
+    lines[-1] = last.rstrip() + "…"
+    return lines
+
+
+def _text(draw, xy, text, font, fill, width, max_lines=1, spacing=2) -> int:
+    """Draw wrapped text at xy; returns the y below the last line."""
+    x, y = xy
+    height = font.size + spacing
+    for line in _wrap(draw, text, font, width, max_lines):
+        draw.text((x, y), line, font=font, fill=fill)
+        y += height
+    return y
+
+
+def _paste_raster(canvas, path: str, box):
+    """Paste a raster image scaled to cover `box`; False if it cannot be read."""
+    from PIL import Image
+
+    x0, y0, x1, y1 = box
+    try:
+        with Image.open(path) as im:
+            im = im.convert("RGB")
+            scale = max((x1 - x0) / im.width, (y1 - y0) / im.height)
+            im = im.resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))), Image.LANCZOS)
+            canvas.paste(im.crop((0, 0, x1 - x0, y1 - y0)), (x0, y0))
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _placeholder(draw, box, label, font):
+    draw.rectangle(box, fill=_COLORS["empty"])
+    x0, y0, x1, _ = box
+    _text(draw, (x0 + 6, y0 + 6), label, font, _COLORS["empty_text"], x1 - x0 - 12, max_lines=2)
+
+
+def render_thumbnail(slots: dict, group_name: str = "", header_path: str = None,
+                     image_path=None, width: int = THUMB_WIDTH) -> bytes:
+    """Draw a resolved frontpage (slot -> article dict or None) as a PNG `width` px wide.
+
+    `header_path` is the masthead image on disk; `image_path(article)`
+    returns a raster file for an article image, or None to draw an image
+    area instead. Raises ThumbnailUnavailable without Pillow.
+    """
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError as e:
+        raise ThumbnailUnavailable(str(e)) from e
+
+    # Ritas i framsidans egna mått och skalas ner på slutet, så texten blir jämn
+    page = Image.new("RGB", (PAGE_WIDTH, PAGE_HEIGHT), _COLORS["page"])
+    draw = ImageDraw.Draw(page)
+    small, body, headline, large = _font(11), _font(13), _font(17), _font(22)
+    inner = PAGE_WIDTH - 2 * GUTTER
+
+    # Tidningshuvud
+    y = 0
+    if header_path:
+        try:
+            with Image.open(header_path) as im:
+                height = min(MASTHEAD_MAX, round(im.height * PAGE_WIDTH / im.width))
+            if _paste_raster(page, header_path, (0, 0, PAGE_WIDTH, height)):
+                y = height
+        except (OSError, ValueError, ZeroDivisionError):
+            pass
+    if y == 0:
+        draw.rectangle((0, 0, PAGE_WIDTH, 80), fill=_COLORS["blue"])
+        draw.text((GUTTER, 22), "BLT", font=_font(40), fill=_COLORS["page"])
+        y = 80
+
+    # Toppnotiser
+    draw.rectangle((GUTTER, y, PAGE_WIDTH - GUTTER, y + 3 * PUFF_HEIGHT), fill=_COLORS["puff_bg"])
+    for n in (1, 2, 3):
+        article = slots.get(f"puff{n}")
+        row = y + (n - 1) * PUFF_HEIGHT + 6
+        if article is None:
+            draw.text((GUTTER + 8, row), f"Dra toppnotis {n} hit", font=small, fill=_COLORS["empty_text"])
+            continue
+        x = GUTTER + 8
+        category = (article.get("category") or "").lower() + "."
+        draw.text((x, row), category, font=small, fill=_COLORS["puff_yellow"])
+        x += draw.textlength(category, font=small) + 6
+        page_text = f"Sidan {page_number(article)}"
+        page_width = draw.textlength(page_text, font=small)
+        _text(draw, (x, row), article.get("headline", ""), small, _COLORS["puff_text"],
+              PAGE_WIDTH - GUTTER - 16 - page_width - x)
+        draw.text((PAGE_WIDTH - GUTTER - 8 - page_width, row), page_text, font=small, fill=_COLORS["puff_yellow"])
+    y += 3 * PUFF_HEIGHT
+
+    # Texttopp
+    box = (GUTTER, y + 6, PAGE_WIDTH - GUTTER, y + TEXTTOPP_HEIGHT - 6)
+    article = slots.get("texttopp")
+    if article is None:
+        _placeholder(draw, box, "Dra en texttopp hit", body)
+    else:
+        bottom = _text(draw, (GUTTER, y + 8), article.get("headline", ""), large, _COLORS["text"], inner)
+        _text(draw, (GUTTER, bottom + 4), f"{article.get('subheadline') or ''} {page_ref(article)}".strip(),
+              body, _COLORS["gray"], inner, max_lines=3)
+    y += TEXTTOPP_HEIGHT
+
+    # Huvudnyhet: bild med rubriken i en blå ruta, ingress under
+    hero = (GUTTER, y, PAGE_WIDTH - GUTTER, y + HERO_HEIGHT)
+    article = slots.get("huvudnyhet")
+    if article is None:
+        _placeholder(draw, hero, "Dra en huvudnyhet hit", headline)
+    else:
+        raster = image_path(article) if image_path else None
+        if not (raster and _paste_raster(page, raster, hero)):
+            draw.rectangle(hero, fill=_COLORS["image"])
+        lines = _wrap(draw, article.get("headline", ""), large, inner - 40, 2)
+        block_height = len(lines) * (large.size + 4) + 12
+        block_width = max(draw.textlength(line, font=large) for line in lines) + 20 if lines else 0
+        top = hero[3] - 24 - block_height
+        draw.rectangle((GUTTER, top, GUTTER + block_width, top + block_height), fill=_COLORS["blue"])
+        _text(draw, (GUTTER + 10, top + 6), article.get("headline", ""), large, _COLORS["page"], inner - 40,
+              max_lines=2, spacing=4)
+        _text(draw, (GUTTER, hero[3] + 6), article.get("subheadline") or "", body, _COLORS["text"], inner,
+              max_lines=3)
+    y += HERO_HEIGHT + INGRESS_HEIGHT
+
+    # Nedre raden: artikel, citat och två notiser
+    columns = (("mellan1", 189, "Dra en artikel hit"), ("citat", 189, "Dra ett citat hit"),
+               ("liten1", 94, "Dra en notis hit"), ("liten2", 94, "Dra en notis hit"))
+    x = 0
+    draw.line((GUTTER, y, PAGE_WIDTH - GUTTER, y), fill=_COLORS["frame"], width=1)
+    for slot, column_width, label in columns:
+        box = (x + 4, y + 6, x + column_width - 4, y + BOTTOM_HEIGHT - 6)
+        article = slots.get(slot)
+        if article is None:
+            _placeholder(draw, box, label, small)
+        else:
+            text_width = column_width - 12
+            if slot == "citat":
+                quote = f"”{article.get('quote') or article.get('headline', '')}”"
+                bottom = _text(draw, (x + 6, y + 8), quote, body, _COLORS["text"], text_width, max_lines=5)
+                bottom = _text(draw, (x + 6, bottom + 4), article.get("quoteSender") or "", small,
+                               _COLORS["gray"], text_width)
+            else:
+                font = headline if column_width > 100 else body
+                bottom = _text(draw, (x + 6, y + 8), article.get("headline", ""), font, _COLORS["text"],
+                               text_width, max_lines=5)
+            _text(draw, (x + 6, bottom + 4), page_ref(article), small, _COLORS["gray"], text_width)
+        x += column_width
+    y += BOTTOM_HEIGHT
+
+    if group_name:
+        _text(draw, (GUTTER, y + 8), f"Gjord av {group_name}", body, _COLORS["gray"], inner)
+    draw.rectangle((0, 0, PAGE_WIDTH - 1, PAGE_HEIGHT - 1), outline=_COLORS["frame"])
+
+    height = round(PAGE_HEIGHT * width / PAGE_WIDTH)
+    # Ett par hundra färger räcker för text och ytor och ger en betydligt mindre fil
+    thumb = page.resize((width, height), Image.LANCZOS).quantize(colors=192, method=Image.Quantize.FASTOCTREE)
+    out = BytesIO()
+    thumb.save(out, "PNG", optimize=True)
+    return out.getvalue()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: compiled category matcher vs. the original per-article heuristic.
+
+Generates a synthetic catalog (default 20 000 articles) from the words in
+data/articles.json plus every town/keyword term, checks that the
+implementations agree on every article and prints the timings for a cold
+matcher (empty memo), for re-classifying the same catalog after a reload
+(fresh objects, as when articles.json is re-read) and, for comparison, for
+a single pass with one combined regex over all terms.
+
+Exits with status 1 if any result differs or if the cold matcher is not at
+least --min-speedup times faster than the original heuristic.
+
+    python tools/bench_categories.py [--n 20000] [--seed 1] [--repeat 5] [--min-speedup 1.0]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from categories import ALLOWED_CATEGORIES, KEYWORD_RULES, TOWN_TERMS, CategoryMatcher  # noqa: E402
+
+
+def legacy_infer_category(article: dict) -> str:
+    """The original infer_category() from app.load_articles(), kept verbatim as reference."""
+    text_parts = [
+        (article.get("headline") or ""),
+        (article.get("subheadline") or ""),
+        (article.get("body") or ""),
+    ]
+    text = "\n".join(text_parts).lower()
+
+    town_map = {
+        "karlshamn": "KARLSHAMN",
+        "karlskrona": "KARLSKRONA",
+        "ronneby": "RONNEBY",
+        "sölvesborg": "SÖLVESBORG",
+        "solvesborg": "SÖLVESBORG",
+        "olofström": "OLOFSTRÖM",
+        "olofstrom": "OLOFSTRÖM",
+    }
+    for k, v in town_map.items():
+        if k in text:
+            return v
+
+    business_kw = ["företag", "näringsliv", "ekonomi", "investering", "arbets", "priser", "omsättning"]
+    if any(w in text for w in business_kw):
+        return "NÄRINGSLIV"
+
+    opinion_kw = ["åsikt", "debatt", "insändare", "tycker", "menar", "ledare", "åsikter"]
+    if any(w in text for w in opinion_kw):
+        return "ÅSIKT"
+
+    entertainment_kw = ["konsert", "teater", "kultur", "festival", "nöje", "premiär", "recension"]
+    if any(w in text for w in entertainment_kw):
+        return "NÖJE"
+
+    sports_kw = ["match", "mål", "cupen", "serie", "hanlde", "hockey", "fotboll", "hk "]
+    if any(w in text for w in sports_kw):
+        for k, v in town_map.items():
+            if k in text:
+                return v
+        return "REGION"
+
+    orig = (article.get("category") or "").strip().upper()
+    if orig in ALLOWED_CATEGORIES:
+        return orig
+
+    return "REGION"
+
+
+def load_vocabulary():
+    path = ROOT / "data" / "articles.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    articles = data if isinstance(data, list) else data.get("articles", [])
+    if isinstance(data, dict):
+        for pkg in data.get("packages", []):
+            articles = articles + pkg.get("articles", [])
+    words = []
+    for a in articles:
+        for key in ("headline", "subheadline", "body"):
+            words.extend((a.get(key) or "").split())
+    return words
+
+
+def synthetic_catalog(n, seed):
+    """Random articles mixing ordinary words with (sometimes glued or capitalized) terms."""
+    rng = random.Random(seed)
+    words = load_vocabulary()
+    terms = [t for t, _ in TOWN_TERMS] + [t for _, ts in KEYWORD_RULES for t in ts]
+    categories = sorted(ALLOWED_CATEGORIES) + ["Nyheter", "Sport", "", None]
+
+    def text(n_words, p_term):
+        out = []
+        for _ in range(n_words):
+            if rng.random() < p_term:
+                t = rng.choice(terms)
+                r = rng.random()
+                if r < 0.2:
+                    t = t.upper()
+                elif r < 0.4:
+                    t = rng.choice(words) + t  # glued onto another word
+                out.append(t)
+            else:
+                out.append(rng.choice(words))
+        return " ".join(out)
+
+    articles = []
+    for i in range(n):
+        p = rng.choice((0.0, 0.005, 0.02, 0.08))
+        articles.append({
+            "id": i,
+            "headline": text(rng.randint(3, 7), p),
+            "subheadline": text(rng.randint(10, 20), p),
+            "body": text(rng.randint(30, 120), p),
+            "category": rng.choice(categories),
+        })
+    return articles
+
+
+def single_pass_classifier(matcher):
+    """Reference: one combined regex over all terms, a single pass over each text.
+
+    The lookahead finds overlapping matches too, and at each position the
+    alternation is ordered by precedence, so the best-ranked term found
+    anywhere decides, as in the original heuristic.
+    """
+    terms = matcher.terms
+    rank = {term: i for i, (term, _) in enumerate(terms)}
+    pattern = re.compile("(?=(%s))" % "|".join(re.escape(term) for term, _ in terms))
+
+    def classify(article):
+        text = "\n".join((article.get("headline") or "", article.get("subheadline") or "",
+                          article.get("body") or "")).lower()
+        found = pattern.findall(text)
+        if found:
+            return terms[min(rank[t] for t in found)][1]
+        orig = (article.get("category") or "").strip().upper()
+        return orig if orig in ALLOWED_CATEGORIES else "REGION"
+
+    return classify
+
+
+def timed(fns, repeat):
+    """Best time of `repeat` runs for each function, interleaved so that load spikes hit all of them."""
+    best = [None] * len(fns)
+    results = [None] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            results[i] = fn()
+            elapsed = time.perf_counter() - t0
+            best[i] = elapsed if best[i] is None else min(best[i], elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=20000, help="antal syntetiska artiklar")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=1.0,
+                        help="lägsta godkända hastighetsökning för kall klassificering (standard: 1.0)")
+    args = parser.parse_args()
+
+    articles = synthetic_catalog(args.n, args.seed)
+    matcher = CategoryMatcher()
+    single_pass = single_pass_classifier(matcher)
+
+    reloaded = json.loads(json.dumps(articles))
+
+    def cold():
+        matcher.clear_cache()
+        return matcher.classify_many(articles)
+
+    (t_legacy, t_cold), (expected, got) = timed(
+        [lambda: [legacy_infer_category(a) for a in articles], cold], args.repeat)
+    (t_reload,), (got_reload,) = timed([lambda: matcher.classify_many(reloaded)], args.repeat)
+    (t_regex,), (got_regex,) = timed([lambda: [single_pass(a) for a in articles]], 1)
+
+    mismatches = []
+    for label, results in (("cold", got), ("reload", got_reload), ("regex", got_regex)):
+        mismatches += [(label, a["id"], e, g) for a, e, g in zip(articles, expected, results) if e != g]
+
+    def row(label, t):
+        speedup = "" if t is t_legacy else f"  {t_legacy / t:6.2f}x"
+        print(f"{label:<10}{t * 1000:8.1f} ms  ({t / len(articles) * 1e6:5.1f} us/article){speedup}")
+
+    print(f"articles:  {len(articles)}")
+    row("legacy:", t_legacy)
+    row("cold:", t_cold)
+    row("reload:", t_reload)
+    row("regex:", t_regex)
+    failed = False
+    if mismatches:
+        print(f"MISMATCH on {len(mismatches)} articles, first: {mismatches[:5]}")
+        failed = True
+    else:
+        print("equivalent: yes")
+    if t_legacy / t_cold < args.min_speedup:
+        print(f"TOO SLOW: cold classification is {t_legacy / t_cold:.2f}x the original, "
+              f"--min-speedup is {args.min_speedup:.2f}x")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
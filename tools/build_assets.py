@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Bygg fingeravtryckta, förkomprimerade kopior av static/ till static/dist/.
+
+    python tools/build_assets.py          # bygg (och ta bort inaktuella filer)
+    python tools/build_assets.py --clean  # ta bort static/dist/
+
+Appen använder static/dist/manifest.json automatiskt om den finns.
+Brotli-varianter skapas bara om paketet `brotli` är installerat.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import assets  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--static-dir", default=str(ROOT / "static"))
+    parser.add_argument("--clean", action="store_true", help="ta bort byggda filer")
+    args = parser.parse_args()
+    dist_dir = str(Path(args.static_dir) / "dist")
+
+    if args.clean:
+        assets.clean(dist_dir)
+        print(f"Tog bort {dist_dir}")
+        return
+
+    manifest = assets.build(args.static_dir, dist_dir)
+    total = {"raw": 0, "gzip": 0, "br": 0}
+    for rel, entry in sorted(manifest["files"].items()):
+        total["raw"] += entry["size"]
+        for encoding in ("gzip", "br"):
+            total[encoding] += entry["encodings"].get(encoding, entry["size"])
+        if entry["size"] >= 10 * 1024:
+            variants = ", ".join(f"{e} {n / 1024:.1f} kB" for e, n in entry["encodings"].items())
+            print(f"{rel:<32} {entry['size'] / 1024:8.1f} kB" + (f"  ->  {variants}" if variants else ""))
+    print(f"{len(manifest['files'])} filer, {total['raw'] / 1024:.0f} kB "
+          f"(gzip {total['gzip'] / 1024:.0f} kB"
+          + (f", brotli {total['br'] / 1024:.0f} kB" if assets.brotli else ", brotli saknas") + ")")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Förgenerera alla bildvarianter (thumb/slot/print, WebP och reserv) för static/images/.
+
+    python tools/build_images.py [--cache-dir cache/images]
+
+Varianterna skapas annars vid första förfrågan via /img/<variant>/...
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from images import PRESETS, SOURCE_EXTENSIONS, ImageVariants  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--static-dir", default=str(ROOT / "static"))
+    parser.add_argument("--cache-dir", default=os.environ.get("IMAGE_CACHE_DIR", str(ROOT / "cache" / "images")))
+    args = parser.parse_args()
+
+    variants = ImageVariants(args.static_dir, args.cache_dir)
+    source_bytes = variant_bytes = count = 0
+    for path in sorted((Path(args.static_dir) / "images").iterdir()):
+        if path.suffix.lower() not in SOURCE_EXTENSIONS:
+            continue
+        rel = path.relative_to(args.static_dir).as_posix()
+        outputs = {}
+        for preset in PRESETS:
+            for webp in (True, False):
+                out, _ = variants.derivative(rel, preset, webp=webp)
+                outputs[f"{preset} {os.path.splitext(out)[1][1:]}"] = os.path.getsize(out)
+        count += 1
+        source_bytes += path.stat().st_size
+        slot = min(size for label, size in outputs.items() if label.startswith("slot "))
+        variant_bytes += slot
+        if path.stat().st_size >= 10 * 1024:
+            print(f"{rel:<32} {path.stat().st_size / 1024:8.1f} kB  ->  "
+                  + ", ".join(f"{label} {size / 1024:.1f} kB" for label, size in sorted(outputs.items())))
+    print(f"{count} bilder, {source_bytes / 1024:.0f} kB original, "
+          f"{variant_bytes / 1024:.0f} kB i minsta webbvarianten, cache i {args.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
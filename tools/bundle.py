@@ -1,93 +1,92 @@
 #!/usr/bin/env python3
-import os
-import re
-
-BASE = 'src/js'
-ENTRY = './main.js'
-
-def gather_files(base):
-    files = []
-    for root, dirs, filenames in os.walk(base):
-        for f in filenames:
-            if f.endswith('.js'):
-                rel = os.path.join(root, f)
-                relp = './' + os.path.relpath(rel, base).replace('\\', '/')
-                files.append(relp)
-    return sorted(files)
-
-def transform_source(src):
-    exports = []
-
-    def replace_func(m):
-        name = m.group(1)
-        exports.append(name)
-        return 'function %s(' % name
-
-    src = re.sub(r'export\s+function\s+(\w+)\s*\(', replace_func, src)
-    # capture exported variables (const/let/var) so we can add them to exports
-    def replace_var(m):
-        kind = m.group(1)
-        name = m.group(2)
-        exports.append(name)
-        return f"{kind} {name} "
-    src = re.sub(r'export\s+(const|let|var)\s+(\w+)\s*', replace_var, src)
-
-    def replace_named(m):
-        names = [n.strip() for n in m.group(1).split(',')]
-        for n in names:
-            exports.append(n)
-        return ''
-
-    src = re.sub(r'export\s*\{([^}]+)\}\s*;?', replace_named, src)
-    src = re.sub(r'export\s+default\s+', '/* export default removed */ ', src)
-
-    def repl_import(m):
-        names = m.group(1).strip()
-        path = m.group(2)
-        return 'const { %s } = require("%s");' % (names, path)
-
-    src = re.sub(r'import\s*\{([^}]+)\}\s*from\s*["\']([^"\']+)["\'];?', repl_import, src)
-    src = re.sub(r'import\s+(\w+)\s+from\s+["\']([^"\']+)["\'];?', lambda m: 'const %s = require("%s");' % (m.group(1), m.group(2)), src)
-
-    if exports:
-        src += '\n\n// Exports\n'
-        for name in exports:
-            src += 'exports.%s = %s;\n' % (name, name)
-
-    return src
-
-def build_bundle():
-    files = gather_files(BASE)
-    modules = {}
-    for relp in files:
-        path = os.path.join(BASE, relp[2:])
-        with open(path, 'r', encoding='utf-8') as fh:
-            src = fh.read()
-        modules[relp] = transform_source(src)
-
-    out = []
-    out.append('(function(){')
-    out.append('var __modules = {};')
-    out.append('var __cache = {};')
-    out.append('function __require(name){')
-    out.append('  if(__cache[name]) return __cache[name].exports;')
-    out.append('  var module = {exports:{}};')
-    out.append('  __cache[name]=module;')
-    out.append('  __modules[name](__require,module,module.exports);')
-    out.append('  return module.exports;')
-    out.append('}')
-
-    for k, src in modules.items():
-        out.append("__modules['%s'] = function(require,module,exports){\n%s\n};" % (k, src))
-
-    out.append("__require('%s');" % ENTRY)
-    out.append('})();')
-
-    bundle = '\n'.join(out)
-    outpath = 'static/script.js'
-    with open(outpath, 'w', encoding='utf-8') as fh:
-        fh.write(bundle)
-    print('WROTE', outpath, 'size=', os.path.getsize(outpath))
-
-if __name__ == '__main__':
-    build_bundle()
+"""Paketera src/js/ till en minifierad static/script.js med källkarta.
+
+    python tools/bundle.py                # bygg om det som ändrats
+    python tools/bundle.py --watch        # bygg om vid varje ändring i src/js/
+    python tools/bundle.py --no-minify    # läsbart paket (för felsökning)
+    python tools/bundle.py --manifest     # bygg även om static/dist/ (hashat namn)
+
+Omskrivna moduler cachas i cache/bundle.json med en hash av källfilen som
+nyckel, så bara ändrade moduler bearbetas om. Exporter som ingen modul
+använder tas bort. Källkartan skrivs till static/script.js.map.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import assets  # noqa: E402
+from bundler import Bundler, BundleError  # noqa: E402
+
+
+def print_report(report, only_rebuilt=False):
+    for module in report["modules"]:
+        if only_rebuilt and module["cached"]:
+            continue
+        removed = f"  (borttaget: {', '.join(module['removed'])})" if module["removed"] else ""
+        print(f"{module['module']:<16} {module['source'] / 1024:7.1f} kB -> {module['output'] / 1024:6.1f} kB"
+              f"  gzip {module['gzip'] / 1024:5.1f} kB{'  cachad' if module['cached'] else ''}{removed}")
+    print(f"{report['output']}: {report['size'] / 1024:.1f} kB (gzip {report['gzip'] / 1024:.1f} kB)"
+          + ("" if report["changed"] else ", oförändrad"))
+
+
+def build(bundler, args, only_rebuilt=False):
+    report = bundler.build()
+    print_report(report, only_rebuilt)
+    if args.manifest:
+        manifest = assets.build(str(ROOT / "static"))
+        print(f"Manifest: /assets/{manifest['files']['script.js']['path']}")
+
+
+def sources_key(bundler):
+    key = []
+    for name, path in bundler.sources().items():
+        st = Path(path).stat()
+        key.append((name, st.st_mtime_ns, st.st_size))
+    return key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--src-dir", default=str(ROOT / "src" / "js"))
+    parser.add_argument("--out", default=str(ROOT / "static" / "script.js"))
+    parser.add_argument("--entry", default="./main.js", help="startmodul (standard: ./main.js)")
+    parser.add_argument("--cache", default=str(ROOT / "cache" / "bundle.json"), help="cachefil för omskrivna moduler")
+    parser.add_argument("--no-minify", action="store_true", help="behåll kommentarer och indrag")
+    parser.add_argument("--watch", action="store_true", help="bevaka src/js/ och bygg om vid ändringar")
+    parser.add_argument("--interval", type=float, default=0.5, help="sekunder mellan kontrollerna med --watch")
+    parser.add_argument("--manifest", action="store_true", help="kör tools/build_assets.py efter bygget")
+    args = parser.parse_args()
+
+    bundler = Bundler(args.src_dir, args.out, entry=args.entry, cache_path=args.cache, minify=not args.no_minify)
+    try:
+        build(bundler, args)
+    except BundleError as e:
+        if not args.watch:
+            sys.exit(f"Fel: {e}")
+        print(f"Fel: {e}")
+    if not args.watch:
+        return
+
+    print(f"Bevakar {args.src_dir} (avsluta med Ctrl-C)")
+    last = sources_key(bundler)
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = sources_key(bundler)
+            if current == last:
+                continue
+            last = current
+            try:
+                build(bundler, args, only_rebuilt=True)
+            except BundleError as e:
+                print(f"Fel: {e}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Arkivera gamla sparade framsidor så att den levande lagringen hålls liten.
+
+    python tools/compact_saved.py --days 30                  # sessioner äldre än 30 dagar
+    python tools/compact_saved.py --group 'LoadTest*' --group 'Test*'
+    python tools/compact_saved.py --days 7 --dry-run         # visa bara vad som skulle arkiveras
+    python tools/compact_saved.py --backend sqlite --db saved/saves.sqlite3
+
+Sparningarna skrivs till ett gzippat JSON Lines-arkiv i saved/archive/
+(ändra med --archive-dir) och tas sedan bort ur lagringen. Upprepade
+sparningar av samma layout i följd inom en grupp arkiveras alltid; den
+senaste behålls. Sparningar som inte går att läsa lämnas kvar och listas.
+Kan köras medan appen är igång, t.ex. varje natt från cron: lagringen låser
+saved/.lock medan den sparar och tar bort.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from retention import compact  # noqa: E402
+from storage import open_store  # noqa: E402
+
+REASON_LABELS = {
+    "old_session": "gamla sessioner",
+    "group_pattern": "grupper som matchar --group",
+    "duplicate": "upprepade layouter",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, help="arkivera sessioner vars senaste sparning är äldre än så här")
+    parser.add_argument("--group", action="append", default=[], help="gruppnamnsmönster att arkivera (t.ex. 'LoadTest*')")
+    parser.add_argument("--backend", default=os.environ.get("SAVE_BACKEND", "file"), help="file eller sqlite")
+    parser.add_argument("--saved-dir", default=os.environ.get("SAVED_DIR", str(ROOT / "saved")))
+    parser.add_argument("--db", default=os.environ.get("SAVE_DB"), help="standard: <saved-dir>/saves.sqlite3")
+    parser.add_argument("--archive-dir", help="standard: <saved-dir>/archive")
+    parser.add_argument("--dry-run", action="store_true", help="arkivera och ta inte bort något")
+    args = parser.parse_args()
+
+    store = open_store(args.backend, args.saved_dir, args.db)
+    older_than = time.time() - args.days * 86400 if args.days is not None else None
+    report = compact(store, args.archive_dir or os.path.join(args.saved_dir, "archive"),
+                     older_than=older_than, group_patterns=args.group, dry_run=args.dry_run)
+    store.close()
+
+    for reason, count in sorted(report["reasons"].items()):
+        print(f"  {REASON_LABELS.get(reason, reason)}: {count}")
+    print(f"{report['saves']} sparningar: {report['archived']} arkiverade, {report['kept']} kvar")
+    for filename in report["unreadable"]:
+        print(f"  Kunde inte läsas, ligger kvar: {filename}", file=sys.stderr)
+    if args.dry_run:
+        print("Inget ändrades (--dry-run)")
+    elif report["bundle"]:
+        print(f"Arkiv: {report['bundle']}")
+
+
+if __name__ == "__main__":
+    main()
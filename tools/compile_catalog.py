@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Kompilera ett artikelflöde till en färdig katalog som appen läser direkt.
+
+    python tools/compile_catalog.py                          # data/articles.json -> data/catalog.compiled.json
+    python tools/compile_catalog.py flode.jsonl --jobs 8     # stort flöde, en artikel per rad
+    python tools/compile_catalog.py --dry-run --report rapport.json
+
+Rubriker kortas till 37 tecken och ingresser till 122, kategorierna
+bestäms och artiklar som inte går att använda (id saknas, dubblett-id,
+rubrik saknas) sorteras bort. Källfilen ändras aldrig. Utskriften visar
+vad som ändrats jämfört med den förra katalogfilen; --report sparar hela
+rapporten som JSON. Appen använder katalogfilen så länge den är nyare än
+data/articles.json.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from catalog import COMPILED_FILENAME  # noqa: E402
+from catalog_compiler import FeedError, compile_catalog  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=str(ROOT / "data" / "articles.json"),
+                        help="flöde: .json (lista eller {articles, packages}) eller .jsonl")
+    parser.add_argument("-o", "--output", default=str(ROOT / "data" / COMPILED_FILENAME))
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="antal processer")
+    parser.add_argument("--batch", type=int, default=500, help="artiklar per omgång")
+    parser.add_argument("--report", help="spara hela rapporten som JSON här")
+    parser.add_argument("--dry-run", action="store_true", help="skriv ingen katalogfil")
+    parser.add_argument("--strict", action="store_true", help="avsluta med felkod om någon artikel sorterats bort")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        report = compile_catalog(args.source, args.output, jobs=max(1, args.jobs),
+                                 batch_size=max(1, args.batch), write=not args.dry_run)
+    except (OSError, FeedError) as e:
+        print(f"Kunde inte läsa flödet: {e}", file=sys.stderr)
+        sys.exit(2)
+    elapsed = time.perf_counter() - started
+
+    for item in report["fitted"]:
+        print(f"Kortade {item['field']} id={item['id']}:\n  '{item['before']}' -> '{item['after']}'")
+    for item in report["rejected"]:
+        where = f" i paket {item['package']}" if item["package"] is not None else ""
+        print(f"Hoppade över id={item['id']!r}{where}: {item['error']}", file=sys.stderr)
+
+    print(f"{report['articles']} artiklar, {report['packages']} temapaket på {elapsed:.2f} s: "
+          f"{len(report['added'])} nya, {len(report['changed'])} ändrade, {len(report['removed'])} borttagna, "
+          f"{len(report['fitted'])} kortade fält, {len(report['rejected'])} bortsorterade")
+    print("Inget skrevs (--dry-run)" if args.dry_run else f"Skrev {args.output}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.strict and report["rejected"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Exportera en hel klass sparade framsidor till en ZIP eller en sammanslagen PDF.
+
+    python tools/export_class.py --out klass.zip [--session S] [--since 2026-02-10T08:00] [--until ...] [--all]
+    python tools/export_class.py --out klass.pdf --format pdf ...
+
+Förloppet skrivs till stderr medan PDF:erna renderas.
+"""
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+
+def main():
+    import app as webapp
+    from bulk_export import ExportProgress, iter_zip, merged_pdf
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--format", choices=("zip", "pdf"), default=None,
+                        help="standard: från filändelsen på --out")
+    parser.add_argument("--session")
+    parser.add_argument("--since", help="ISO-datum/tid eller epoch-sekunder")
+    parser.add_argument("--until", help="ISO-datum/tid eller epoch-sekunder")
+    parser.add_argument("--all", action="store_true", help="alla sparningar, inte bara senaste per grupp")
+    args = parser.parse_args()
+    fmt = args.format or ("pdf" if args.out.lower().endswith(".pdf") else "zip")
+
+    with webapp.app.app_context():
+        jobs = webapp.build_export_jobs(
+            session=args.session,
+            since=webapp.parse_time_arg(args.since),
+            until=webapp.parse_time_arg(args.until),
+            latest_only=not args.all,
+        )
+    if not jobs:
+        print("Inga sparade framsidor matchade urvalet", file=sys.stderr)
+        sys.exit(1)
+
+    progress = ExportProgress(webapp.EXPORT_PROGRESS_DIR, "cli", total=len(jobs), fmt=fmt)
+    shown = -1
+
+    def show():
+        nonlocal shown
+        state = progress.state
+        if state["done"] != shown:
+            shown = state["done"]
+            print(f"\r{shown}/{state['total']} framsidor klara", end="", file=sys.stderr)
+
+    try:
+        with open(args.out, "wb") as out:
+            if fmt == "pdf":
+                future = merged_pdf(webapp.PDF_RENDERER, jobs, progress)
+                while not future.done():
+                    show()
+                    time.sleep(0.2)
+                show()
+                print(file=sys.stderr)
+                with open(future.result(), "rb") as src:
+                    shutil.copyfileobj(src, out)
+            else:
+                for chunk in iter_zip(webapp.PDF_RENDERER, jobs, progress):
+                    out.write(chunk)
+                    show()
+                print(file=sys.stderr)
+    finally:
+        webapp.PDF_RENDERER.shutdown()
+    print(f"Skrev {args.out}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Importera befintliga saved/*.json till SQLite-lagringen (SAVE_BACKEND=sqlite).
+
+    python tools/import_saved.py [--saved-dir saved] [--db saved/saves.sqlite3]
+
+Kan köras flera gånger; en fil som redan finns i databasen skrivs över.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from storage import SQLiteSaveStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saved-dir", default=str(ROOT / "saved"))
+    parser.add_argument("--db", default=None, help="standard: <saved-dir>/saves.sqlite3")
+    args = parser.parse_args()
+
+    db = args.db or str(Path(args.saved_dir) / "saves.sqlite3")
+    store = SQLiteSaveStore(db)
+    count = store.import_dir(args.saved_dir)
+    store.close()
+    print(f"Importerade {count} framsidor från {args.saved_dir} till {db}")
+
+
+if __name__ == '__main__':
+    main()
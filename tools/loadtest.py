@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""Lasttest - simulerar ett klassrum mot en lokalt startad server.
+
+Startar appen på en ledig port med temporära data/saved/cache-kataloger
+(riktiga sparningar rörs aldrig) och de fingeravtryckta statiska filerna
+byggda i den temporära katalogen, så att /assets/* mäts även i en ny
+utcheckning utan static/dist/. Låter N elever öppna sidan, dra
+artiklar (hämtar artikeldetaljer) och spara via /save, medan lärare
+pollar /list-saved och /get-saved. Rapporterar genomströmning och
+p50/p95/p99 per route.
+
+    python tools/loadtest.py                       # 30 elever, 1 lärare, 30 s
+    python tools/loadtest.py --students 100 --duration 60
+    python tools/loadtest.py --save-baseline       # spara som ny baslinje
+    python tools/loadtest.py --baseline            # jämför mot baslinjen (exit 1 vid regression)
+    python tools/loadtest.py --rate-limit          # med rate limiting på (alla elever delar en IP)
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import re
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import assets  # noqa: E402
+
+DEFAULT_BASELINE = ROOT / "tools" / "loadtest_baseline.json"
+SLOTS = ("puff1", "puff2", "puff3", "texttopp", "huvudnyhet", "mellan1", "citat", "liten1", "liten2")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Stats:
+    """Thread-safe latency and status samples per route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+
+    def record(self, route, status, seconds):
+        with self._lock:
+            self.samples.setdefault(route, []).append(seconds)
+            counts = self.statuses.setdefault(route, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def report(self, elapsed):
+        routes = {}
+        with self._lock:
+            for route, values in sorted(self.samples.items()):
+                values = sorted(values)
+                statuses = self.statuses[route]
+                routes[route] = {
+                    "count": len(values),
+                    "rps": round(len(values) / elapsed, 2),
+                    "errors": sum(n for s, n in statuses.items() if s == 0 or s >= 500),
+                    "rate_limited": statuses.get(429, 0),
+                    "p50_ms": round(percentile(values, 50) * 1000, 2),
+                    "p95_ms": round(percentile(values, 95) * 1000, 2),
+                    "p99_ms": round(percentile(values, 99) * 1000, 2),
+                    "max_ms": round(values[-1] * 1000, 2),
+                }
+        return routes
+
+
+class Client:
+    """One keep-alive HTTP connection with its own cookies, like a browser tab."""
+
+    def __init__(self, port, stats):
+        self.port = port
+        self.stats = stats
+        self.conn = None
+        self.cookies = {}
+
+    def request(self, method, path, route, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if body is not None:
+            body = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        start = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status, response_headers = response.status, dict(response.getheaders())
+            for cookie in response.msg.get_all("Set-Cookie") or []:
+                name, _, value = cookie.split(";", 1)[0].partition("=")
+                self.cookies[name.strip()] = value.strip()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            status, response_headers, data = 0, {}, b""
+        self.stats.record(route, status, time.perf_counter() - start)
+        return status, response_headers, data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def catalog_from_page(html):
+    """(catalog version, article ids) from the catalog-data script in the editor page."""
+    match = re.search(rb'<script id="catalog-data" type="application/json">(.*?)</script>', html, re.S)
+    if not match:
+        return "", []
+    catalog = json.loads(match.group(1))
+    ids = [a["id"] for a in catalog.get("articles", [])]
+    for pkg in catalog.get("packages", []):
+        ids.extend(a["id"] for a in pkg.get("articles", []))
+    return catalog.get("version", ""), ids
+
+
+def assets_from_page(html):
+    """Stylesheet, script and image URLs referenced by the editor page."""
+    return list(dict.fromkeys(re.findall(rb'(?:href|src)="(/(?:static|assets)/[^"]+)"', html)))
+
+
+def think(rng, mean):
+    time.sleep(rng.uniform(0.5 * mean, 1.5 * mean))
+
+
+def student(n, port, stats, stop, args):
+    rng = random.Random(args.seed * 1000 + n)
+    client = Client(port, stats)
+    etag = None
+    version, article_ids = "", []
+    asset_etags = {}  # som webbläsarens cache
+    try:
+        while not stop.is_set():
+            # Öppna (eller ladda om) sidan med dess resurser
+            headers = {"If-None-Match": etag} if etag else {}
+            status, response_headers, html = client.request("GET", "/", "/", headers=headers)
+            if status == 200:
+                etag = response_headers.get("ETag")
+                version, article_ids = catalog_from_page(html)
+                for url in assets_from_page(html):
+                    url = url.decode("utf-8")
+                    if url.startswith("/assets/"):
+                        # Immutable: hämtas en gång, sedan aldrig igen
+                        if url not in asset_etags:
+                            client.request("GET", url, "/assets/*", headers={"Accept-Encoding": "br, gzip"})
+                            asset_etags[url] = None
+                        continue
+                    headers = {"If-None-Match": asset_etags[url]} if asset_etags.get(url) else {}
+                    _, asset_headers, _ = client.request("GET", url, "/static/*", headers=headers)
+                    asset_etags[url] = asset_headers.get("ETag") or asset_etags.get(url)
+            if not article_ids:
+                think(rng, args.think)
+                continue
+
+            # Några dra-och-släpp-cykler, var och en avslutad med en sparning
+            while not stop.is_set() and rng.random() > args.reload_chance:
+                slots = {}
+                for slot in rng.sample(SLOTS, k=rng.randint(3, len(SLOTS))):
+                    article_id = rng.choice(article_ids)
+                    client.request("GET", f"/api/articles?ids={article_id}&v={version}", "/api/articles")
+                    slots[slot] = str(article_id)
+                    think(rng, args.think / 4)
+                    if stop.is_set():
+                        return
+                client.request("POST", "/save", "/save", body={
+                    "groupName": f"LoadTest{n}",
+                    "slots": slots,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                })
+                think(rng, args.think)
+    finally:
+        client.close()
+
+
+def teacher(n, port, stats, stop, args):
+    rng = random.Random(args.seed * 1000 - n - 1)
+    client = Client(port, stats)
+    try:
+        while not stop.is_set():
+            status, _, data = client.request("GET", "/list-saved", "/list-saved")
+            if status == 200:
+                files = json.loads(data)
+                for record in rng.sample(files, k=min(3, len(files))):
+                    client.request("GET", f"/get-saved/{record['filename']}", "/get-saved/<filename>")
+            stop.wait(args.poll)
+    finally:
+        client.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_workdir(workdir):
+    """Temporary data/saved/cache directories; returns the env overrides pointing at them."""
+    shutil.copytree(ROOT / "data", workdir / "data")
+    (workdir / "saved").mkdir()
+    cache = workdir / "cache"
+    # static/dist/ checkas inte in; bygg den här så att sidan länkar till /assets/* som i drift
+    assets.build(str(ROOT / "static"), str(workdir / "dist"))
+    return {
+        "ASSETS_DIR": str(workdir / "dist"),
+        "DATA_DIR": str(workdir / "data"),
+        "SAVED_DIR": str(workdir / "saved"),
+        "SAVE_DB": str(workdir / "saved" / "saves.sqlite3"),
+        "PDF_CACHE_DIR": str(cache / "pdf"),
+        "EXPORT_PROGRESS_DIR": str(cache / "export"),
+        "EVENTS_DB": str(cache / "events.sqlite3"),
+        "RATELIMIT_STORAGE_URI": "sqlite://" + str(cache / "ratelimit.sqlite3"),
+        "METRICS_DIR": str(cache / "metrics"),
+    }
+
+
+def start_server(args, port, env_overrides, log_path):
+    env = dict(os.environ, **env_overrides, PORT=str(port), FLASK_DEBUG="false",
+               RATELIMIT_ENABLED="true" if args.rate_limit else "false",
+               SAVE_BACKEND=args.backend)
+    command = shlex.split(args.server_cmd.format(python=shlex.quote(sys.executable), port=port))
+    log = open(log_path, "wb")
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit(f"Servern startade inte, se {log_path}")
+
+
+def print_report(report):
+    print(f"\n{report['students']} elever, {report['teachers']} lärare, {report['duration']} s, "
+          f"backend={report['backend']}, rate limit {'på' if report['rate_limit'] else 'av'}")
+    print(f"{'route':<24}{'antal':>8}{'req/s':>9}{'fel':>6}{'429':>6}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for route, r in report["routes"].items():
+        print(f"{route:<24}{r['count']:>8}{r['rps']:>9}{r['errors']:>6}{r['rate_limited']:>6}"
+              f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['max_ms']:>9}")
+    print(f"{'totalt':<24}{report['total_requests']:>8}{report['total_rps']:>9}")
+
+
+def compare(report, baseline, tolerance, floor_ms, min_samples):
+    """Return a list of regressions of the current report against a baseline report."""
+    regressions = []
+    for key in ("students", "teachers", "backend", "rate_limit"):
+        if baseline.get(key) != report.get(key):
+            print(f"Obs: baslinjen kördes med {key}={baseline.get(key)}, nu {report.get(key)}")
+    for route, base in baseline.get("routes", {}).items():
+        current = report["routes"].get(route)
+        if current is None:
+            regressions.append(f"{route}: saknas i denna körning")
+            continue
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{route} fel: {current['errors']} (baslinje {base['errors']})")
+        if min(current["count"], base["count"]) < min_samples:
+            continue  # för få mätningar för att percentilerna ska gå att jämföra
+        # p99 rapporteras men är för brusig i korta körningar för att larma på
+        for metric in ("p50_ms", "p95_ms"):
+            limit = max(base[metric] * (1 + tolerance), base[metric] + floor_ms)
+            if current[metric] > limit:
+                regressions.append(f"{route} {metric}: {current[metric]} > {round(limit, 2)} (baslinje {base[metric]})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--teachers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=30, help="sekunder")
+    parser.add_argument("--ramp", type=float, default=5, help="sekunder innan alla elever är igång")
+    parser.add_argument("--think", type=float, default=1.0, help="medeltid mellan elevernas handlingar (s)")
+    parser.add_argument("--poll", type=float, default=2.0, help="lärarnas pollintervall (s)")
+    parser.add_argument("--reload-chance", type=float, default=0.1, help="sannolikhet att ladda om sidan efter en sparning")
+    parser.add_argument("--backend", choices=("file", "sqlite"), default="file")
+    parser.add_argument("--rate-limit", action="store_true", help="låt rate limiting vara på")
+    parser.add_argument("--server-cmd", default="{python} app.py",
+                        help="kommando som startar servern; {python} och {port} ersätts")
+    parser.add_argument("--startup-timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="skriv rapporten som JSON hit")
+    parser.add_argument("--baseline", nargs="?", const=str(DEFAULT_BASELINE),
+                        help="jämför mot baslinje (standard: tools/loadtest_baseline.json)")
+    parser.add_argument("--save-baseline", nargs="?", const=str(DEFAULT_BASELINE),
+                        help="spara rapporten som baslinje")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="tillåten relativ försämring av p50/p95")
+    parser.add_argument("--floor-ms", type=float, default=10.0, help="försämringar under så här många ms ignoreras")
+    parser.add_argument("--min-samples", type=int, default=100,
+                        help="routes med färre mätningar jämförs bara på fel, inte latens")
+    parser.add_argument("--keep", action="store_true", help="behåll den temporära katalogen")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="tidning-loadtest-"))
+    port = free_port()
+    server = start_server(args, port, prepare_workdir(workdir), workdir / "server.log")
+    print(f"Server på port {port}, temporär katalog {workdir}", file=sys.stderr)
+
+    stats = Stats()
+    stop = threading.Event()
+    threads = [threading.Thread(target=teacher, args=(n, port, stats, stop, args), daemon=True)
+               for n in range(args.teachers)]
+    threads += [threading.Thread(target=student, args=(n, port, stats, stop, args), daemon=True)
+                for n in range(args.students)]
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+            if args.students:
+                stop.wait(args.ramp / max(1, len(threads)))
+        stop.wait(max(0.0, args.duration - (time.perf_counter() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=35)
+        elapsed = time.perf_counter() - started
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    routes = stats.report(elapsed)
+    total = sum(r["count"] for r in routes.values())
+    report = {
+        "students": args.students,
+        "teachers": args.teachers,
+        "duration": round(elapsed, 1),
+        "backend": args.backend,
+        "rate_limit": args.rate_limit,
+        "total_requests": total,
+        "total_rps": round(total / elapsed, 2),
+        "routes": routes,
+    }
+    print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baslinje sparad i {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance, args.floor_ms, args.min_samples)
+        if regressions:
+            print("\nRegressioner mot baslinjen:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("\nInga regressioner mot baslinjen")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Sammanfatta sparade requestprofiler per route (de tyngsta funktionerna).
+
+    python tools/profiles.py                      # alla routes, topp 20 kumulativt
+    python tools/profiles.py --route /save --top 40
+    python tools/profiles.py --sort tottime       # tid i själva funktionen
+    python tools/profiles.py --clear              # ta bort sparade profiler
+
+Profiler skapas när appen körs med PROFILE_EVERY=N (var N:e request till
+/, /save och /list-saved) eller med huvudet X-Profile: <PROFILE_TOKEN>.
+En enskild profil kan öppnas med t.ex. `python -m pstats <fil>` eller snakeviz.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import profiling  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=os.environ.get("PROFILE_DIR", str(ROOT / "cache" / "profiles")),
+                        help="profilkatalog (standard: PROFILE_DIR eller cache/profiles)")
+    parser.add_argument("--route", help="bara den här routen, t.ex. /save")
+    parser.add_argument("--top", type=int, default=20, help="antal funktioner per route")
+    parser.add_argument("--sort", choices=("cumulative", "tottime"), default="cumulative")
+    parser.add_argument("--clear", action="store_true", help="ta bort alla sparade profiler")
+    args = parser.parse_args()
+
+    if args.clear:
+        removed = 0
+        for files in profiling.profile_files(args.dir).values():
+            for path, _ in files:
+                os.unlink(path)
+                removed += 1
+        print(f"Tog bort {removed} profiler från {args.dir}")
+        return
+
+    summary = profiling.summarize(args.dir, route=args.route, top=args.top, sort=args.sort)
+    if not summary:
+        print(f"Inga profiler i {args.dir}", file=sys.stderr)
+        sys.exit(1)
+
+    for slug, info in sorted(summary.items()):
+        print(f"== {slug}: {info['profiles']} profiler, medel {info['mean_ms']} ms, max {info['max_ms']} ms")
+        print(f"{'anrop':>9} {'tottime':>9} {'cumtime':>9}  funktion")
+        for row in info["functions"]:
+            print(f"{row['calls']:>9} {row['tottime']:>9.4f} {row['cumtime']:>9.4f}  {row['function']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Uppvärmning vid start och beredskap för /readyz.
+
+Det som annars görs av första requesten (katalogen läses in och
+kategoriseras, sökindexet byggs, mallarna kompileras och startsidan
+renderas) registreras som namngivna steg som körs en gång, i ordning,
+antingen i en bakgrundstråd eller direkt. /readyz svarar 503 tills alla
+steg är klara, så att en orkestrerare (Kubernetes, Docker) skickar trafik
+först när processen är varm, medan /healthz bara visar att processen lever.
+
+Tiden för varje steg och den totala tiden sedan processen startade (inte
+bara sedan appen importerades) skrivs till loggen.
+"""
+
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger("tidning.startup")
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def process_uptime():
+    """Seconds since this process was started, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Fälten efter kommandonamnet, som kan innehålla blanksteg; starttiden är fält 22
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _ensure_log_handler():
+    # Utan loggkonfiguration (python app.py, serve.py) skulle info-raderna annars inte synas
+    if not log.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s [%(process)d] %(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+
+
+class Warmup:
+    """Named startup steps, run once and in order; ready when all of them have finished.
+
+    A step that raises is logged and marks the process as not ready, so a
+    broken catalog keeps the instance out of rotation instead of failing
+    requests.
+    """
+
+    def __init__(self):
+        self._steps = []
+        self._state = {}  # namn -> {"state": ..., "seconds": ..., "error": ...}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.seconds = None  # total tid för stegen när de körts klart
+
+    def step(self, name):
+        """Decorator registering `fn` as the startup step `name`."""
+        def register(fn):
+            self._steps.append((name, fn))
+            self._state[name] = {"state": PENDING}
+            return fn
+        return register
+
+    def begin(self, mode: str):
+        """Log that the app has loaded, then warm up as `mode` says.
+
+        "background" runs the steps in a thread, "sync" runs them before
+        returning and "off" skips them; "manual" leaves them for the caller
+        (serve.py, which warms up before or after forking the workers).
+        """
+        _ensure_log_handler()
+        uptime = process_uptime()
+        if uptime is not None:
+            log.info("Appen laddad %.0f ms efter att processen startade", uptime * 1000)
+        if mode == "background":
+            self.start()
+        elif mode == "sync":
+            self.run()
+        elif mode == "off":
+            self.skip()
+
+    def start(self):
+        """Run the steps in a daemon thread (once)."""
+        with self._lock:
+            if self._thread is not None or any(s["state"] != PENDING for s in self._state.values()):
+                return
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """Run the pending steps in this thread and log how long startup took."""
+        _ensure_log_handler()
+        started = time.perf_counter()
+        for name, fn in self._steps:
+            with self._lock:
+                if self._state[name]["state"] != PENDING:
+                    continue
+                self._state[name] = {"state": RUNNING}
+            step_started = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                log.exception("Uppvärmningssteget %s misslyckades", name)
+                self._state[name] = {"state": FAILED, "seconds": time.perf_counter() - step_started,
+                                     "error": f"{type(e).__name__}: {e}"}
+                continue
+            seconds = time.perf_counter() - step_started
+            self._state[name] = {"state": DONE, "seconds": seconds}
+            log.info("Uppvärmning: %s på %.0f ms", name, seconds * 1000)
+        self.seconds = time.perf_counter() - started
+        uptime = process_uptime()
+        log.info("Uppvärmd på %.0f ms%s%s", self.seconds * 1000,
+                 f", {uptime * 1000:.0f} ms sedan processen startade" if uptime is not None else "",
+                 "" if self.ready else " (inte redo, se felen ovan)")
+
+    def skip(self):
+        """Mark every pending step as skipped: ready at once, the first requests load lazily."""
+        with self._lock:
+            for state in self._state.values():
+                if state["state"] == PENDING:
+                    state["state"] = SKIPPED
+
+    @property
+    def ready(self) -> bool:
+        return all(s["state"] in (DONE, SKIPPED) for s in self._state.values())
+
+    def status(self) -> dict:
+        """{"ready", "steps": {name: {"state", "seconds", "error"}}, "seconds", "uptime"} for /readyz."""
+        with self._lock:
+            steps = {name: dict(state) for name, state in self._state.items()}
+        return {"ready": self.ready, "steps": steps, "seconds": self.seconds, "uptime": process_uptime()}
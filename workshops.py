@@ -0,0 +1,85 @@
+"""
+Workshoppar: flera klasser med var sin artikelkatalog i samma process.
+
+En workshop är en katalog under data/workshops/<namn>/ med en egen
+articles.json (eller en kompilerad catalog.compiled.json); en katalog utan
+någon av dem räknas inte som en workshop. Eleverna öppnar
+/?workshop=<namn> en gång; därefter hämtar startsidan, sökningen och
+PDF-exporten artiklarna ur workshoppens katalog, och sparningarna hamnar i
+workshoppens egen namnrymd (fältet `session` i den sparade framsidan).
+Utan workshop, eller om workshoppens katalogfil försvunnit, används
+data/articles.json som tidigare.
+
+Katalogerna laddas först när någon använder dem och hålls i en LRU med
+högst `max_loaded` kataloger; den minst nyligen använda släpps när en ny
+behövs. Standardkatalogen räknas inte in och släpps aldrig.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from catalog import COMPILED_FILENAME, ArticleCatalog
+
+# Tillåtna workshopnamn (blir även katalognamn och värde i fältet `session`)
+_NAME = re.compile(r"^[A-Za-z0-9_\-]{1,50}$")
+
+
+class WorkshopCatalogs:
+    """Article catalogs per workshop, loaded on first use and kept in a bounded LRU."""
+
+    def __init__(self, default: ArticleCatalog, workshops_dir: str, max_loaded: int = 8):
+        self.default = default
+        self.workshops_dir = workshops_dir
+        self.max_loaded = max_loaded
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()  # namn -> ArticleCatalog
+
+    def exists(self, name: str) -> bool:
+        """True if `name` is a valid workshop name whose directory has a readable catalog file."""
+        if not (name and _NAME.match(name)):
+            return False
+        directory = os.path.join(self.workshops_dir, name)
+        return any(
+            os.path.isfile(path) and os.access(path, os.R_OK)
+            for path in (os.path.join(directory, "articles.json"), os.path.join(directory, COMPILED_FILENAME))
+        )
+
+    def names(self) -> list:
+        """All workshops available on disk, sorted."""
+        try:
+            entries = os.listdir(self.workshops_dir)
+        except OSError:
+            return []
+        return sorted(n for n in entries if self.exists(n))
+
+    def get(self, name: str = None) -> ArticleCatalog:
+        """The catalog of workshop `name`, or the default catalog for None.
+
+        Raises KeyError for a workshop that does not exist or has no
+        readable catalog file.
+        """
+        if not name:
+            return self.default
+        with self._lock:
+            catalog = self._loaded.get(name)
+            if catalog is not None:
+                self._loaded.move_to_end(name)
+                return catalog
+        if not self.exists(name):
+            raise KeyError(name)
+        catalog = ArticleCatalog(data_dir=os.path.join(self.workshops_dir, name),
+                                 check_interval=self.default.check_interval)
+        with self._lock:
+            # En annan tråd kan ha hunnit ladda samma workshop
+            catalog = self._loaded.setdefault(name, catalog)
+            self._loaded.move_to_end(name)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return catalog
+
+    def loaded(self) -> list:
+        """Names of the workshop catalogs currently held, least recently used first."""
+        with self._lock:
+            return list(self._loaded)